@@ -1,13 +1,22 @@
 import sys
 import json
 import os
+import glob
+import time
+import argparse
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 
 # 1. Setup the Environment for the Engine
 # This allows us to import your existing logic without pip installing it again
-sys.path.append(os.path.join(os.path.dirname(__file__), 'edi_engine'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine import metrics
+    from edi_engine.columnar import collect_line_items
+    from edi_engine.core import X12MappedTokenizer, X12Tokenizer
+    from edi_engine.envelope import parse_store
 except ImportError:
     # Fallback if the rename didn't happen yet
     print("Error: Could not import 'ai_service'. Did you rename 'ai-service.py' to 'ai_service.py'?", file=sys.stderr)
@@ -18,7 +27,7 @@ def process_file(input_path, output_path):
     Reads raw EDI -> Runs Parsing & AI -> Saves JSON
     """
     print(f"Processing: {input_path}...")
-    
+
     # 1. Read Raw Input
     try:
         with open(input_path, 'r') as f:
@@ -34,16 +43,151 @@ def process_file(input_path, output_path):
     # 3. Save to JSON
     with open(output_path, 'w') as f:
         json.dump(result, f, indent=4)
-        
+
     print(f"Success! Output saved to: {output_path}")
 
+# --- BATCH MODE ---
+
+def find_inputs(source):
+    """A directory (walked recursively) or a glob pattern -> sorted list of files."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files)
+    else:
+        paths = [p for p in glob.glob(source, recursive=True) if os.path.isfile(p)]
+    return sorted(paths)
+
+def load_checkpoint(manifest_path):
+    """Paths already written to the output, one per line in the manifest."""
+    if not os.path.exists(manifest_path):
+        return set()
+    with open(manifest_path, 'r') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def parse_typed(segments):
+    """Typed parse (parse_store shape) of tokenized segments: the record of every parse-only run."""
+    if not segments:
+        return {"error": "Empty or invalid EDI content", "success": False}
+    return parse_store(segments)
+
+def parse_mapped(input_path):
+    """
+    Typed parse of a file through mmap: segments are found by scanning bytes and
+    only the fields the parsers read get decoded, so peak memory stays near the
+    file size (mapped pages are shared with the page cache).
+    """
+    return parse_typed(X12MappedTokenizer(input_path).tokenize())
+
+def _batch_worker(job):
+    # Runs in a pool worker: one file -> one JSON Lines record
+    input_path, parse_only, use_mmap = job
+    started = time.perf_counter()
+    record = {"file": input_path}
+    try:
+        if use_mmap:
+            record["result"] = parse_mapped(input_path)
+        else:
+            read_started = metrics.start()
+            with open(input_path, 'r') as f:
+                raw_content = f.read()
+            metrics.observe("read", read_started, nbytes=len(raw_content))
+            if parse_only:
+                record["result"] = parse_typed(X12Tokenizer(raw_content).tokenize())
+            else:
+                record["result"] = analyze_edi_with_ai(raw_content)
+        record["success"] = True
+    except Exception as e:
+        record["success"] = False
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+def process_batch(source, output_path, workers=None, manifest_path=None, parse_only=False, use_mmap=False):
+    """
+    Parses every file in a directory/glob across a process pool.
+    With AI analysis on, files go through a thread pool instead: the work is
+    waiting on the model, and one process keeps a single shared AI client
+    (concurrency / rate limit / retries) instead of one per worker.
+    Results are appended to `output_path` as JSON Lines; each finished file is then
+    recorded in the checkpoint manifest, so a rerun after a crash skips it.
+    A crash between the two writes can repeat at most that one record.
+    Parse-only records hold the typed parse (parse_store shape); use_mmap (implies
+    parse_only) memory-maps each file instead of reading it, same records.
+    """
+    parse_only = parse_only or use_mmap
+    manifest_path = manifest_path or output_path + ".manifest"
+    inputs = find_inputs(source)
+    done = load_checkpoint(manifest_path)
+    pending = [p for p in inputs if p not in done]
+    print(f"Batch: {len(inputs)} files found, {len(inputs) - len(pending)} already done, {len(pending)} to process.")
+
+    if parse_only:
+        workers = workers or os.cpu_count() or 1
+        pool_class = Pool
+    else:
+        workers = workers or int(os.environ.get("EDI_AI_CONCURRENCY", "8"))
+        pool_class = ThreadPool
+    chunksize = max(1, min(64, len(pending) // (workers * 8)))
+    processed = failed = 0
+    started = time.perf_counter()
+
+    with open(output_path, 'a') as out, open(manifest_path, 'a') as manifest, pool_class(workers) as pool:
+        jobs = ((path, parse_only, use_mmap) for path in pending)
+        for record in pool.imap_unordered(_batch_worker, jobs, chunksize=chunksize):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            manifest.write(record["file"] + "\n")
+            manifest.flush()
+            processed += 1
+            if not record["success"]:
+                failed += 1
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Done: {processed} files ({failed} failed) in {elapsed:.2f}s -> {rate:.1f} files/sec")
+    print(f"Results: {output_path}  Checkpoint: {manifest_path}")
+    return {"processed": processed, "failed": failed, "seconds": elapsed, "files_per_second": rate}
+
+def export_line_items(source, output_path, workers=None):
+    """
+    Line items of every file in a directory/glob as one columnar table
+    (.parquet needs pyarrow, .npz needs numpy, anything else is written as CSV).
+    """
+    inputs = find_inputs(source)
+    started = time.perf_counter()
+    items = collect_line_items(inputs, workers or os.cpu_count() or 1)
+    items.write(output_path)
+    elapsed = time.perf_counter() - started
+    print(f"Exported {len(items)} line items from {len(inputs)} files in {elapsed:.2f}s -> {output_path}")
+    return items
+
 if __name__ == "__main__":
     # Usage: python automation.py input.edi output.json
-    if len(sys.argv) < 3:
+    #        python automation.py --batch <dir|glob> --output results.jsonl [--workers N]
+    parser = argparse.ArgumentParser(description="Parse EDI files and run AI analysis.")
+    parser.add_argument("input_file", nargs="?")
+    parser.add_argument("output_file", nargs="?")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB", help="process a directory or glob of files")
+    parser.add_argument("--output", help="JSON Lines output for --batch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count), or AI threads (default: EDI_AI_CONCURRENCY)")
+    parser.add_argument("--checkpoint", help="resume manifest (default: <output>.manifest)")
+    parser.add_argument("--parse-only", action="store_true", help="skip AI analysis and write the typed parse")
+    parser.add_argument("--mmap", action="store_true",
+                        help="memory-map inputs (large archives; implies --parse-only, same records)")
+    parser.add_argument("--export-lines", metavar="PATH",
+                        help="with --batch: write all line items as one table (.parquet, .npz or .csv) instead of JSON Lines")
+    args = parser.parse_args()
+
+    if args.batch and args.export_lines:
+        export_line_items(args.batch, args.export_lines, args.workers)
+    elif args.batch:
+        if not args.output:
+            parser.error("--batch requires --output")
+        process_batch(args.batch, args.output, args.workers, args.checkpoint, args.parse_only, args.mmap)
+    elif args.input_file and args.output_file:
+        process_file(args.input_file, args.output_file)
+    else:
         print("Usage: python automation.py <input_file> <output_file>")
+        print("       python automation.py --batch <dir|glob> --output <results.jsonl> [--workers N]")
         sys.exit(1)
-        
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    
-    process_file(input_file, output_file)
\ No newline at end of file
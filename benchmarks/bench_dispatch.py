@@ -0,0 +1,143 @@
+"""
+Microbenchmark: registry tag dispatch vs. the original if/elif parser chains.
+
+Usage: python benchmarks/bench_dispatch.py [--segments 200000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from edi_engine.core import X12Tokenizer
+from edi_engine.registry import parse_segments
+from edi_engine.utils import format_date, format_currency, mask_pii
+
+ISA = ("ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+       "*210101*1253*U*00401*000000001*0*P*:~")
+
+
+def make_850(lines: int) -> str:
+    body = ["ST*850*0001", "BEG*00*SA*PO-1**20210101", "N1*ST*WAREHOUSE*92*1"]
+    for i in range(lines):
+        body.append(f"PO1*{i}*{i % 50 + 1}*EA*{i % 97}.25**BP*B{i}*VP*SKU-{i}")
+        body.append(f"PID*F****ITEM {i}")
+    body.append(f"SE*{len(body) + 1}*0001")
+    return ISA + "GS*PO*S*R*20210101*1253*1*X*004010~" + "~".join(body) + "~GE*1*1~IEA*1*000000001~"
+
+
+def make_837(claims: int) -> str:
+    body = ["ST*837*0001", "BHT*0019*00*1*20210101*1200*CH"]
+    for i in range(claims):
+        body.append(f"CLM*C{i}*{i % 900}.50***11:B:1*Y*A*Y*Y")
+        body.append("NM1*85*2*PROVIDER GROUP*****XX*1234567890")
+        body.append(f"NM1*IL*1*DOE*JANE****MI*{100000000 + i}")
+        body.append("HI*ABK:J449*ABF:E119")
+        body.append("SV1*HC:99213*100*UN*1***1")
+        body.append("DTP*472*D8*20210101")
+    body.append(f"SE*{len(body) + 1}*0001")
+    return ISA + "GS*HC*S*R*20210101*1253*1*X*005010X222A1~" + "~".join(body) + "~GE*1*1~IEA*1*000000001~"
+
+
+# --- Reference: the original if/elif chains (pre-registry) ---
+
+def legacy_parse_850(segments):
+    data = {"doc_type": "850 Purchase Order", "po_number": "Unknown", "items": []}
+    for seg in segments:
+        if seg.tag == "BEG":
+            data["po_number"] = seg.get(3)
+            data["date"] = format_date(seg.get(5))
+        elif seg.tag == "N1" and seg.get(1) == "ST":
+            data["ship_to"] = seg.get(2)
+        elif seg.tag == "PO1":
+            qty = int(seg.get(2) or 0)
+            price = format_currency(seg.get(4))
+            sku = "UNKNOWN"
+            found_sku = False
+            for i in range(6, len(seg.elements)):
+                val = seg.get(i)
+                if val in ["VP", "VN", "BP", "UP", "IB"]:
+                    sku = seg.get(i + 1)
+                    found_sku = True
+                    break
+            if not found_sku:
+                sku = seg.get(7) or "MISSING"
+            data["items"].append({"qty": qty, "price": price, "sku": sku})
+    return data
+
+
+def legacy_parse_837(segments):
+    data = {"doc_type": "837 Medical Claim", "claims": []}
+    current_claim = None
+    for seg in segments:
+        if seg.tag == "BHT":
+            data["creation_date"] = format_date(seg.get(4))
+        elif seg.tag == "NM1":
+            role = seg.get(1)
+            if role == "85":
+                if current_claim: current_claim["provider"] = seg.get(3)
+            elif role == "IL":
+                if current_claim: current_claim["patient_id_masked"] = mask_pii(seg.get(9))
+        elif seg.tag == "CLM":
+            current_claim = {
+                "claim_id": seg.get(1),
+                "amount": format_currency(seg.get(2)),
+                "diagnoses": [],
+                "provider": "Unknown",
+                "patient_id_masked": "Unknown"
+            }
+            data["claims"].append(current_claim)
+        elif seg.tag == "HI":
+            codes = []
+            for c in seg.elements[1:]:
+                parts = c.split(':')
+                if len(parts) > 1: codes.append(parts[1])
+            if current_claim:
+                current_claim["diagnoses"] = codes
+    return data
+
+
+def legacy_parse_edi(segments, parsers):
+    doc_type = "Unknown"
+    for seg in segments:
+        if seg.tag == "ST":
+            doc_type = seg.get(1)
+            break
+    return {"success": True, "detected_type": doc_type,
+            "segments_read": len(segments), "data": parsers[doc_type](segments)}
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200000, help="approximate segments per document")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    legacy_parsers = {"850": legacy_parse_850, "837": legacy_parse_837}
+    documents = {
+        "850": make_850(args.segments // 2),
+        "837": make_837(args.segments // 6),
+    }
+
+    print(f"{'set':<5}{'segments':>10}{'if/elif (s)':>14}{'registry (s)':>14}{'speedup':>10}")
+    for code, raw in documents.items():
+        segments = X12Tokenizer(raw).tokenize()
+        assert legacy_parse_edi(segments, legacy_parsers)["data"] == parse_segments(segments)["data"]
+
+        legacy = best_of(lambda: legacy_parse_edi(segments, legacy_parsers), args.repeat)
+        registry = best_of(lambda: parse_segments(segments), args.repeat)
+        print(f"{code:<5}{len(segments):>10}{legacy:>14.4f}{registry:>14.4f}{legacy / registry:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
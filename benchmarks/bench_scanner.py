@@ -0,0 +1,81 @@
+"""
+Microbenchmark: block scanner in X12Tokenizer vs. the previous per-segment find() loop.
+
+Usage: python benchmarks/bench_scanner.py [--size 20MB] [--types 850,810,856,837,835] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from edi_engine.core import SegmentStore, X12Tokenizer, detect_delimiters
+from generators import DOC_TYPES, make_interchange
+from run import parse_size
+
+# (element separator, segment terminator, line break after each segment)
+DIALECTS = (("*", "~", False), ("|", "'", True))
+
+
+# --- Reference: the per-segment find() loop the block scanner replaced ---
+
+def find_loop_tokenize(raw: str) -> SegmentStore:
+    raw = raw.strip()
+    element_sep, segment_term = detect_delimiters(raw)
+    if segment_term not in ['\n', '\r']:
+        raw = raw.replace('\n', '').replace('\r', '')
+    store = SegmentStore(raw, element_sep)
+    tag_index = {}
+    find = raw.find
+    total = len(raw)
+    start = 0
+    while start <= total:
+        end = find(segment_term, start)
+        if end < 0: end = total
+        tag_end = find(element_sep, start, end)
+        if tag_end < 0: tag_end = end
+        tag = raw[start:tag_end]
+        if 2 <= len(tag) <= 3:
+            stripped = tag.strip()
+            if stripped or raw[start:end].strip():
+                store.append(stripped, start, end, tag_index)
+        start = end + 1
+    return store
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="20MB")
+    parser.add_argument("--types", default=",".join(DOC_TYPES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'set':<5}{'delims':>8}{'segments':>10}{'find loop (s)':>15}{'scanner (s)':>13}{'speedup':>10}")
+    for code in args.types.split(","):
+        for element_sep, segment_term, newline in DIALECTS:
+            raw = make_interchange(code, target_bytes=parse_size(args.size), element_sep=element_sep,
+                                   segment_term=segment_term, newline=newline)
+            old, new = find_loop_tokenize(raw), X12Tokenizer(raw).tokenize()
+            assert list(old.iter_tags()) == list(new.iter_tags())
+            assert (old._starts, old._ends) == (new._starts, new._ends)
+
+            reference = best_of(lambda: find_loop_tokenize(raw), args.repeat)
+            scanner = best_of(lambda: X12Tokenizer(raw).tokenize(), args.repeat)
+            delims = element_sep + segment_term + ("\\n" if newline else "")
+            print(f"{code:<5}{delims:>8}{len(new):>10}{reference:>15.4f}{scanner:>13.4f}{reference / scanner:>9.2f}x")
+            del raw, old, new
+
+
+if __name__ == "__main__":
+    main()
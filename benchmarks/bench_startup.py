@@ -0,0 +1,83 @@
+"""
+Benchmark: startup cost of the parse-only path used by edi_engine/server.py.
+Runs `python -X importtime` on "import edi_engine.server" and on one parse
+command in fresh interpreters, and reports import time, wall time and the
+slowest modules. Exits non-zero when a module that parse-only commands must
+not load (AI SDK, asyncio, sqlite3, multiprocessing, profilers) gets imported.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from generators import make_interchange
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CASES = (
+    ("interpreter", "pass"),
+    ("import server", "import edi_engine.server"),
+    ("first parse", "import sys, edi_engine.server as s; s.handle('parse', sys.stdin.read())"),
+)
+# Loaded on first use only (analyze, parallel parse, profiling)
+FORBIDDEN = ("asyncio", "sqlite3", "google", "multiprocessing", "cProfile", "pstats", "tracemalloc",
+             "edi_engine.ai_service", "edi_engine.ai_client", "edi_engine.result_cache")
+
+
+def run_once(code: str, stdin: str):
+    """(wall seconds, [(module, self us, cumulative us)]) for one fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], input=stdin,
+                          capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+    wall = time.perf_counter() - start
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative)))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    stdin = make_interchange("850", lines=5)
+    baseline = None
+    loaded = []
+    print(f"{'case':<15}{'wall (ms)':>11}{'imports (ms)':>14}{'modules':>9}")
+    for label, code in CASES:
+        runs = sorted((run_once(code, stdin) for _ in range(args.repeat)), key=lambda run: run[0])
+        wall, modules = runs[len(runs) // 2]  # median by wall time
+        imports = sum(self_us for _, self_us, _ in modules) / 1000
+        if baseline is None:
+            baseline = (wall, imports, len(modules))
+        else:
+            wall_delta, imports_delta = (wall - baseline[0]) * 1000, imports - baseline[1]
+            print(f"{label:<15}{wall * 1000:>11.1f}{imports:>14.1f}{len(modules):>9}"
+                  f"   (+{wall_delta:.1f} ms wall, +{imports_delta:.1f} ms imports over the interpreter)")
+            loaded = modules
+            continue
+        print(f"{label:<15}{wall * 1000:>11.1f}{imports:>14.1f}{len(modules):>9}")
+
+    print(f"\nslowest modules on the first parse (self time):")
+    for name, self_us, cumulative in sorted(loaded, key=lambda m: -m[1])[:args.top]:
+        print(f"  {name:<40}{self_us / 1000:>8.1f} ms{cumulative / 1000:>9.1f} ms cumulative")
+
+    names = {name for name, _, _ in loaded}
+    unwanted = sorted(n for n in names if n.split(".")[0] in FORBIDDEN or n in FORBIDDEN)
+    if unwanted:
+        print(f"\nloaded on the parse-only path: {', '.join(unwanted)}")
+    sys.exit(1 if unwanted else 0)
+
+
+if __name__ == "__main__":
+    main()
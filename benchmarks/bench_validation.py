@@ -0,0 +1,90 @@
+"""
+Benchmark: parse_edi with validate=True vs. the plain typed parse.
+Exits non-zero when the median overhead of --repeat paired runs exceeds
+--max-overhead (default 20%). Each round times both parses back to back (in
+alternating order) and the gate uses the median ratio, so one noisy run can't flip it.
+Validation measures about 3-9% per type; the limit sits well above that plus
+run-to-run noise (several points on a shared VM), so it only trips on a real regression.
+
+Usage: python benchmarks/bench_validation.py [--size 10MB] [--types 850,810,856,837,835]
+                                             [--transactions 1,50] [--repeat 9] [--max-overhead 0.20]
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from edi_engine.core import X12Tokenizer
+from edi_engine.envelope import parse_store
+from generators import DOC_TYPES, make_interchange
+from run import parse_size, validated
+
+
+def plain(raw: str) -> dict:
+    return parse_store(X12Tokenizer(raw).tokenize())
+
+
+def cpu_time(func) -> float:
+    """CPU time of one call with the GC paused (as timeit does); keeps other tenants out of the ratio."""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.process_time()
+        func()
+        return time.process_time() - start
+    finally:
+        gc.enable()
+
+
+def paired(base, checked, repeat):
+    """
+    Median times and the median checked/base ratio over `repeat` rounds. Both run
+    in each round, in alternating order, so drift hits the pair rather than one side.
+    """
+    base_times, checked_times, ratios = [], [], []
+    for round_ in range(repeat):
+        if round_ % 2:
+            c, b = cpu_time(checked), cpu_time(base)
+        else:
+            b, c = cpu_time(base), cpu_time(checked)
+        base_times.append(b)
+        checked_times.append(c)
+        ratios.append(c / b)
+    return statistics.median(base_times), statistics.median(checked_times), statistics.median(ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="10MB")
+    parser.add_argument("--types", default=",".join(DOC_TYPES))
+    parser.add_argument("--transactions", default="1,50")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--max-overhead", type=float, default=0.20)
+    args = parser.parse_args()
+
+    worst = 0.0
+    print(f"{'set':<5}{'ST':>5}{'segments':>10}{'parse (cpu s)':>15}{'validate (cpu s)':>18}{'overhead':>10}")
+    for code in args.types.split(","):
+        for transactions in map(int, args.transactions.split(",")):
+            raw = make_interchange(code, target_bytes=parse_size(args.size), transactions=transactions)
+            count = len(X12Tokenizer(raw).tokenize())
+            report = validated(raw)["validation"]
+            assert report["valid"], report["errors"][:5]
+
+            base, checked, ratio = paired(lambda: plain(raw), lambda: validated(raw), args.repeat)
+            overhead = ratio - 1
+            worst = max(worst, overhead)
+            print(f"{code:<5}{transactions:>5}{count:>10}{base:>15.4f}{checked:>18.4f}{overhead:>9.1%}")
+            del raw
+
+    print(f"\nworst median overhead {worst:.1%} over {args.repeat} rounds (limit {args.max_overhead:.0%})")
+    sys.exit(1 if worst > args.max_overhead else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Synthetic X12 generators for benchmarks and large-input tests.
+
+Every document is a valid ISA/GS/ST..SE/GE/IEA interchange (106-char ISA, correct
+SE/GE/IEA counts) of type 850, 810, 856, 837 or 835, sized either by line count
+or by approximate byte size (1 KB .. 1 GB), with configurable delimiters.
+
+    make_interchange("837", target_bytes=10_000_000, element_sep="|", segment_term="'")
+    write_interchange("big.edi", "850", target_bytes=1 << 30)   # streamed, never held in memory
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DOC_TYPES = ("850", "810", "856", "837", "835")
+
+# Body builders work with '*' / ':' placeholders; _render swaps in the chosen delimiters.
+
+def _850_head(n: int, items: range) -> List[str]:
+    return [f"BEG*00*SA*PO-{n}**20210101", "N1*ST*WAREHOUSE*92*1"]
+
+def _850_line(i: int) -> List[str]:
+    return [f"PO1*{i}*{i % 50 + 1}*EA*{i % 97}.25**BP*B{i}*VP*SKU-{i}", f"PID*F****ITEM {i}"]
+
+def _810_head(n: int, items: range) -> List[str]:
+    return [f"BIG*20210105*INV-{n}*20210101*PO-{n}", "N1*RE*RETAILER*92*STORE-1"]
+
+def _810_line(i: int) -> List[str]:
+    return [f"IT1*{i}*{i % 20 + 1}*EA*{i % 89}.50**VP*SKU-{i}"]
+
+def _810_tail(items: range) -> List[str]:
+    cents = sum((i % 20 + 1) * ((i % 89) * 100 + 50) for i in items)
+    return [f"TDS*{cents}", f"CTT*{len(items)}"]
+
+def _856_head(n: int, items: range) -> List[str]:
+    return [f"BSN*00*SHIP-{n}*20210102*1200", "HL*1**S", "TD1*CTN*10", "HL*2*1*O", f"PRF*PO-{n}"]
+
+def _856_line(i: int) -> List[str]:
+    return [f"HL*{i + 3}*2*I", f"LIN**VP*SKU-{i}", f"SN1**{i % 40 + 1}*EA"]
+
+def _837_head(n: int, items: range) -> List[str]:
+    return ["BHT*0019*00*1*20210101*1200*CH"]
+
+def _837_line(i: int) -> List[str]:
+    return [
+        f"CLM*C{i}*{i % 900}.50***11:B:1*Y*A*Y*Y",
+        "NM1*85*2*PROVIDER GROUP*****XX*1234567890",
+        f"NM1*IL*1*DOE*JANE****MI*{100000000 + i}",
+        "HI*ABK:J449*ABF:E119",
+        "SV1*HC:99213*100*UN*1***1",
+        "DTP*472*D8*20210101",
+    ]
+
+def _835_head(n: int, items: range) -> List[str]:
+    # BPR02 is the payment total: the CLP04 paid amounts (no PLB adjustments here)
+    cents = sum((i % 700) * 100 + 25 for i in items)
+    return [f"BPR*I*{cents // 100}.{cents % 100:02d}*C*ACH*CCP*01*999999999*DA*123456", f"TRN*1*CHK-{n}*1512345678"]
+
+def _835_line(i: int) -> List[str]:
+    return [f"CLP*C{i}*1*{i % 900}.50*{i % 700}.25**MC*{i}", f"SVC*HC:99213*{i % 900}.50*{i % 700}.25", "DTM*232*20210101"]
+
+# doc type -> (GS functional id, GS version, head, line, tail)
+BUILDERS: Dict[str, Tuple[str, str, Callable, Callable, Optional[Callable]]] = {
+    "850": ("PO", "004010", _850_head, _850_line, None),
+    "810": ("IN", "004010", _810_head, _810_line, _810_tail),
+    "856": ("SH", "004010", _856_head, _856_line, None),
+    "837": ("HC", "005010X222A1", _837_head, _837_line, None),
+    "835": ("HP", "005010X221A1", _835_head, _835_line, None),
+}
+
+def isa_header(element_sep: str = "*", segment_term: str = "~", component_sep: str = ":",
+               control: int = 1) -> str:
+    """A fixed-width ISA segment (106 characters including the terminator)."""
+    fields = ["ISA", "00", " " * 10, "00", " " * 10, "ZZ", "SENDER".ljust(15), "ZZ", "RECEIVER".ljust(15),
+              "210101", "1253", "U", "00401", f"{control:09d}", "0", "P", component_sep]
+    header = element_sep.join(fields) + segment_term
+    assert len(header) == 106, len(header)
+    return header
+
+def _render(segment: str, element_sep: str, component_sep: str) -> str:
+    if component_sep != ":":
+        segment = segment.replace(":", component_sep)
+    if element_sep != "*":
+        segment = segment.replace("*", element_sep)
+    return segment
+
+def _lines_for(doc_type: str, target_bytes: int, element_sep: str, segment_term: str, newline: bool) -> int:
+    # Average rendered size of a line item, measured on a few samples
+    line = BUILDERS[doc_type][3]
+    sample = sum(len(s) + len(segment_term) + newline for i in range(1, 9) for s in line(i)) / 8
+    return max(1, int(target_bytes / sample))
+
+def iter_interchange(doc_type: str = "850", lines: Optional[int] = None, target_bytes: Optional[int] = None,
+                     transactions: int = 1, element_sep: str = "*", segment_term: str = "~",
+                     component_sep: str = ":", newline: bool = False,
+                     chunk_segments: int = 4096) -> Iterator[str]:
+    """
+    Yields the interchange as text chunks of ~chunk_segments segments each.
+    Size by `lines` (line items / claims per document) or `target_bytes` (approximate);
+    the items are split evenly over `transactions` ST..SE sets.
+    """
+    if doc_type not in BUILDERS:
+        raise ValueError(f"Unsupported doc type: {doc_type}")
+    functional_id, version, head, line, tail = BUILDERS[doc_type]
+    if lines is None:
+        lines = _lines_for(doc_type, target_bytes or 1024, element_sep, segment_term, newline)
+
+    term = segment_term + ("\n" if newline else "")
+    buffer: List[str] = []
+
+    def emit(segment: str):
+        buffer.append(_render(segment, element_sep, component_sep) + term)
+
+    yield isa_header(element_sep, segment_term, component_sep) + ("\n" if newline else "")
+    emit(f"GS*{functional_id}*SENDER*RECEIVER*20210101*1253*1*X*{version}")
+
+    per_set, extra = divmod(lines, transactions)
+    item = 0
+    for number in range(1, transactions + 1):
+        control = f"{number:04d}"
+        count = per_set + (1 if number <= extra else 0)
+        emit(f"ST*{doc_type}*{control}")
+        segments = 1
+        first = item
+        for segment in head(number, range(first, first + count)):
+            emit(segment)
+            segments += 1
+        for _ in range(count):
+            for segment in line(item):
+                emit(segment)
+                segments += 1
+            item += 1
+            if len(buffer) >= chunk_segments:
+                yield "".join(buffer)
+                buffer.clear()
+        if tail is not None:
+            for segment in tail(range(first, item)):
+                emit(segment)
+                segments += 1
+        emit(f"SE*{segments + 1}*{control}")
+
+    emit(f"GE*{transactions}*1")
+    emit("IEA*1*000000001")
+    yield "".join(buffer)
+
+def make_interchange(doc_type: str = "850", **options) -> str:
+    """The whole interchange as one string (see iter_interchange for options)."""
+    return "".join(iter_interchange(doc_type, **options))
+
+def write_interchange(path: str, doc_type: str = "850", **options) -> int:
+    """Streams an interchange to `path` without building it in memory; returns bytes written."""
+    written = 0
+    with open(path, "w", encoding="ascii", newline="") as f:
+        for chunk in iter_interchange(doc_type, **options):
+            f.write(chunk)
+            written += len(chunk)
+    return written
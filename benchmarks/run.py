@@ -0,0 +1,244 @@
+"""
+Benchmark harness: throughput and memory for the tokenizer, each transaction-set
+parser, parse_edi, and (optionally) a running HTTP service under load.
+Results are written as JSON so runs from different commits can be compared.
+
+Usage:
+    python benchmarks/run.py [--sizes 1KB,100KB,10MB] [--types 850,810,856,837,835]
+                             [--suites tokenize,parsers,parse_edi,memory] [--repeat 3]
+                             [--output bench.json] [--compare baseline.json --threshold 0.10]
+
+    # Endpoint load against a running service (no extra dependencies):
+    python benchmarks/run.py --suites http --url http://localhost:8000 --endpoint /parse/stream \\
+        --field edi_content --header "x-access-token: ..." --concurrency 16 --requests 200
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from edi_engine.core import X12Tokenizer
+from edi_engine.envelope import parse_store
+from edi_engine.legacy import parse_edi
+from edi_engine.registry import get_parser
+from edi_engine.validation import new_marks, validate_store
+from generators import DOC_TYPES, make_interchange
+
+SUITES = ("tokenize", "parsers", "parse_edi", "memory")
+UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def time_call(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings)
+
+
+def peak_memory(func) -> float:
+    """Peak traced allocation (MB) while running func once."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def record(suite, case, doc_type, raw, segments, best, median):
+    size = len(raw)
+    return {
+        "suite": suite, "case": case, "doc_type": doc_type, "bytes": size, "segments": segments,
+        "best_s": round(best, 6), "median_s": round(median, 6),
+        "mb_per_s": round(size / (1 << 20) / best, 2) if best else None,
+        "segments_per_s": round(segments / best) if best else None,
+    }
+
+
+def validated(raw: str) -> dict:
+    # parse_edi(raw, validate=True) on the typed path
+    marks = new_marks()
+    segments = X12Tokenizer(raw).tokenize(marks)
+    result = parse_store(segments, validate=True)
+    result["validation"] = validate_store(segments, marks, result)
+    return result
+
+
+def run_document(doc_type: str, raw: str, suites, repeat: int):
+    segments = X12Tokenizer(raw).tokenize()
+    count = len(segments)
+    results = []
+
+    if "tokenize" in suites:
+        best, median = time_call(lambda: X12Tokenizer(raw).tokenize(), repeat)
+        results.append(record("tokenize", "X12Tokenizer.tokenize", doc_type, raw, count, best, median))
+
+    if "parsers" in suites:
+        parser = get_parser(doc_type)
+        best, median = time_call(lambda: parser.parse(segments), repeat)
+        results.append(record("parsers", f"parse_{doc_type}", doc_type, raw, count, best, median))
+
+    if "parse_edi" in suites:
+        best, median = time_call(lambda: parse_store(X12Tokenizer(raw).tokenize()), repeat)
+        results.append(record("parse_edi", "typed", doc_type, raw, count, best, median))
+        # Same with envelope/required-element validation (see bench_validation.py for the overhead gate)
+        best, median = time_call(lambda: validated(raw), repeat)
+        results.append(record("parse_edi", "typed+validate", doc_type, raw, count, best, median))
+        # Legacy shape, serialized (which materializes the lazy segments/raw_content)
+        best, median = time_call(lambda: json.dumps(parse_edi(raw)), repeat)
+        results.append(record("parse_edi", "legacy+json", doc_type, raw, count, best, median))
+
+    if "memory" in suites:
+        for case, func in (("X12Tokenizer.tokenize", lambda: X12Tokenizer(raw).tokenize()),
+                           ("typed", lambda: parse_store(X12Tokenizer(raw).tokenize()))):
+            results.append({"suite": "memory", "case": case, "doc_type": doc_type, "bytes": len(raw),
+                            "segments": count, "peak_mb": round(peak_memory(func), 2),
+                            "input_mb": round(len(raw) / (1 << 20), 2)})
+    return results
+
+
+def run_http(args, raw: str, doc_type: str):
+    """Fires --requests POSTs with --concurrency threads; reports latency percentiles and req/s."""
+    headers = {"Content-Type": "application/json"}
+    for header in args.header or []:
+        name, _, value = header.partition(":")
+        headers[name.strip()] = value.strip()
+    body = json.dumps({args.field: raw}).encode()
+    url = args.url.rstrip("/") + args.endpoint
+
+    def one(_):
+        started = time.perf_counter()
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = None
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for t, _ in outcomes)
+    statuses = {}
+    for _, status in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+    return {
+        "suite": "http", "case": args.endpoint, "doc_type": doc_type, "bytes": len(raw),
+        "requests": args.requests, "concurrency": args.concurrency,
+        "requests_per_s": round(args.requests / elapsed, 2),
+        "p50_s": pct(0.50), "p95_s": pct(0.95), "p99_s": pct(0.99), "statuses": statuses,
+    }
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+        "cpu_count": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(current: list, baseline_path: str, threshold: float) -> int:
+    """Prints per-case speed ratios vs a previous results file; returns the regression count."""
+    with open(baseline_path) as f:
+        baseline = {(r["suite"], r["case"], r["doc_type"], r["bytes"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n{'suite':10} {'case':24} {'type':5} {'bytes':>12} {'old':>10} {'new':>10} {'ratio':>7}")
+    for r in current:
+        old = baseline.get((r["suite"], r["case"], r["doc_type"], r["bytes"]))
+        metric = "peak_mb" if r["suite"] == "memory" else "p50_s" if r["suite"] == "http" else "best_s"
+        if not old or not old.get(metric) or not r.get(metric):
+            continue
+        ratio = r[metric] / old[metric]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{r['suite']:10} {r['case']:24} {r['doc_type']:5} {r['bytes']:12d} "
+              f"{old[metric]:10.4f} {r[metric]:10.4f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EDI engine benchmarks")
+    parser.add_argument("--sizes", default="1KB,100KB,10MB")
+    parser.add_argument("--types", default=",".join(DOC_TYPES))
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--element-sep", default="*")
+    parser.add_argument("--segment-term", default="~")
+    parser.add_argument("--transactions", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio counted as a regression")
+    parser.add_argument("--url")
+    parser.add_argument("--endpoint", default="/parse/stream")
+    parser.add_argument("--field", default="edi_content")
+    parser.add_argument("--header", action="append")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    suites = set(args.suites.split(","))
+    results = []
+    for doc_type in args.types.split(","):
+        for size in args.sizes.split(","):
+            raw = make_interchange(doc_type, target_bytes=parse_size(size), transactions=args.transactions,
+                                   element_sep=args.element_sep, segment_term=args.segment_term)
+            batch = run_document(doc_type, raw, suites, args.repeat)
+            if "http" in suites:
+                if not args.url:
+                    parser.error("--suites http requires --url")
+                batch.append(run_http(args, raw, doc_type))
+            for r in batch:
+                speed = next(r[k] for k in ("mb_per_s", "peak_mb", "requests_per_s") if k in r)
+                print(f"{r['suite']:10} {r['case']:24} {doc_type:5} {len(raw):>12,} bytes  {speed}")
+            results.extend(batch)
+            del raw
+
+    with open(args.output, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,39 +32,113 @@ ipcMain.handle('verify-license', async (event, licenseKey) => {
     return { success: true }; 
 });
 
-// --- UPDATED PARSING HANDLER ---
-ipcMain.handle('parse-edi', async (event, payload) => {
-  // payload is now: { content: "...", command: "parse" | "analyze" }
+// --- PERSISTENT PYTHON ENGINE ---
+// One long-lived server.py --serve process answers newline-delimited JSON-RPC,
+// so interpreter startup and imports are paid once instead of on every parse.
+let engine = null;
+let nextRequestId = 1;
+const pendingRequests = new Map();
 
-  // 1. License Check
-  if (!store.get('license_key')) {
-      throw new Error("Please activate your license first.");
-  }
+function failPending(reason) {
+  for (const { reject } of pendingRequests.values()) reject(reason);
+  pendingRequests.clear();
+}
+
+function getEngine() {
+  if (engine) return engine;
 
   let options = {
     mode: 'text',
     pythonPath: 'python3', // Ensure python3 is in your system PATH
     scriptPath: path.join(__dirname, 'python'), // Or just __dirname depending on folder structure
-    args: []
+    args: ['--serve']
   };
 
+  // Note: If server.py is in root, use 'server.py'. If in python folder, use 'python/server.py'
+  engine = new PythonShell('server.py', options);
+
+  engine.on('message', function (message) {
+    let response;
+    try {
+      response = JSON.parse(message);
+    } catch (e) {
+      return; // not a protocol line
+    }
+    const request = pendingRequests.get(response.id);
+    if (!request) return;
+    if ('stream' in response) {
+      // Partial record of a streaming call; the final line carries `result`
+      if (request.onRecord) request.onRecord(response.stream);
+      return;
+    }
+    pendingRequests.delete(response.id);
+    // Same shape the one-shot mode printed for failures
+    request.resolve(response.error ? { error: response.error.message } : response.result);
+  });
+
+  engine.on('close', function () {
+    engine = null;
+    failPending("Python engine exited");
+  });
+
+  engine.on('pythonError', function (err) {
+    failPending(err);
+  });
+
+  return engine;
+}
+
+app.on('will-quit', () => {
+  if (engine) engine.kill();
+});
+
+// onRecord(record, id) receives the partial records of a streaming method
+function callEngine(method, params, onRecord) {
   return new Promise((resolve, reject) => {
-    // Note: If server.py is in root, use 'server.py'. If in python folder, use 'python/server.py'
-    let pyshell = new PythonShell('server.py', options);
-    
-    // Send the full object (content + command)
-    pyshell.send(JSON.stringify(payload));
-
-    pyshell.on('message', function (message) {
-      try {
-        resolve(JSON.parse(message));
-      } catch (e) {
-        reject("Failed to parse Python output");
-      }
-    });
-
-    pyshell.end(function (err) {
-      if (err) reject(err);
-    });
+    const id = nextRequestId++;
+    pendingRequests.set(id, { resolve, reject, onRecord: onRecord && ((record) => onRecord(record, id)) });
+    getEngine().send(JSON.stringify({ jsonrpc: '2.0', id: id, method: method, params: params }));
   });
-});
\ No newline at end of file
+}
+
+// --- EDITOR SESSIONS ---
+// session-open parses once and keeps the document in the engine; session-edit sends
+// { session, version, edits: [{ start, end, text }] } and gets back a JSON Patch of the result.
+ipcMain.handle('session-open', async (event, payload) => {
+  if (!store.get('license_key')) {
+      throw new Error("Please activate your license first.");
+  }
+  return callEngine('session_open', { content: payload.content });
+});
+
+ipcMain.handle('session-edit', async (event, payload) => {
+  return callEngine('session_edit', payload);
+});
+
+ipcMain.handle('session-close', async (event, payload) => {
+  return callEngine('session_close', payload);
+});
+
+// --- UPDATED PARSING HANDLER ---
+ipcMain.handle('parse-edi', async (event, payload) => {
+  // payload is now: { content: "...", command: "parse" | "analyze" }
+
+  // 1. License Check
+  if (!store.get('license_key')) {
+      throw new Error("Please activate your license first.");
+  }
+
+  return callEngine(payload.command || 'parse', { content: payload.content });
+});
+
+// --- STREAMING PARSE HANDLER ---
+// Records (header, one per line item / claim, trailer) are pushed to the renderer
+// on 'parse-edi-record' as they arrive; the promise resolves when the stream ends.
+ipcMain.handle('parse-edi-stream', async (event, payload) => {
+  if (!store.get('license_key')) {
+      throw new Error("Please activate your license first.");
+  }
+
+  return callEngine('parse_stream', { content: payload.content },
+    (record, id) => event.sender.send('parse-edi-record', { id: id, record: record }));
+});
@@ -1,12 +1,33 @@
 import sys
 import json
-import edi_engine  # Your library
+from edi_engine.legacy import parse_edi  # Your library
+from edi_engine.incremental import SessionManager
+from edi_engine.ndjson import iter_parse_records
+from edi_engine.rpc import serve
+from edi_engine.validation import validate_edi
 
 def main():
     """
     Reads a JSON payload from stdin, parses the EDI, and prints JSON to stdout.
     This is how Electron talks to Python.
+
+    With --serve, the process stays alive and answers one JSON-RPC request per
+    line (see edi_engine.rpc); main.js keeps a single engine running this way.
     """
+    if "--serve" in sys.argv[1:]:
+        parse = lambda params: parse_edi(params.get("content", ""))
+        # "analyze" parses too, same as the one-shot mode which ignores the command
+        serve({
+            "parse": parse,
+            "analyze": parse,
+            # Generator -> streamed back as one {"id", "stream": record} line per record
+            "parse_stream": lambda params: iter_parse_records(params.get("content", "")),
+            "validate": lambda params: validate_edi(params.get("content", "")),
+            # Editor sessions: session_open / session_edit (returns a JSON Patch) / session_close
+            **SessionManager().methods(),
+        })
+        return
+
     # 1. Read input from Electron
     input_data = sys.stdin.read()
     
@@ -18,7 +39,7 @@ def main():
         edi_content = request.get("content", "")
         
         # 2. Run the Parser
-        result = edi_engine.parse_edi(edi_content)
+        result = parse_edi(edi_content)
         
         # 3. Print the result (Electron captures this)
         print(json.dumps(result))
@@ -28,4 +49,4 @@ def main():
         print(json.dumps({"error": str(e)}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
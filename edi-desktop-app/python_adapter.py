@@ -3,13 +3,20 @@ import json
 
 # Because you ran 'pip install -e .', this import just works!
 try:
-    from edi_engine import parse_edi
+    from edi_engine.legacy import parse_edi
+    from edi_engine.rpc import serve
 except ImportError:
     # Fallback error if you forgot the pip install step
-    print(json.dumps({"error": "Engine not found. Did you run 'pip install -e .' in edi-engine?"}))
+    print(json.dumps({"error": "Engine not found. Did you run 'pip install -e .' in the project root?"}))
     sys.exit(1)
 
 def main():
+    # Persistent mode: one JSON-RPC request per line until stdin closes
+    if "--serve" in sys.argv[1:]:
+        parse = lambda params: parse_edi(params.get("content", ""))
+        serve({"parse": parse, "analyze": parse})
+        return
+
     # Read from Electron (stdin)
     input_data = sys.stdin.read()
     
@@ -30,4 +37,4 @@ def main():
         print(json.dumps({"error": str(e)}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
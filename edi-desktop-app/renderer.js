@@ -21,7 +21,92 @@ function syntaxHighlight(json) {
     });
 }
 
+// --- LIVE SESSION ---
+// After a parse the document stays open in the engine; each edit is sent as a
+// { start, end, text } range and the returned JSON Patch is applied to the shown result.
+let session = null;        // { id, version, text, result }
+let pendingEdits = [];
+let editInFlight = false;
+
+function editRange(before, after) {
+    let start = 0;
+    const limit = Math.min(before.length, after.length);
+    while (start < limit && before[start] === after[start]) start++;
+    let tail = 0;
+    while (tail < limit - start && before[before.length - 1 - tail] === after[after.length - 1 - tail]) tail++;
+    return { start: start, end: before.length - tail, text: after.slice(start, after.length - tail) };
+}
+
+function applyPatch(doc, ops) {
+    for (const op of ops) {
+        const keys = op.path.split('/').slice(1).map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+        if (!keys.length) { doc = op.value; continue; }
+        let parent = doc;
+        for (const key of keys.slice(0, -1)) parent = parent[key];
+        const last = keys[keys.length - 1];
+        if (Array.isArray(parent)) {
+            const index = last === '-' ? parent.length : Number(last);
+            if (op.op === 'add') parent.splice(index, 0, op.value);
+            else if (op.op === 'remove') parent.splice(index, 1);
+            else parent[index] = op.value;
+        } else if (op.op === 'remove') {
+            delete parent[last];
+        } else {
+            parent[last] = op.value;
+        }
+    }
+    return doc;
+}
+
+async function flushEdits() {
+    if (editInFlight || !session || !pendingEdits.length) return;
+    editInFlight = true;
+    const edits = pendingEdits;
+    pendingEdits = [];
+    try {
+        const response = await ipcRenderer.invoke('session-edit', { session: session.id, version: session.version, edits: edits });
+        if (response.error) throw response.error;
+        session.version = response.version;
+        if (response.diff && response.diff.length) {  // no diff when the engine queued it
+            session.result = applyPatch(session.result, response.diff);
+            results.innerHTML = syntaxHighlight(session.result);
+        }
+    } catch (err) {
+        // Out of sync: drop the session; the next Parse opens a fresh one
+        session = null;
+        results.innerText = "Live update failed: " + err;
+    }
+    editInFlight = false;
+    flushEdits();
+}
+
+ediInput.addEventListener('input', () => {
+    if (!session) return;
+    const text = ediInput.value;
+    pendingEdits.push(editRange(session.text, text));
+    session.text = text;
+    flushEdits();
+});
+
+async function openSession(rawData) {
+    if (session) ipcRenderer.invoke('session-close', { session: session.id });
+    session = null;
+    pendingEdits = [];
+    const opened = await ipcRenderer.invoke('session-open', { content: rawData });
+    if (opened.error) throw opened.error;
+    session = { id: opened.session, version: opened.version, text: rawData, result: opened.result };
+    if (ediInput.value !== rawData) {
+        // Typed while the session was opening
+        pendingEdits.push(editRange(rawData, ediInput.value));
+        session.text = ediInput.value;
+        flushEdits();
+    }
+    return opened.result;
+}
+
 clearBtn.addEventListener('click', () => {
+    if (session) ipcRenderer.invoke('session-close', { session: session.id });
+    session = null;
     ediInput.value = '';
     results.innerHTML = '';
     aiResults.innerHTML = '<p class="text-gray-600 italic mt-10 text-center">Waiting for analysis...</p>';
@@ -34,8 +119,8 @@ processBtn.addEventListener('click', async () => {
     results.innerHTML = '<span class="text-blue-400">Parsing...</span>';
     
     try {
-        // Send command: 'parse'
-        const data = await ipcRenderer.invoke('parse-edi', { content: rawData, command: 'parse' });
+        // Opens a live session: later edits in the editor update this view incrementally
+        const data = await openSession(rawData);
         results.innerHTML = syntaxHighlight(data);
     } catch (err) {
         results.innerText = "Error: " + err;
@@ -0,0 +1,183 @@
+"""
+AI CLIENT: One long-lived model client shared by every analysis in the process.
+- The SDK client / model object is built once and reused, so connections are too.
+- Requests run on a private asyncio loop, up to `concurrency` at a time.
+- A token bucket keeps the request rate under the provider quota.
+- Transient failures (429, 5xx, timeouts) are retried with exponential backoff + jitter.
+Backends are pluggable; FakeBackend answers locally so throughput can be tested offline.
+
+Sync callers (thread pools, scripts) use generate / generate_many; code already
+on an event loop awaits agenerate. All of them share the same limits.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = ("ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded",
+                   "InternalServerError", "TooManyRequests")
+
+class TransientAIError(Exception):
+    """A failure worth retrying (rate limited, overloaded, timed out)."""
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (TransientAIError, TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    for attr in ("code", "status_code", "status"):
+        if getattr(exc, attr, None) in RETRYABLE_STATUS:
+            return True
+    return any(name in type(exc).__name__ for name in RETRYABLE_NAMES)
+
+class TokenBucket:
+    """`rate` requests per second on average, bursts of up to `capacity`."""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+# --- BACKENDS ---
+
+def _response_text(response) -> str:
+    if hasattr(response, "text"):
+        return response.text
+    if isinstance(response, dict):
+        return response.get("output", str(response))
+    return str(response)
+
+class GeminiBackend:
+    """google-genai (Client.aio) or the deprecated google-generativeai GenerativeModel, built once."""
+    real = True
+
+    def __init__(self, genai, new_sdk: bool, model_name: str, api_key: str):
+        self.model_name = model_name
+        self.new_sdk = new_sdk
+        if new_sdk:
+            self._client = genai.Client(api_key=api_key)
+        else:
+            self._model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str) -> str:
+        if self.new_sdk:
+            response = await self._client.aio.models.generate_content(model=self.model_name, contents=prompt)
+        else:
+            response = await self._model.generate_content_async(prompt)
+        return _response_text(response)
+
+class FakeBackend:
+    """
+    Local stand-in for throughput tests: sleeps `latency` seconds per call and
+    fails the first `fail_first` calls (then `failure_rate` of calls) with TransientAIError.
+    """
+    real = False
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0, fail_first: int = 0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.calls <= self.fail_first or self._random.random() < self.failure_rate:
+            raise TransientAIError("fake backend: 503 overloaded")
+        return f"<b>Fake AI Response:</b> analyzed {len(prompt)} prompt characters."
+
+# --- CLIENT ---
+
+class AIClient:
+    def __init__(self, backend, concurrency: int = 8, rate: Optional[float] = None,
+                 burst: Optional[float] = None, max_retries: int = 4,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, backend) -> "AIClient":
+        """EDI_AI_CONCURRENCY, EDI_AI_RATE (requests/sec, 0 = unlimited), EDI_AI_BURST, EDI_AI_RETRIES."""
+        return cls(
+            backend,
+            concurrency=int(os.environ.get("EDI_AI_CONCURRENCY", "8")),
+            rate=float(os.environ.get("EDI_AI_RATE", "0")) or None,
+            burst=float(os.environ.get("EDI_AI_BURST", "0")) or None,
+            max_retries=int(os.environ.get("EDI_AI_RETRIES", "4")),
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="edi-ai-client", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    async def _generate(self, prompt: str) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await self.backend.generate(prompt)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+            # Full jitter keeps a burst of failures from retrying in lockstep
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(random.uniform(0, delay))
+
+    def submit(self, prompt: str) -> Future:
+        """Schedules one call; returns a concurrent.futures.Future with the text."""
+        return asyncio.run_coroutine_threadsafe(self._generate(prompt), self._ensure_loop())
+
+    def generate(self, prompt: str) -> str:
+        return self.submit(prompt).result()
+
+    def generate_many(self, prompts: List[str]) -> List[str]:
+        """All prompts in flight at once (within the limits); raises the first failure."""
+        futures = [self.submit(p) for p in prompts]
+        return [f.result() for f in futures]
+
+    async def agenerate(self, prompt: str) -> str:
+        return await asyncio.wrap_future(self.submit(prompt))
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+            self._semaphore = None
+            if self.bucket is not None:
+                self.bucket._lock = None
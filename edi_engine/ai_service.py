@@ -1,49 +1,169 @@
 import os
-import json
+import threading
 import warnings
-from typing import Optional
+from typing import Optional, Tuple, Union
 
-# Try the new google-genai package first, fallback to the old deprecated package.
+# Read API key from environment — do NOT commit keys into source
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY") or ""
+
+# The SDK is imported on the first model call (see _load_genai): parse-only
+# commands never pay for it.
 _HAS_GENAI_NEW = False
 _HAS_GENAI_OLD = False
 genai = None
+_genai_loaded = False
+_genai_lock = threading.Lock()
+
+def _load_genai():
+    """Imports the new google-genai package, else the old deprecated one; None when neither is installed."""
+    global genai, _HAS_GENAI_NEW, _HAS_GENAI_OLD, _genai_loaded
+    if _genai_loaded:
+        return genai
+    with _genai_lock:
+        if not _genai_loaded:
+            _import_genai()
+            _genai_loaded = True
+    return genai
+
+def _import_genai():
+    global genai, _HAS_GENAI_NEW, _HAS_GENAI_OLD
+    try:
+        import google.genai as sdk  # type: ignore
+        genai, _HAS_GENAI_NEW = sdk, True
+    except Exception:
+        # suppress the old-package FutureWarning when importing fallback
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=FutureWarning)
+            try:
+                import google.generativeai as sdk  # type: ignore
+                genai, _HAS_GENAI_OLD = sdk, True
+            except Exception:
+                genai = None
 
-try:
-    import google.genai as genai  # type: ignore
-    _HAS_GENAI_NEW = True
-except Exception:
-    # suppress the old-package FutureWarning when importing fallback
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", category=FutureWarning)
+    # Configure the old package if present (the new package uses a different client surface)
+    if _HAS_GENAI_OLD and GEMINI_API_KEY:
         try:
-            import google.generativeai as genai  # type: ignore
-            _HAS_GENAI_OLD = True
+            genai.configure(api_key=GEMINI_API_KEY)
         except Exception:
-            genai = None
+            # non-fatal, we'll handle errors at call time
+            pass
 
-# Read API key from environment — do NOT commit keys into source
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY") or ""
+from . import metrics
+from .ai_client import AIClient, FakeBackend, GeminiBackend
+from .legacy import LegacyView, from_summary, parse_edi
+from .prompting import PromptPlan, plan_prompts
+from .result_cache import ResultCache, cache_from_env, cache_key
 
-# Configure the old package if present (the new package uses a different client surface)
-if _HAS_GENAI_OLD and GEMINI_API_KEY:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-    except Exception:
-        # non-fatal, we'll handle errors at call time
-        pass
+MODEL_NAME = "gemini-2.5-flash"
+# Bump whenever the prompt below changes, so cached analyses of the old prompt are not reused
+PROMPT_VERSION = "2"
+
+_result_cache: Optional[ResultCache] = None
+_ai_client: Optional[AIClient] = None
+# Double-checked: the fast path reads the global, first calls serialize here so that
+# concurrent callers share one cache and one client (one token bucket).
+_init_lock = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    """Process-wide analysis cache, configured from EDI_CACHE_* environment variables."""
+    global _result_cache
+    if _result_cache is None:
+        with _init_lock:
+            if _result_cache is None:
+                _result_cache = cache_from_env()
+    return _result_cache
+
+def cached_analysis(key: str, raw_edi_content: str) -> Optional[dict]:
+    """Cached analysis of this content, with `parsed.data` as a lazy view over it again."""
+    result = get_result_cache().get(key)
+    if result is not None:
+        parsed = result.get("parsed") or {}
+        data = parsed.get("data")
+        if isinstance(data, dict) and "segments" not in data:
+            parsed["data"] = from_summary(raw_edi_content, data)
+    return result
 
-from . import parse_edi
+def cache_analysis(key: str, result: dict) -> None:
+    """Caches a model answer without the document: `parsed.data` keeps only its summary fields."""
+    parsed = result.get("parsed") or {}
+    if isinstance(parsed.get("data"), LegacyView):
+        result = {**result, "parsed": {**parsed, "data": parsed["data"].summary()}}
+    get_result_cache().put(key, result)
 
 
-def analyze_edi_with_ai(raw_edi_content: str) -> dict:
+def build_prompt(parsed: dict) -> PromptPlan:
+    """Compact, token-budgeted prompt(s) built from the typed parse (see prompting.py)."""
+    return plan_prompts(parsed)
+
+
+def get_ai_client() -> Optional[AIClient]:
+    """
+    Process-wide model client (see ai_client.py), or None when no SDK/key is configured.
+    EDI_AI_BACKEND=fake swaps in the local FakeBackend for offline throughput runs.
+    """
+    global _ai_client
+    if _ai_client is None:
+        with _init_lock:
+            if _ai_client is None:
+                if os.environ.get("EDI_AI_BACKEND") == "fake":
+                    backend = FakeBackend(latency=float(os.environ.get("EDI_FAKE_AI_LATENCY", "0.05")))
+                elif GEMINI_API_KEY and _load_genai() is not None:
+                    backend = GeminiBackend(genai, _HAS_GENAI_NEW, MODEL_NAME, GEMINI_API_KEY)
+                else:
+                    return None
+                _ai_client = AIClient.from_env(backend)
+    return _ai_client
+
+
+def run_analysis(parsed: dict, plan: Union[PromptPlan, str]) -> Tuple[dict, bool]:
+    """
+    The model-call stage on its own (blocking): returns (result, cacheable).
+    The parts of a chunked plan are analyzed concurrently, then merged in one more call.
+    Only real model answers are cacheable; errors, fakes and placeholders are not.
+    """
+    if isinstance(plan, str):
+        plan = PromptPlan([plan])
+
+    client = get_ai_client()
+    if client is None:
+        # No usable client/key -> simulated response
+        return {
+            "parsed": parsed,
+            "ai_analysis": "<b>Simulated AI Response:</b> GEMINI_API_KEY not configured or SDK unavailable.",
+            "prompt_stats": plan.stats(),
+        }, False
+
+    started = metrics.start()
+    try:
+        analyses = client.generate_many(plan.prompts)
+        text = analyses[0]
+        if plan.chunked:
+            text = client.generate(plan.reduce_prompt(analyses))
+    except Exception as e:
+        return {"parsed": parsed, "ai_analysis": f"AI error: {e}", "prompt_stats": plan.stats()}, False
+    finally:
+        metrics.observe("ai", started, (parsed.get("data") or {}).get("transaction_set", metrics.ALL))
+    return {"parsed": parsed, "ai_analysis": text, "prompt_stats": plan.stats()}, client.backend.real
+
+
+def analyze_edi_with_ai(raw_edi_content: str, use_cache: bool = True) -> dict:
     """
     Parse the provided EDI content and (optionally) call the GenAI service.
+    Successful model analyses are cached by content hash + model + prompt version,
+    so repeats of the same document skip both the parse and the model call.
     Behavior:
-    - If `google.genai` (new) is installed, return a migration note to avoid runtime errors until the
-      client code is updated to the new SDK surface.
-    - If only `google.generativeai` (deprecated) is present and GEMINI_API_KEY is set, use it.
+    - If `google.genai` (new) or `google.generativeai` (deprecated) is installed and GEMINI_API_KEY
+      is set, call the model through the shared client (rate limited, retried).
     - Otherwise return a simulated AI response so local testing is safe.
+    Safe to call from many threads at once; they share the client's concurrency and rate limits.
     """
+    key = None
+    if use_cache:
+        key = cache_key(raw_edi_content, MODEL_NAME, PROMPT_VERSION)
+        cached = cached_analysis(key, raw_edi_content)
+        if cached is not None:
+            return cached
+
     try:
         parsed = parse_edi(raw_edi_content)
     except Exception as e:
@@ -52,44 +172,7 @@ def analyze_edi_with_ai(raw_edi_content: str) -> dict:
     if not parsed or not parsed.get("success"):
         return {"error": "Could not parse EDI, AI analysis skipped", "parsed": parsed}
 
-    json_str = json.dumps(parsed.get("data", parsed), indent=2)
-
-    prompt = (
-        "You are an expert Supply Chain EDI analyst. Analyze the parsed EDI JSON and provide:\n"
-        "1) Short human-readable summary\n"
-        "2) Key fields (sender, receiver, transaction set id, counts)\n"
-        "3) Any obvious data quality issues\n"
-        "Return output as HTML.\n\nDATA:\n" + json_str
-    )
-
-    # If new package is installed, do not attempt to call it automatically here.
-    # This prevents runtime failures until code is migrated to the new SDK surface.
-    if _HAS_GENAI_NEW:
-        return {
-            "parsed": parsed,
-            "ai_analysis": (
-                "<b>GenAI available (google-genai)</b>: Please migrate edi_engine.ai_service to use the "
-                "google.genai client API. AI calls are skipped to avoid runtime errors."
-            ),
-        }
-
-    # Use deprecated package if available and API key is set
-    if _HAS_GENAI_OLD and GEMINI_API_KEY:
-        try:
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(prompt)
-            if hasattr(response, "text"):
-                text = response.text
-            elif isinstance(response, dict):
-                text = response.get("output", str(response))
-            else:
-                text = str(response)
-            return {"parsed": parsed, "ai_analysis": text}
-        except Exception as e:
-            return {"parsed": parsed, "ai_analysis": f"AI error: {e}"}
-
-    # No usable client/key -> simulated response
-    return {
-        "parsed": parsed,
-        "ai_analysis": "<b>Simulated AI Response:</b> GEMINI_API_KEY not configured or SDK unavailable."
-    }
+    result, cacheable = run_analysis(parsed, build_prompt(parsed))
+    if cacheable and key is not None:
+        cache_analysis(key, result)
+    return result
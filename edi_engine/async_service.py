@@ -0,0 +1,191 @@
+"""
+Non-blocking analysis for the async web services.
+CPU-bound parsing runs in a bounded process pool, the blocking model call in a
+thread pool, so a large document or a slow model never stalls the event loop.
+When more than `max_pending` analyses are in flight, new ones are rejected
+with AnalysisSaturated (the endpoints turn that into HTTP 429).
+Background jobs (edi_engine.jobs) use analyze_blocking() from their own
+threads: same parse pool and result cache, no event loop needed.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from . import metrics
+from .ai_service import MODEL_NAME, PROMPT_VERSION, build_prompt, cache_analysis, cached_analysis, run_analysis
+from .legacy import parse_edi
+from .result_cache import cache_key
+
+def prepare_analysis(content: str):
+    """CPU-bound half of an analysis (parse + prompt build); runs in a worker process."""
+    parsed = parse_edi(content)
+    if not parsed or not parsed.get("success"):
+        return parsed, None
+    return parsed, build_prompt(parsed)
+
+class AnalysisSaturated(Exception):
+    """Raised when the pools are saturated; callers should retry later."""
+
+class AnalysisExecutor:
+    def __init__(self, parse_workers: Optional[int] = None, ai_workers: int = 8,
+                 max_pending: Optional[int] = None, inline_parse_bytes: int = 64 * 1024):
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.ai_workers = ai_workers
+        self.max_pending = max_pending or (self.parse_workers + self.ai_workers) * 4
+        # Tiny documents parse faster in place than the round trip to a worker process
+        self.inline_parse_bytes = inline_parse_bytes
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._ai_pool: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        # _pools() is also reached from job threads, not just the event loop
+        self._pools_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AnalysisExecutor":
+        """EDI_PARSE_WORKERS, EDI_AI_WORKERS, EDI_MAX_PENDING, EDI_INLINE_PARSE_BYTES."""
+        return cls(
+            parse_workers=int(os.environ.get("EDI_PARSE_WORKERS", "0")) or None,
+            ai_workers=int(os.environ.get("EDI_AI_WORKERS", "8")),
+            max_pending=int(os.environ.get("EDI_MAX_PENDING", "0")) or None,
+            inline_parse_bytes=int(os.environ.get("EDI_INLINE_PARSE_BYTES", str(64 * 1024))),
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _pools(self):
+        with self._pools_lock:
+            if self._parse_pool is None:
+                # spawn: forking a process that already runs an event loop and threads is unsafe
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+                self._ai_pool = ThreadPoolExecutor(max_workers=self.ai_workers, thread_name_prefix="edi-ai")
+            return self._parse_pool, self._ai_pool
+
+    async def _run_cpu(self, func, content, size: Optional[int] = None):
+        if (len(content) if size is None else size) <= self.inline_parse_bytes:
+            return func(content)
+        parse_pool, _ = self._pools()
+        if not metrics.enabled():
+            return await asyncio.get_running_loop().run_in_executor(parse_pool, func, content)
+        # Bring the worker's stage timings back into this process's /metrics
+        result, snapshot = await asyncio.get_running_loop().run_in_executor(
+            parse_pool, metrics.call_and_drain, func, content)
+        metrics.merge(snapshot)
+        return result
+
+    def _run_cpu_blocking(self, func, content):
+        """_run_cpu for threads outside the event loop: waits on the parse pool."""
+        if len(content) <= self.inline_parse_bytes:
+            return func(content)
+        parse_pool, _ = self._pools()
+        if not metrics.enabled():
+            return parse_pool.submit(func, content).result()
+        result, snapshot = parse_pool.submit(metrics.call_and_drain, func, content).result()
+        metrics.merge(snapshot)
+        return result
+
+    async def map_cpu(self, func: Callable, args: Iterable, sizes: Iterable[int]) -> AsyncIterator:
+        """
+        func(arg) for every arg on the parse pool (inline when its size is small),
+        yielded in input order. At most 2 * parse_workers calls are in flight, so
+        one large batch neither queues up the whole pool nor holds every result.
+        Counts as one pending analysis while it runs (check `pending` first).
+        """
+        window = 2 * self.parse_workers
+        running = deque()
+        self._pending += 1
+        try:
+            for arg, size in zip(args, sizes):
+                running.append(asyncio.ensure_future(self._run_cpu(func, arg, size)))
+                if len(running) >= window:
+                    yield await running.popleft()
+            while running:
+                yield await running.popleft()
+        finally:
+            self._pending -= 1
+            for task in running:
+                task.cancel()
+
+    async def parse(self, content: str) -> dict:
+        return await self._run_cpu(parse_edi, content)
+
+    async def analyze(self, content: str, use_cache: bool = True) -> dict:
+        """Async equivalent of analyze_edi_with_ai."""
+        result, _ = await self._analyze(content, use_cache)
+        return result
+
+    async def profile(self, content: str, kind: str):
+        """
+        analyze() with the parse + prompt build run under the profiler (see
+        metrics.profile_call) where they normally run, on the parse pool; returns
+        (result, report). Skips the cache so there is a parse to profile.
+        """
+        return await self._analyze(content, False, kind)
+
+    async def _analyze(self, content: str, use_cache: bool, profile: Optional[str] = None):
+        if self._pending >= self.max_pending:
+            raise AnalysisSaturated(f"{self._pending} analyses already in flight")
+        self._pending += 1
+        try:
+            key = None
+            if use_cache:
+                key = cache_key(content, MODEL_NAME, PROMPT_VERSION)
+                cached = cached_analysis(key, content)
+                if cached is not None:
+                    return cached, None
+
+            report = None
+            try:
+                if profile:
+                    (parsed, plan), report = await self._run_cpu(
+                        partial(metrics.profile_call, profile, prepare_analysis), content)
+                else:
+                    parsed, plan = await self._run_cpu(prepare_analysis, content)
+            except Exception as e:
+                return {"error": "Parser failure", "details": str(e)}, report
+
+            if plan is None:
+                return {"error": "Could not parse EDI, AI analysis skipped", "parsed": parsed}, report
+
+            _, ai_pool = self._pools()
+            result, cacheable = await asyncio.get_running_loop().run_in_executor(
+                ai_pool, run_analysis, parsed, plan)
+            if cacheable and key is not None:
+                cache_analysis(key, result)
+            return result, report
+        finally:
+            self._pending -= 1
+
+    def analyze_blocking(self, content: str) -> dict:
+        """
+        analyze() for a worker thread (background jobs): the parse and prompt build
+        run on the parse pool, the model call in the calling thread. Not counted in
+        `pending`; the job queue bounds its own concurrency per tier.
+        """
+        key = cache_key(content, MODEL_NAME, PROMPT_VERSION)
+        cached = cached_analysis(key, content)
+        if cached is not None:
+            return cached
+        try:
+            parsed, plan = self._run_cpu_blocking(prepare_analysis, content)
+        except Exception as e:
+            return {"error": "Parser failure", "details": str(e)}
+        if plan is None:
+            return {"error": "Could not parse EDI, AI analysis skipped", "parsed": parsed}
+        result, cacheable = run_analysis(parsed, plan)
+        if cacheable:
+            cache_analysis(key, result)
+        return result
+
+    def shutdown(self) -> None:
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._ai_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = self._ai_pool = None
@@ -0,0 +1,218 @@
+"""
+Request-path authentication for the SaaS backend (saas_backend/main.py).
+
+- TokenCache: bearer tokens that already passed jwt.decode, keyed by a SHA-256
+  of the token and kept no longer than the token's own `exp` (nor max_ttl), so
+  repeat calls with the same token skip the signature check.
+- User stores: `await store.get_user(username)`. MemoryUserStore wraps a dict
+  (the current mock users_db), PostgresUserStore queries a pooled asyncpg
+  connection (optional dependency, imported on first use). CachedUserStore puts
+  a short-TTL cache in front of either and merges concurrent lookups of the same
+  user into one query.
+- PasswordVerifier: bcrypt checks in a small dedicated thread pool, so a burst
+  of logins never blocks the event loop.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+# --- TOKENS ---
+
+class TokenCache:
+    """Thread-safe LRU of verified token payloads."""
+
+    def __init__(self, max_entries: int = 10000, max_ttl: float = 300.0, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        # Bounds how long a revoked signing key / secret keeps working for cached tokens
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenCache":
+        """EDI_TOKEN_CACHE_SIZE, EDI_TOKEN_CACHE_TTL (seconds)."""
+        return cls(max_entries=int(os.environ.get("EDI_TOKEN_CACHE_SIZE", "10000")),
+                   max_ttl=float(os.environ.get("EDI_TOKEN_CACHE_TTL", "300")))
+
+    @staticmethod
+    def key(token: str) -> str:
+        # The raw token never sits in memory as a dict key
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.key(token)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, token: str, payload: dict) -> None:
+        now = self.clock()
+        expires = now + self.max_ttl
+        exp = payload.get("exp")
+        if exp is not None:
+            expires = min(expires, float(exp))
+        if expires <= now:
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def verify(self, token: str, decode: Callable[[str], dict]) -> dict:
+        """Cached payload, or decode(token) (which raises on bad tokens; failures are not cached)."""
+        payload = self.get(token)
+        if payload is None:
+            payload = decode(token)
+            self.put(token, payload)
+        return payload
+
+# --- USERS ---
+
+class MemoryUserStore:
+    def __init__(self, users: Dict[str, dict]):
+        self.users = users
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        return self.users.get(username)
+
+    async def close(self) -> None:
+        pass
+
+class PostgresUserStore:
+    """`users` table through an asyncpg connection pool, created on first use."""
+    QUERY = ("SELECT username, full_name, hashed_password, is_active, subscription_tier "
+             "FROM users WHERE username = $1")
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    import asyncpg
+                    self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+        return self._pool
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        pool = await self._get_pool()
+        row = await pool.fetchrow(self.QUERY, username)
+        return dict(row) if row is not None else None
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+class CachedUserStore:
+    """
+    Short-TTL cache in front of a user store (one event loop; no locking).
+    Unknown users are not cached, so a new account works on its first request.
+    """
+    def __init__(self, store, ttl: float = 30.0, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_user(self, username: str, fresh: bool = False) -> Optional[dict]:
+        """fresh=True skips the cached copy (e.g. for login, after a password change)."""
+        entry = self._entries.get(username)
+        if not fresh and entry is not None and entry[1] > self.clock():
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+
+        pending = self._inflight.get(username)
+        if pending is None:
+            self.misses += 1
+            pending = self._inflight[username] = asyncio.ensure_future(self._load(username))
+        # Shielded: a cancelled request doesn't cancel the query other requests wait on
+        return await asyncio.shield(pending)
+
+    async def _load(self, username: str) -> Optional[dict]:
+        try:
+            user = await self.store.get_user(username)
+        finally:
+            self._inflight.pop(username, None)
+        if user is not None:
+            self._entries[username] = (user, self.clock() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.pop(username, None)
+        return user
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        if username is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(username, None)
+
+    async def close(self) -> None:
+        await self.store.close()
+
+def user_store_from_env(users: Dict[str, dict]) -> CachedUserStore:
+    """
+    EDI_DATABASE_URL (PostgreSQL DSN; the `users` dict is used when unset),
+    EDI_DB_POOL_SIZE, EDI_USER_CACHE_TTL (seconds).
+    """
+    dsn = os.environ.get("EDI_DATABASE_URL")
+    if dsn:
+        store = PostgresUserStore(dsn, max_size=int(os.environ.get("EDI_DB_POOL_SIZE", "10")))
+    else:
+        store = MemoryUserStore(users)
+    return CachedUserStore(store, ttl=float(os.environ.get("EDI_USER_CACHE_TTL", "30")))
+
+# --- PASSWORDS ---
+
+class PasswordVerifier:
+    """Runs a blocking verify(password, hash) (bcrypt) in its own thread pool."""
+
+    def __init__(self, verify: Callable[[str, str], bool], workers: int = 4):
+        self._verify = verify
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls, verify: Callable[[str, str], bool]) -> "PasswordVerifier":
+        """EDI_AUTH_WORKERS (bcrypt threads; bcrypt releases the GIL while hashing)."""
+        return cls(verify, workers=int(os.environ.get("EDI_AUTH_WORKERS", "4")))
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="edi-auth")
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self._verify, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,245 @@
+"""
+Bulk parsing for the /parse/batch endpoints: many documents per request.
+
+Input is a JSON array (EDI strings or {"name", "content"} objects), multipart
+file uploads, or a zip / tar(.gz) body; archives among the uploads are expanded.
+Documents are grouped into chunks of about EDI_BATCH_CHUNK_BYTES and parsed on
+the AnalysisExecutor's parse pool. Workers send back finished JSON lines, so the
+web process never re-serializes the results. Output is one record per document,
+in input order; a document that fails only fails its own record.
+"""
+import io
+import json
+import os
+import tarfile
+import zipfile
+from functools import partial
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .core import X12Tokenizer
+from .envelope import parse_store
+from .validation import new_marks, validate_store
+
+class BatchTooLarge(Exception):
+    """More documents or bytes than the batch limits allow (HTTP 413)."""
+
+class BatchLimits:
+    def __init__(self, max_items: int = 1000, max_bytes: int = 100 << 20, chunk_bytes: int = 256 << 10):
+        self.max_items = max_items
+        # Counted after decompression, so a small zip can't expand past it
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+
+    @classmethod
+    def from_env(cls) -> "BatchLimits":
+        """EDI_BATCH_MAX_ITEMS, EDI_BATCH_MAX_BYTES, EDI_BATCH_CHUNK_BYTES."""
+        return cls(max_items=int(os.environ.get("EDI_BATCH_MAX_ITEMS", "1000")),
+                   max_bytes=int(os.environ.get("EDI_BATCH_MAX_BYTES", str(100 << 20))),
+                   chunk_bytes=int(os.environ.get("EDI_BATCH_CHUNK_BYTES", str(256 << 10))))
+
+# --- INPUT ---
+
+def decode(data: bytes) -> str:
+    # X12 is ASCII in practice; latin-1 keeps any other byte instead of failing the item
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+def _skipped(name: str) -> bool:
+    """Archive noise: macOS resource forks and hidden files."""
+    return name.startswith("__MACOSX/") or os.path.basename(name).startswith(".")
+
+class Batch:
+    """Documents of one request, in order: {"name", "content"} or {"name", "error"}."""
+
+    def __init__(self, limits: Optional[BatchLimits] = None):
+        self.limits = limits or BatchLimits()
+        self.items: List[dict] = []
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _check(self, size: int) -> None:
+        """Raises BatchTooLarge unless one more document of `size` bytes fits."""
+        if len(self.items) >= self.limits.max_items:
+            raise BatchTooLarge(f"more than {self.limits.max_items} documents")
+        if self.nbytes + size > self.limits.max_bytes:
+            raise BatchTooLarge(f"more than {self.limits.max_bytes} bytes of documents")
+
+    def add(self, name: str, content: str) -> None:
+        self._check(len(content))
+        self.nbytes += len(content)
+        self.items.append({"name": name, "content": content})
+
+    def add_error(self, name: str, error: str) -> None:
+        self._check(0)
+        self.items.append({"name": name, "error": error})
+
+    def add_json(self, payload) -> None:
+        """A list (or {"documents": [...]}) of EDI strings / {"name", "content"} objects."""
+        if isinstance(payload, dict):
+            payload = payload.get("documents")
+        if not isinstance(payload, list):
+            raise ValueError('expected a JSON array of documents or {"documents": [...]}')
+        for index, doc in enumerate(payload):
+            name = str(index)
+            if isinstance(doc, dict):
+                name = str(doc.get("name", name))
+                doc = doc.get("content")
+            if isinstance(doc, str):
+                self.add(name, doc)
+            else:
+                self.add_error(name, "content must be a string")
+
+    def add_file(self, name: str, data: bytes) -> None:
+        """An uploaded file: zip and tar archives are expanded, anything else is one document."""
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            self._add_zip(data)
+            return
+        try:
+            archive = tarfile.open(fileobj=io.BytesIO(data), mode="r:*")
+        except tarfile.TarError:
+            self.add(name, decode(data))
+            return
+        with archive:
+            self._add_tar(archive)
+
+    def _add_zip(self, data: bytes) -> None:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or _skipped(info.filename):
+                    continue
+                # Declared size first: refuse a zip bomb before inflating it
+                self._check(info.file_size)
+                try:
+                    content = decode(archive.read(info))
+                except Exception as e:  # encrypted or corrupt member
+                    self.add_error(info.filename, f"unreadable archive member: {e}")
+                    continue
+                self.add(info.filename, content)
+
+    def _add_tar(self, archive: tarfile.TarFile) -> None:
+        for member in archive:
+            if not member.isfile() or _skipped(member.name):
+                continue
+            self._check(member.size)
+            try:
+                content = decode(archive.extractfile(member).read())
+            except Exception as e:
+                self.add_error(member.name, f"unreadable archive member: {e}")
+                continue
+            self.add(member.name, content)
+
+async def read_batch(request, limits: Optional[BatchLimits] = None) -> Batch:
+    """
+    Builds a Batch from a Starlette request: application/json, multipart/form-data
+    (every file part, plus text fields as documents) or a raw zip / tar / EDI body.
+    Raises ValueError for malformed input, BatchTooLarge past the limits.
+    """
+    batch = Batch(limits)
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > batch.limits.max_bytes:
+        raise BatchTooLarge(f"request body over {batch.limits.max_bytes} bytes")
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        batch.add_json(json.loads(await request.body()))
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        for key, value in form.multi_items():
+            if isinstance(value, str):
+                batch.add(key, value)
+            else:
+                batch.add_file(value.filename or key, await value.read())
+    else:
+        batch.add_file("body", await request.body())
+    if not batch.items:
+        raise ValueError("no documents in the request")
+    return batch
+
+# --- PARSING (worker side) ---
+
+def parse_document(content: str, validate: bool = False) -> dict:
+    """Typed parse of one document (the /parse/stream result shape), plus `validation` if asked."""
+    marks = new_marks() if validate else None
+    store = X12Tokenizer(content).tokenize(marks)
+    if not store:
+        return {"success": False, "error": "Empty or invalid EDI content"}
+    result = parse_store(store, validate=validate)
+    if validate:
+        result["validation"] = validate_store(store, marks, result)
+    return result
+
+def _record(index: int, name: str, result: dict) -> Tuple[bool, str]:
+    ok = bool(result.get("success"))
+    if ok:
+        record = {"type": "document", "index": index, "name": name, "success": True, "data": result}
+    else:
+        record = {"type": "document", "index": index, "name": name, "success": False,
+                  "error": result.get("error", "parse failed")}
+    return ok, json.dumps(record)
+
+def parse_chunk(chunk: List[Tuple[int, str, str]], validate: bool = False) -> List[Tuple[bool, str]]:
+    """(index, name, content) triples -> (success, JSON record) pairs; errors stay per document."""
+    lines = []
+    for index, name, content in chunk:
+        try:
+            result = parse_document(content, validate)
+        except Exception as e:
+            result = {"success": False, "error": f"Parsing failed: {e}"}
+        lines.append(_record(index, name, result))
+    return lines
+
+# --- RESULTS ---
+
+def _chunks(batch: Batch):
+    """Runs of consecutive documents of about chunk_bytes each (errors travel as None)."""
+    chunk, size = [], 0
+    for index, item in enumerate(batch.items):
+        if "error" in item:
+            chunk.append((index, item["name"], None))
+            continue
+        if chunk and size + len(item["content"]) > batch.limits.chunk_bytes:
+            yield chunk, size
+            chunk, size = [], 0
+        chunk.append((index, item["name"], item["content"]))
+        size += len(item["content"])
+    if chunk:
+        yield chunk, size
+
+async def iter_batch(executor, batch: Batch, validate: bool = False) -> AsyncIterator[Tuple[bool, str]]:
+    """(success, JSON record) per document, in input order, parsed on executor's pool."""
+    chunks = list(_chunks(batch))
+    work = ([doc for doc in chunk if doc[2] is not None] for chunk, _ in chunks)
+    results = executor.map_cpu(partial(parse_chunk, validate=validate), work, (size for _, size in chunks))
+    try:
+        for chunk, _ in chunks:
+            parsed = iter(await results.__anext__())
+            for index, name, content in chunk:
+                if content is None:
+                    yield _record(index, name, {"success": False, "error": batch.items[index]["error"]})
+                else:
+                    yield next(parsed)
+    finally:
+        # A client that disconnects mid-stream cancels the chunks still in flight
+        await results.aclose()
+
+async def ndjson_batch(records: AsyncIterator[Tuple[bool, str]]) -> AsyncIterator[str]:
+    """NDJSON body: one line per document as it finishes, then a summary line."""
+    count = failed = 0
+    async for ok, line in records:
+        count += 1
+        failed += not ok
+        yield line + "\n"
+    yield json.dumps({"type": "summary", "count": count, "failed": failed}) + "\n"
+
+async def json_batch(records: AsyncIterator[Tuple[bool, str]]) -> str:
+    """Single JSON body {"status", "count", "failed", "results": [...]}, spliced from the records."""
+    lines, failed = [], 0
+    async for ok, line in records:
+        lines.append(line)
+        failed += not ok
+    return (f'{{"status": "success", "count": {len(lines)}, "failed": {failed}, '
+            f'"results": [{", ".join(lines)}]}}')
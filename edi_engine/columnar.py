@@ -0,0 +1,386 @@
+"""
+COLUMNAR EXPORT: Line items and money lines from many documents as typed columns.
+
+One row per line item (PO1, IT1, W01, LIN/SN1, CLM, CLP), read straight off the
+segment store, with the document-level keys repeated on every row:
+
+    source, sender, receiver, transaction_set, control_number, document_id, document_date,
+    payer, segment, line, item_id, status, unit      -> str (None when absent)
+    qty, unit_price                                  -> float64 arrays (NaN when absent)
+    amount, billed, paid                             -> int64 arrays of cents (0 when absent)
+    claims, remits, denied                           -> int64 counts
+
+item_id is the SKU for goods and the claim id for CLM/CLP. amount is qty * unit_price
+for goods (rounded half away from zero to the cent) and the CLM02 charge for claims;
+billed / paid are CLP03 / CLP04 of a remittance, status its CLP02. Payer is NM1*PR (837),
+N1*PR (835) or N1*BT (810), falling back to the envelope receiver (837, 810) / sender (835).
+Money is parsed once into integer cents (utils.parse_fixed: no float on the way), so
+totals and rollups are exact; quantities and unit prices (which carry sub-cent
+precision) stay float64. Columns are array buffers, so to_numpy() is zero-copy;
+Arrow/Parquet and NumPy are optional and only imported by the methods that need them.
+
+Each 810 / 835 also keeps its declared total next to the computed one (TDS vs IT1
+lines +/- SAC; BPR02 vs CLP04 minus PLB adjustments), see unbalanced().
+
+    items = collect_line_items(paths)
+    items.totals("item_id")                     # {sku: cents}
+    items.totals(("sender", "item_id"), "qty")  # by partner and SKU
+    items.rollup("payer")                       # {payer: {"amount": cents, "billed": ..., "paid": ...}}
+    items.match_remittances()                   # 837 claims vs 835 payments, per claim id
+    items.write("day.parquet")                  # or .npz / .csv
+"""
+import csv
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .core import SegmentStore, X12MappedTokenizer, X12Tokenizer
+from .envelope import split_transactions
+from .dialect import parse_state
+from .logistics.orders import SKU_QUALIFIERS, find_sku
+from .logistics.shipping import W01_QUALIFIERS, w01_sku
+from .utils import format_date, parse_cents, parse_fixed, parse_implied_cents
+
+STRING_COLUMNS = ("source", "sender", "receiver", "transaction_set", "control_number",
+                  "document_id", "document_date", "payer", "segment", "line", "item_id", "status", "unit")
+FLOAT_COLUMNS = ("qty", "unit_price")
+CENTS_COLUMNS = ("amount", "billed", "paid")
+COUNT_COLUMNS = ("claims", "remits", "denied")
+INT_COLUMNS = CENTS_COLUMNS + COUNT_COLUMNS
+NUMERIC_COLUMNS = FLOAT_COLUMNS + INT_COLUMNS
+DOCUMENT_KEYS = STRING_COLUMNS[:7]
+# What item handlers return, in order
+ROW_COLUMNS = ("line", "item_id", "status", "qty", "unit", "unit_price") + INT_COLUMNS
+NAN = float("nan")
+DENIED = "4"  # CLP02 claim status: denied
+CLAIM_SEGMENTS = ("CLM", "CLP")
+
+def _number(text: Optional[str]) -> float:
+    try: return float(text)
+    except (ValueError, TypeError): return NAN
+
+def _round_div(value: int, unit: int) -> int:
+    """value / unit rounded half away from zero, in integers."""
+    quotient = (abs(value) + unit // 2) // unit
+    return quotient if value >= 0 else -quotient
+
+def _cents(text: Optional[str]) -> int:
+    cents = parse_cents(text)
+    return cents if cents is not None else 0
+
+# --- EXTRACTION ---
+# Header handlers fill the document keys and totals; item handlers return the new
+# row's values (ROW_COLUMNS).
+
+def _header(id_index: int, date_index: Optional[int]):
+    def handler(seg, doc, state):
+        doc["document_id"] = seg.get(id_index)
+        if date_index is not None:
+            doc["document_date"] = format_date(seg.get(date_index))
+    return handler
+
+def _party(entity: str, name_index: int):
+    """N1 / NM1 of the paying party: payer of the lines that follow."""
+    def handler(seg, doc, state):
+        if seg.get(1) == entity:
+            state["payer"] = seg.get(name_index)
+    return handler
+
+def _goods_line(seg, doc, state):
+    qty_text, price_text = seg.get(2), seg.get(4)
+    # qty (R) in 1e-4 units times price (R) in 1e-6 units -> 1e-10 dollars
+    qty, price = parse_fixed(qty_text, 4), parse_fixed(price_text, 6)
+    amount = _round_div(qty * price, 10 ** 8) if qty is not None and price is not None else 0
+    doc["computed"] += amount
+    sku = find_sku(seg, qualifiers=state.get("sku_qualifiers", SKU_QUALIFIERS))
+    return seg.get(1), sku, None, _number(qty_text), seg.get(3), _number(price_text), amount, 0, 0, 0, 0, 0
+
+def _w01(seg, doc, state):
+    state["line"] = state.get("line", 0) + 1
+    sku = w01_sku(seg, state.get("sku_qualifiers", W01_QUALIFIERS))
+    return str(state["line"]), sku, None, _number(seg.get(1)), seg.get(2), NAN, 0, 0, 0, 0, 0, 0
+
+def _hl(seg, doc, state):
+    state["level"] = seg.get(3)
+    state.pop("row", None)
+
+def _lin(seg, doc, state):
+    if state.get("level") == "I":
+        sku = find_sku(seg, 2, 3, state.get("sku_qualifiers", SKU_QUALIFIERS))
+        return seg.get(1), sku, None, NAN, None, NAN, 0, 0, 0, 0, 0, 0
+
+def _sn1(seg, doc, state):
+    # Quantity of the item opened by the last LIN
+    state["sn1"] = (_number(seg.get(2)), seg.get(3))
+
+def _sac(seg, doc, state):
+    # SAC05 is N2; allowances lower the invoice total, charges raise it
+    cents = parse_implied_cents(seg.get(5)) or 0
+    doc["computed"] += -cents if seg.get(1) == "A" else cents if seg.get(1) == "C" else 0
+
+def _tds(seg, doc, state):
+    doc["declared"] = parse_implied_cents(seg.get(1))
+
+def _clm(seg, doc, state):
+    state["line"] = state.get("line", 0) + 1
+    charged = _cents(seg.get(2))
+    return str(state["line"]), seg.get(1), None, NAN, None, NAN, charged, 0, 0, 1, 0, 0
+
+def _bpr(seg, doc, state):
+    doc["declared"] = parse_cents(seg.get(2))
+
+def _clp(seg, doc, state):
+    state["line"] = state.get("line", 0) + 1
+    paid = _cents(seg.get(4))
+    doc["computed"] += paid
+    status = seg.get(2)
+    return str(state["line"]), seg.get(1), status, NAN, None, NAN, 0, _cents(seg.get(3)), paid, 0, 1, int(status == DENIED)
+
+def _plb(seg, doc, state):
+    # Provider-level adjustments: (reason, amount) pairs from PLB03/04 on, taken out of the payment
+    for index in range(4, len(seg.elements), 2):
+        doc["computed"] -= _cents(seg.get(index))
+
+HANDLERS: Dict[str, Dict[str, object]] = {
+    "850": {"BEG": _header(3, 5), "PO1": _goods_line},
+    "810": {"BIG": _header(2, 1), "N1": _party("BT", 2), "IT1": _goods_line, "SAC": _sac, "TDS": _tds},
+    "940": {"W05": _header(2, None), "W01": _w01},
+    "856": {"BSN": _header(2, 3), "HL": _hl, "LIN": _lin, "SN1": _sn1},
+    "837": {"BHT": _header(3, 4), "NM1": _party("PR", 3), "CLM": _clm},
+    "835": {"TRN": _header(2, None), "N1": _party("PR", 2), "BPR": _bpr, "CLP": _clp, "PLB": _plb},
+}
+# Whose name stands in for the payer when the document doesn't carry one
+DEFAULT_PAYER = {"810": "receiver", "837": "receiver", "835": "sender"}
+
+class LineItemColumns:
+    """Column store for line items; append documents, then aggregate or export."""
+
+    def __init__(self):
+        self.columns: Dict[str, Union[list, array]] = {name: [] for name in STRING_COLUMNS}
+        self.columns.update((name, array('d')) for name in FLOAT_COLUMNS)
+        self.columns.update((name, array('q')) for name in INT_COLUMNS)
+        # One dict per document: DOCUMENT_KEYS + payer, declared / computed totals (cents)
+        self.documents: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.columns["segment"])
+
+    def _append(self, doc: dict, tag: str, payer, row: tuple) -> None:
+        columns = self.columns
+        for key in DOCUMENT_KEYS:
+            columns[key].append(doc.get(key))
+        columns["payer"].append(payer)
+        columns["segment"].append(tag)
+        for name, value in zip(ROW_COLUMNS, row):
+            columns[name].append(value)
+
+    def add_store(self, store: SegmentStore, source: str = "") -> int:
+        """Appends the line items of every supported transaction set in `store`; returns rows added."""
+        before = len(self)
+        for txn in split_transactions(store):
+            segments = txn.segments
+            st_index = segments.find_tag("ST")
+            transaction_set = segments[st_index].get(1) if st_index >= 0 else None
+            handlers = HANDLERS.get(transaction_set)
+            if handlers is None:
+                continue
+            doc = {"source": source, "transaction_set": transaction_set,
+                   "sender": txn.envelope.get("sender"), "receiver": txn.envelope.get("receiver"),
+                   "control_number": txn.envelope.get("control_number"),
+                   "document_id": None, "declared": None, "computed": 0}
+            state = parse_state(segments.dialect)
+            fallback = doc.get(DEFAULT_PAYER.get(transaction_set))
+            for handler, seg in segments.route(handlers):
+                row = handler(seg, doc, state)
+                if row is not None:
+                    self._append(doc, seg.tag, state.get("payer") or fallback, row)
+                    state["row"] = len(self) - 1
+                elif "sn1" in state:
+                    qty, unit = state.pop("sn1")
+                    if state.get("level") == "I" and "row" in state:
+                        self.columns["qty"][state["row"]] = qty
+                        self.columns["unit"][state["row"]] = unit
+            doc["payer"] = state.get("payer") or fallback
+            self.documents.append(doc)
+        return len(self) - before
+
+    def add_document(self, raw_content: str, source: str = "") -> int:
+        return self.add_store(X12Tokenizer(raw_content).tokenize(), source)
+
+    def extend(self, other: "LineItemColumns") -> None:
+        for name, values in other.columns.items():
+            self.columns[name].extend(values)
+        self.documents.extend(other.documents)
+
+    # --- AGGREGATION ---
+
+    def _group(self, by: Union[str, Tuple[str, ...]], names: Tuple[str, ...],
+               keys: Optional[list] = None) -> Tuple[list, List[list]]:
+        """
+        (unique keys, per-key sums of each column in `names`): exact int64 sums of the
+        integer columns, NaN counted as 0 in the float ones. NumPy when it is installed.
+        `keys` (one per row) overrides `by`.
+        """
+        strings = keys is None and isinstance(by, str)
+        if strings:
+            keys = [key or "" for key in self.columns[by]]
+        elif keys is None:
+            keys = list(zip(*(self.columns[name] for name in by)))
+        try:
+            import numpy as np
+        except ImportError:
+            index: dict = {}
+            inverse = [index.setdefault(key, len(index)) for key in keys]
+            sums = []
+            for name in names:
+                values = self.columns[name]
+                out = [0.0 if values.typecode == 'd' else 0] * len(index)
+                for slot, value in zip(inverse, values):
+                    if value == value:  # NaN
+                        out[slot] += value
+                sums.append(out)
+            return list(index), sums
+
+        if strings:
+            uniques, inverse = np.unique(np.array(keys, dtype=str), return_inverse=True)
+            uniques = uniques.tolist()
+        else:
+            # Composite (or given) keys: factorize in Python, sum vectorized
+            index = {}
+            inverse = np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.intp, count=len(keys))
+            uniques = list(index)
+        sums = []
+        for name in names:
+            values = self.columns[name]
+            if values.typecode == 'd':
+                weights = np.nan_to_num(np.frombuffer(values, dtype=np.float64)) if len(values) else np.zeros(0)
+                sums.append(np.bincount(inverse, weights=weights, minlength=len(uniques)).tolist())
+            else:
+                # int64 accumulation (np.bincount would go through float64 weights)
+                out = np.zeros(len(uniques), dtype=np.int64)
+                if len(values):
+                    np.add.at(out, inverse, np.frombuffer(values, dtype=np.int64))
+                sums.append(out.tolist())
+        return uniques, sums
+
+    def totals(self, by: Union[str, Tuple[str, ...]] = "item_id", value: str = "amount") -> dict:
+        """Sum of a numeric column per key (cents for the money columns, NaN counts as 0)."""
+        uniques, (sums,) = self._group(by, (value,))
+        return dict(zip(uniques, sums))
+
+    def rollup(self, by: Union[str, Tuple[str, ...]] = "payer",
+               names: Tuple[str, ...] = CENTS_COLUMNS) -> Dict[object, Dict[str, int]]:
+        """{key: {column: sum}} per value of `by` (a column or a tuple of columns)."""
+        uniques, sums = self._group(by, names)
+        return {key: dict(zip(names, values)) for key, values in zip(uniques, zip(*sums))}
+
+    def grand_totals(self) -> Dict[str, int]:
+        """Totals of every integer column (amounts in cents), plus the row count."""
+        totals = {name: sum(self.columns[name]) for name in INT_COLUMNS}
+        totals["rows"] = len(self)
+        return totals
+
+    def match_remittances(self) -> dict:
+        """
+        837 claims against 835 payments, joined on claim id (CLM01 / CLP01):
+        {"claims": {claim_id: {charged, billed, paid, balance, status}}, "summary": {...}}.
+        Status is unpaid (no 835 yet), unmatched (835 without an 837), denied,
+        paid, partial or overpaid; balance is charged - paid. Amounts in cents.
+        """
+        # Goods rows get one shared key (dropped below), so a SKU never meets a claim id
+        keys = [item_id if tag in CLAIM_SEGMENTS else None
+                for tag, item_id in zip(self.columns["segment"], self.columns["item_id"])]
+        uniques, sums = self._group("item_id", INT_COLUMNS, keys)
+        claims = {}
+        summary = {"claims": 0, "charged": 0, "paid": 0, "balance": 0}
+        for claim_id, charged, billed, paid, submitted, remits, denied in zip(uniques, *sums):
+            if not submitted and not remits:
+                continue  # goods lines
+            if not remits:
+                status = "unpaid"
+            elif not submitted:
+                status = "unmatched"
+            elif denied and not paid:
+                status = "denied"
+            else:
+                status = "paid" if paid == charged else "partial" if paid < charged else "overpaid"
+            balance = charged - paid if submitted else 0
+            claims[claim_id] = {"charged": charged, "billed": billed, "paid": paid,
+                                "balance": balance, "status": status}
+            summary["claims"] += 1
+            summary[status] = summary.get(status, 0) + 1
+            summary["charged"] += charged
+            summary["paid"] += paid
+            summary["balance"] += balance
+        return {"claims": claims, "summary": summary}
+
+    def unbalanced(self) -> List[dict]:
+        """Documents whose declared total (TDS / BPR02) differs from their lines."""
+        return [doc for doc in self.documents
+                if doc["declared"] is not None and doc["declared"] != doc["computed"]]
+
+    # --- EXPORT ---
+
+    def to_numpy(self) -> dict:
+        """name -> ndarray (float64 / int64 views over the numeric buffers, object arrays for strings)."""
+        import numpy as np
+        out = {name: np.array(self.columns[name], dtype=object) for name in STRING_COLUMNS}
+        for name in NUMERIC_COLUMNS:
+            dtype = np.float64 if name in FLOAT_COLUMNS else np.int64
+            out[name] = np.frombuffer(self.columns[name], dtype=dtype) if len(self) else np.zeros(0, dtype)
+        return out
+
+    def to_arrow(self):
+        import pyarrow as pa
+        arrays = {name: pa.array(self.columns[name], type=pa.string()) for name in STRING_COLUMNS}
+        for name in FLOAT_COLUMNS:
+            # NaN placeholders become proper nulls
+            values = self.columns[name]
+            arrays[name] = pa.array(values, type=pa.float64(), mask=[math.isnan(v) for v in values])
+        for name in INT_COLUMNS:
+            arrays[name] = pa.array(self.columns[name], type=pa.int64())
+        return pa.table(arrays)
+
+    def to_pandas(self):
+        return self.to_arrow().to_pandas()
+
+    def write(self, path: str) -> str:
+        """Writes .parquet (pyarrow), .npz (numpy) or, for anything else, CSV."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(self.to_arrow(), path)
+        elif ext == ".npz":
+            import numpy as np
+            np.savez_compressed(path, **self.to_numpy())
+        else:
+            names = STRING_COLUMNS + NUMERIC_COLUMNS
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                for row in zip(*(self.columns[name] for name in names)):
+                    writer.writerow(["" if isinstance(v, float) and math.isnan(v) else v for v in row])
+        return path
+
+# --- MANY FILES ---
+
+def line_items_for_file(path: str) -> LineItemColumns:
+    """Line items of one file, tokenized through mmap."""
+    items = LineItemColumns()
+    items.add_store(X12MappedTokenizer(path).tokenize(), path)
+    return items
+
+def collect_line_items(paths: Iterable[str], workers: Optional[int] = None) -> LineItemColumns:
+    """Line items of many files; workers > 1 spreads the files over a process pool."""
+    items = LineItemColumns()
+    paths = list(paths)
+    if workers and workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(line_items_for_file, paths, chunksize=max(1, len(paths) // (workers * 4))):
+                items.extend(part)
+    else:
+        for path in paths:
+            items.extend(line_items_for_file(path))
+    return items
@@ -0,0 +1,235 @@
+"""
+PARTNER DIALECTS: Per-trading-partner delimiter, version and rule profiles.
+
+Every file from one partner shares a dialect: the separators declared in ISA,
+the version (ISA12 / GS08) and any partner-specific rules (e.g. which
+qualifiers mark a part number). Profiles are cached by the raw ISA
+sender/receiver text, so a repeat file from a partner resolves with a slice, a
+dict lookup and a compare of the separator, ISA11/ISA12/ISA16 and terminator
+characters of its fixed-width header: no delimiter detection, no split, no lock.
+A partner that changes any of them gets a fresh profile. The Dialect carries
+the scan settings (separators, terminator, newline handling) the tokenizers
+use. Parsers see the dialect through `state` (see parse_state).
+
+Partner rules come from EDI_PARTNER_RULES, a JSON file keyed by ISA06 sender ID
+or "SENDER/RECEIVER" (the pair wins):
+
+    {"ACME": {"sku_qualifiers": ["IN", "VP"]}}
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from .core import DEFAULT_DELIMS, ISA_LENGTH, EDISegment, detect_delimiters, detect_separators
+
+# Fixed-width ISA layout: ISA05-ISA08 (sender/receiver with their qualifiers) is the cache key,
+# the element separator sits at _SEPARATORS and ISA11, ISA12 and ISA16 at the rest of _SIGNATURE
+PARTNER_SLICE = slice(32, 69)
+_SEPARATORS = (3, 6, 17, 20, 31, 34, 50, 53, 69, 76, 81, 83, 89, 99, 101, 103)
+_SIGNATURE = itemgetter(*_SEPARATORS, 82, 84, 85, 86, 87, 88, 104)
+
+class Dialect:
+    """Separators, version and rules of one partner's interchanges."""
+    __slots__ = ("element_sep", "segment_term", "strip_newlines", "delims", "version", "gs_version",
+                 "sku_qualifiers", "partner", "signature")
+
+    def __init__(self, element_sep: str = "*", segment_term: Optional[str] = "~",
+                 delims: Tuple[str, Optional[str]] = DEFAULT_DELIMS, version: Optional[str] = None,
+                 sku_qualifiers: Optional[Tuple[str, ...]] = None):
+        self.element_sep = element_sep
+        self.segment_term = segment_term
+        # Line breaks are dropped before scanning unless they terminate segments
+        self.strip_newlines = segment_term not in ['\n', '\r']
+        self.delims = delims
+        self.version = version          # ISA12
+        self.gs_version = None          # GS08, filled in by the first tokenized file
+        self.sku_qualifiers = sku_qualifiers
+        self.partner: Optional[Tuple[str, str]] = None   # (sender, receiver), see partner_key
+        self.signature: Optional[tuple] = None           # header characters a cached profile is matched on
+
+    def matches(self, element_sep: str, fields: List[str]) -> bool:
+        """Same separators and version as the ISA elements `fields` (the terminator is checked by the caller)."""
+        return (element_sep == self.element_sep and (fields[16][:1] or DEFAULT_DELIMS[0]) == self.delims[0]
+                and _repetition(fields[11]) == self.delims[1] and (fields[12].strip() or None) == self.version)
+
+    def note_gs_version(self, store) -> None:
+        """Records GS08 from the first tokenized file (one tag-array scan per profile)."""
+        gs_index = store.find_tag("GS")
+        if gs_index >= 0:
+            self.gs_version = store[gs_index].get(8)
+
+    def __repr__(self) -> str:
+        return (f"Dialect({self.element_sep!r}, {self.segment_term!r}, {self.delims!r}, "
+                f"version={self.version!r}, sku_qualifiers={self.sku_qualifiers!r})")
+
+DEFAULT_DIALECT = Dialect()
+
+def _repetition(isa11: str) -> Optional[str]:
+    # ISA11 is the repetition separator from 00402 on, the 'U' standards id before that
+    return isa11 if len(isa11) == 1 and not isa11.isalnum() else None
+
+def isa_fields(header: str, element_sep: str) -> Optional[List[str]]:
+    """ISA elements of an interchange header (as detect_separators reads them), or None."""
+    if not header.startswith("ISA"):
+        return None
+    fields = header[:ISA_LENGTH - 1].split(element_sep)
+    return fields if len(fields) >= 17 else None
+
+def partner_key(fields: List[str]) -> Tuple[str, str]:
+    """(ISA06 sender, ISA08 receiver) without the fixed-width padding."""
+    return fields[6].strip(), fields[8].strip()
+
+def _fixed_width(header: str, element_sep: str) -> bool:
+    # Every separator where the standard layout puts it, so the slices above line up
+    return len(header) >= ISA_LENGTH - 1 and _SIGNATURE(header)[:len(_SEPARATORS)] == (element_sep,) * len(_SEPARATORS)
+
+def parse_state(dialect: Optional[Dialect]) -> dict:
+    """Initial handler state: the dialect, plus its rules under the keys the parsers read."""
+    if dialect is None:
+        return {}
+    state = {"dialect": dialect}
+    if dialect.sku_qualifiers:
+        state["sku_qualifiers"] = dialect.sku_qualifiers
+    return state
+
+class DialectCache:
+    """
+    Thread-safe LRU of partner dialects, keyed by the raw ISA sender/receiver
+    slice. Hits take no lock (dict reads and move_to_end are atomic); misses
+    build and store the profile under the lock. `hits` is approximate under threads.
+    """
+
+    def __init__(self, max_entries: int = 1024, rules: Optional[Dict[str, dict]] = None):
+        self.max_entries = max_entries
+        self.rules: Dict[str, dict] = dict(rules or {})
+        self._entries: "OrderedDict[str, Dialect]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "DialectCache":
+        """EDI_DIALECT_CACHE_SIZE, EDI_PARTNER_RULES (path to the partner rules JSON)."""
+        rules = None
+        path = os.environ.get("EDI_PARTNER_RULES")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                rules = json.load(f)
+        return cls(max_entries=int(os.environ.get("EDI_DIALECT_CACHE_SIZE", "1024")), rules=rules)
+
+    def set_rules(self, sender: str, receiver: Optional[str] = None, **rules) -> None:
+        """Partner rules (sku_qualifiers=[...]); replaces cached profiles of that partner."""
+        self.rules[f"{sender}/{receiver}" if receiver else sender] = rules
+        with self._lock:
+            for key in [k for k, d in self._entries.items()
+                        if d.partner[0] == sender and receiver in (None, d.partner[1])]:
+                del self._entries[key]
+
+    def _new(self, fields: List[str], element_sep: str, segment_term: Optional[str]) -> Dialect:
+        sender, receiver = partner_key(fields)
+        rules = self.rules.get(f"{sender}/{receiver}") or self.rules.get(sender) or {}
+        qualifiers = rules.get("sku_qualifiers")
+        dialect = Dialect(element_sep, segment_term, (fields[16][:1] or DEFAULT_DELIMS[0], _repetition(fields[11])),
+                          fields[12].strip() or None, tuple(qualifiers) if qualifiers else None)
+        dialect.partner = (sender, receiver)
+        return dialect
+
+    def cached(self, header: str) -> Optional[Dialect]:
+        """
+        The stored profile of a header whose partner slice, separators, ISA11/ISA12/ISA16
+        and terminator all match; None otherwise. No detection, split or lock.
+        """
+        if len(header) < ISA_LENGTH:
+            return None
+        dialect = self._match(header)
+        return dialect if dialect is not None and header[ISA_LENGTH - 1] == dialect.segment_term else None
+
+    def _match(self, header: str) -> Optional[Dialect]:
+        # cached() without the terminator (ISA segment text from a tokenizer has none)
+        dialect = self._entries.get(header[PARTNER_SLICE])
+        if dialect is None or len(header) < ISA_LENGTH - 1 or not header.startswith("ISA") \
+                or _SIGNATURE(header) != dialect.signature:
+            return None
+        try:
+            self._entries.move_to_end(header[PARTNER_SLICE])
+        except KeyError:
+            pass  # evicted by another thread since the read
+        self.hits += 1
+        return dialect
+
+    def resolve(self, header: str) -> Dialect:
+        """
+        Profile (and with it the delimiters) of the interchange starting with `header`:
+        the cached one when it matches, else detected, stored and returned.
+        """
+        dialect = self.cached(header)
+        if dialect is not None:
+            return dialect
+        element_sep, segment_term = detect_delimiters(header)
+        if segment_term not in ['\n', '\r']:
+            # Unless a line break ends the segments, the tokenizers drop them before
+            # splitting, so the delimiters are read from the header without them too
+            header = header[:2 * ISA_LENGTH].replace('\n', '').replace('\r', '')
+            element_sep, segment_term = detect_delimiters(header)
+        return self.lookup(element_sep, segment_term, header)
+
+    def lookup(self, element_sep: str, segment_term: str, header: str) -> Dialect:
+        """
+        Profile of an interchange whose delimiters detect_delimiters() read; the ISA
+        elements come from `header` as detect_separators() would read them. Content
+        without a full, fixed-width ISA header gets an uncached profile.
+        """
+        fields = isa_fields(header, element_sep)
+        if fields is None:
+            return Dialect(element_sep, segment_term, detect_separators(header, element_sep))
+        if not _fixed_width(header, element_sep):
+            self.misses += 1
+            return self._new(fields, element_sep, segment_term)
+        key = header[PARTNER_SLICE]
+        with self._lock:
+            dialect = self._entries.get(key)
+            if (dialect is not None and dialect.matches(element_sep, fields)
+                    and segment_term == dialect.segment_term):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dialect
+            self.misses += 1
+            dialect = self._new(fields, element_sep, segment_term)
+            dialect.signature = _SIGNATURE(header)
+            self._entries[key] = dialect
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return dialect
+
+    def for_isa(self, seg: EDISegment) -> Dialect:
+        """
+        Profile for an already tokenized ISA segment (the streaming route has no
+        header text): the cached one when its text matches, else an uncached one.
+        """
+        if len(seg.elements) < 17:
+            return DEFAULT_DIALECT
+        dialect = self._match(seg.raw)
+        if dialect is not None:
+            return dialect
+        self.misses += 1
+        return self._new(seg.elements, seg.element_sep, None)
+
+_profiles: Optional[DialectCache] = None
+_profiles_lock = threading.Lock()
+
+def get_profiles() -> DialectCache:
+    """Process-wide partner profile cache, configured from the environment on first use."""
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                _profiles = DialectCache.from_env()
+    return _profiles
+
+def set_profiles(cache: Optional[DialectCache]) -> None:
+    """Replaces the process-wide cache (None: rebuild from the environment on next use)."""
+    global _profiles
+    _profiles = cache
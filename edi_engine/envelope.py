@@ -0,0 +1,163 @@
+"""
+ENVELOPE ENGINE: Splits an interchange into its ISA/GS/ST transaction sets
+and parses each one on its own, optionally across a process pool.
+"""
+import os
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .core import EDISegment, SegmentStore, X12Tokenizer
+from .registry import parse_segments
+
+class Transaction:
+    """One ST..SE transaction set plus the ISA/GS envelope it arrived in."""
+    __slots__ = ("envelope", "segments")
+
+    def __init__(self, envelope: dict, segments):
+        self.envelope = envelope
+        self.segments = segments
+
+def _interchange_info(isa: EDISegment) -> dict:
+    return {
+        "sender": isa.get(6),
+        "receiver": isa.get(8),
+        "interchange_control": isa.get(13),
+    }
+
+def _group_info(gs: EDISegment) -> dict:
+    return {
+        "functional_id": gs.get(1),
+        "group_control": gs.get(6),
+        "version": gs.get(8),
+    }
+
+def transaction_bounds(store: SegmentStore) -> Iterator[Tuple[dict, int, int]]:
+    """(envelope, first, stop) segment index ranges of the ST..SE sets in a store."""
+    interchange: dict = {}
+    group: dict = {}
+    st_index = None
+    st_control = None
+
+    for index, tag in enumerate(store.iter_tags()):
+        if tag == "ST":
+            if st_index is not None:
+                # Missing SE: close the open set right before the new ST
+                yield {**interchange, **group, "control_number": st_control}, st_index, index
+            st_index = index
+            st_control = store[index].get(2)
+        elif tag == "SE":
+            if st_index is not None:
+                yield {**interchange, **group, "control_number": st_control}, st_index, index + 1
+                st_index = None
+        elif st_index is not None and tag in ("GE", "IEA", "GS", "ISA"):
+            yield {**interchange, **group, "control_number": st_control}, st_index, index
+            st_index = None
+
+        if tag == "ISA":
+            interchange = _interchange_info(store[index])
+            group = {}
+        elif tag == "GS":
+            group = _group_info(store[index])
+
+    if st_index is not None:
+        yield {**interchange, **group, "control_number": st_control}, st_index, len(store)
+
+def _split_store(store: SegmentStore) -> Iterator[Transaction]:
+    for envelope, first, stop in transaction_bounds(store):
+        yield Transaction(envelope, store.window(first, stop))
+
+def _split_stream(segments: Iterable[EDISegment]) -> Iterator[Transaction]:
+    interchange: dict = {}
+    group: dict = {}
+    current: Optional[List[EDISegment]] = None
+    envelope: dict = {}
+
+    for seg in segments:
+        tag = seg.tag
+        if current is not None and tag in ("ST", "GE", "IEA", "GS", "ISA"):
+            yield Transaction(envelope, current)
+            current = None
+
+        if tag == "ST":
+            current = [seg]
+            envelope = {**interchange, **group, "control_number": seg.get(2)}
+        elif current is not None:
+            current.append(seg)
+            if tag == "SE":
+                yield Transaction(envelope, current)
+                current = None
+        elif tag == "ISA":
+            interchange = _interchange_info(seg)
+            group = {}
+        elif tag == "GS":
+            group = _group_info(seg)
+
+    if current is not None:
+        yield Transaction(envelope, current)
+
+def split_transactions(segments: Iterable[EDISegment]) -> Iterator[Transaction]:
+    """
+    Yields one Transaction per ST..SE set. A SegmentStore is split into
+    windows over the shared buffer; any other iterable is consumed lazily.
+    """
+    if isinstance(segments, SegmentStore):
+        return _split_store(segments)
+    return _split_stream(segments)
+
+def parse_transactions(transactions: List[Transaction], parallel: bool = False,
+                       max_workers: Optional[int] = None, validate: bool = False) -> List[dict]:
+    """Parses each transaction set; results keep input order and carry an `envelope` key."""
+    batches = [t.segments for t in transactions]
+    parse = partial(parse_segments, validate=True) if validate else parse_segments
+    if parallel and len(batches) > 1:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(batches) // (workers * 4))
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing only when asked for
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse, batches, chunksize=chunksize))
+    else:
+        results = [parse(batch) for batch in batches]
+
+    for transaction, result in zip(transactions, results):
+        result["envelope"] = transaction.envelope
+    return results
+
+def parse_store(segments: SegmentStore, parallel: bool = False, validate: bool = False) -> dict:
+    """
+    Typed parse of already-tokenized segments (the parse_edi result shape).
+    validate=True adds each set's required-element "errors" (see validation.validate_store).
+    """
+    if segments.count_tag("ST") <= 1:
+        # Type detection and routing happen in one pass over the segments
+        return parse_segments(segments, validate)
+
+    # Several transaction sets in one interchange: parse each on its own
+    results = parse_transactions(list(split_transactions(segments)), parallel=parallel, validate=validate)
+    return interchange_result(results, len(segments))
+
+def interchange_result(results: List[dict], segments_read: int) -> dict:
+    """Combined result for an interchange holding several transaction sets."""
+    doc_types = list(dict.fromkeys(r.get("detected_type") for r in results))
+    return {
+        "success": all(r.get("success") for r in results),
+        "detected_type": doc_types[0] if len(doc_types) == 1 else "Multiple",
+        "segments_read": segments_read,
+        "transaction_count": len(results),
+        "data": {"doc_type": "Interchange", "transactions": results}
+    }
+
+def parse_interchange(raw_content: str, parallel: bool = False,
+                      max_workers: Optional[int] = None) -> List[dict]:
+    """
+    ENVELOPE-AWARE ENTRY POINT: one result per ISA/GS/ST transaction set.
+    With parallel=True the sets are parsed across a process pool.
+    """
+    segments = X12Tokenizer(raw_content).tokenize()
+    if not segments:
+        return [{"error": "Empty or invalid EDI content", "success": False}]
+
+    transactions = list(split_transactions(segments))
+    if not transactions:
+        # No ST at all: fall back to a single (generic) parse of everything
+        return [parse_segments(segments)]
+    return parse_transactions(transactions, parallel=parallel, max_workers=max_workers)
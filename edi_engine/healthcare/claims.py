@@ -0,0 +1,76 @@
+from ..registry import register
+from ..utils import dollars, format_date, mask_pii, parse_cents
+
+# Amounts are parsed once to integer cents (*_cents keys) and summed exactly;
+# the dollar keys (amount, paid, total_paid...) are derived from them
+
+claim_837 = register("837", lambda: {"doc_type": "837 Medical Claim", "claims": [], "total_charge": 0.0,
+                                     "total_charge_cents": 0})
+
+@claim_837.on("BHT")
+def _837_bht(seg, data, state):
+    data["creation_date"] = format_date(seg.get(4))
+
+@claim_837.on("NM1")
+def _837_nm1(seg, data, state):
+    current_claim = state.get("claim")
+    role = seg.get(1)
+    if role == "85": # Billing Provider
+        if current_claim: current_claim["provider"] = seg.get(3)
+    elif role == "IL": # Insured/Subscriber
+        if current_claim: current_claim["patient_id_masked"] = mask_pii(seg.get(9))
+
+@claim_837.on("CLM")
+def _837_clm(seg, data, state):
+    cents = parse_cents(seg.get(2))
+    data["total_charge_cents"] += cents or 0
+    data["total_charge"] = dollars(data["total_charge_cents"])
+    current_claim = state["claim"] = {
+        "claim_id": seg.get(1),
+        "amount": dollars(cents),
+        "amount_cents": cents,
+        "diagnoses": [],
+        "provider": "Unknown",
+        "patient_id_masked": "Unknown"
+    }
+    data["claims"].append(current_claim)
+
+@claim_837.on("HI")
+def _837_hi(seg, data, state):
+    codes = []
+    # Composites use the interchange's ISA16 component separator (':' or '>' in practice)
+    for i in range(1, len(seg.elements)):
+        parts = seg.components(i)
+        if len(parts) > 1: codes.append(parts[1])
+    current_claim = state.get("claim")
+    if current_claim:
+        current_claim["diagnoses"] = codes
+
+parse_837_claim = claim_837.parse
+
+payment_835 = register("835", lambda: {"doc_type": "835 Payment", "payments": [], "total_claims_paid": 0.0,
+                                       "total_claims_paid_cents": 0})
+
+@payment_835.on("TRN")
+def _835_trn(seg, data, state):
+    data["check_number"] = seg.get(2)
+
+@payment_835.on("BPR")
+def _835_bpr(seg, data, state):
+    cents = parse_cents(seg.get(2))
+    data["total_paid"] = dollars(cents)
+    data["total_paid_cents"] = cents
+
+@payment_835.on("CLP")
+def _835_clp(seg, data, state):
+    cents = parse_cents(seg.get(4))
+    data["total_claims_paid_cents"] += cents or 0
+    data["total_claims_paid"] = dollars(data["total_claims_paid_cents"])
+    data["payments"].append({
+        "claim_id": seg.get(1),
+        "status": seg.get(2),
+        "paid": dollars(cents),
+        "paid_cents": cents
+    })
+
+parse_835_payment = payment_835.parse
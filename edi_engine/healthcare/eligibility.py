@@ -0,0 +1,21 @@
+from ..registry import register
+from ..utils import mask_pii
+
+inquiry_270 = register("270", lambda: {"doc_type": "270 Inquiry", "patient_masked": None})
+
+@inquiry_270.on("NM1")
+def _270_nm1(seg, data, state):
+    if seg.get(1) == "IL":
+         data["patient_masked"] = mask_pii(seg.get(9))
+
+parse_270_inquiry = inquiry_270.parse
+
+eligibility_271 = register("271", lambda: {"doc_type": "271 Response", "status": "Unknown"})
+
+@eligibility_271.on("EB")
+def _271_eb(seg, data, state):
+    code = seg.get(1)
+    data["status"] = "Active" if code == "1" else f"Code {code}"
+    data["plan"] = seg.get(5)
+
+parse_271_eligibility = eligibility_271.parse
@@ -0,0 +1,343 @@
+"""
+INCREMENTAL ENGINE: Long-lived parse sessions for the desktop editor.
+
+A session keeps the editor text, its segment offsets (in editor coordinates) and
+the last typed result. An edit replaces text[start:end]; only the segments between
+the terminators around the edit are re-scanned, and only the transaction set that
+holds them is parsed again. Each edit returns a JSON Patch (RFC 6902) from the
+previous result to the new one, so the renderer can update just what changed.
+
+    session = EditSession(content)            # session.result == parse_store(...) of content
+    ops = session.edit(120, 121, "5")         # [{"op": "replace", "path": "/data/items/0/qty", "value": 5}]
+
+Offsets are Python string indices (code points); they match a JS textarea's
+selection offsets unless the text holds characters outside the BMP.
+Edits touching the ISA header (which declares the delimiters) re-tokenize everything.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from . import dialect as dialects
+from .core import ISA_LENGTH, MappedText, SegmentStore, _scan_segments
+from .envelope import interchange_result, transaction_bounds
+from .registry import get_parser, parse_segments
+
+# Tags that move transaction boundaries or envelopes
+ENVELOPE_TAGS = {"ISA", "GS", "ST", "SE", "GE", "IEA"}
+# Segments around a lone set that a whole-document parse ignores
+OUTER_TAGS = {"ISA", "GS", "GE", "IEA"}
+# Out-of-order edits held per session until the versions before them arrive
+MAX_QUEUED_EDITS = 64
+
+class EditSession:
+    def __init__(self, content: str):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._queued: Dict[int, List[dict]] = {}
+        self.failed: Optional[str] = None  # set once the text may no longer match the editor's
+        self._load(content)
+        self.result = self._assemble()
+
+    # --- TOKENIZING ---
+
+    def _load(self, content: str) -> None:
+        """Full tokenize of `content` (new session, or an edit inside the ISA header)."""
+        self.text = content
+        start = len(content) - len(content.lstrip())
+        total = len(content.rstrip())
+        self._header_limit = start + ISA_LENGTH
+        # Delimiters as X12Tokenizer reads them (see DialectCache.resolve)
+        profile = dialects.get_profiles().resolve(content[start:min(start + 2 * ISA_LENGTH, total)])
+        self.element_sep, self.segment_term = profile.element_sep, profile.segment_term
+        self.strip_newlines = profile.strip_newlines
+        self._tag_index: Dict[str, int] = {}
+        self.store = SegmentStore(MappedText(content, strip_newlines=self.strip_newlines), self.element_sep,
+                                  delims=profile.delims, dialect=profile)
+        if start < total:
+            _scan_segments(self.store, content, self.element_sep, self.segment_term, start, total,
+                           strip_newlines=self.strip_newlines, tag_index=self._tag_index)
+        # [first, stop, envelope, result] per transaction set
+        self.transactions = [[first, stop, envelope, None] for envelope, first, stop in transaction_bounds(self.store)]
+
+    def _header_end(self) -> int:
+        # Delimiters come from the first ISA_LENGTH characters, whatever segments they hold
+        return max(self._header_limit, self.store._ends[0] if len(self.store) else len(self.text))
+
+    def _splice(self, text: str, start: int, end: int) -> Optional[tuple]:
+        """
+        Applies one edit to the text and the segment arrays. Returns (i, j, added, structural):
+        old segments [i, j) were replaced by `added` new ones. None means the store was rebuilt.
+        """
+        old = self.text
+        new = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        term = self.segment_term
+        if start <= self._header_end() or not len(self.store):
+            self._load(new)
+            return None
+
+        # The edit's segments: from the terminator before it to the first one at/after its end
+        region_start = old.rfind(term, 0, start) + 1
+        region_end = old.find(term, end)
+        if region_end < 0:
+            region_end = len(old)
+
+        store = self.store
+        i = bisect_left(store._starts, region_start)
+        j = bisect_right(store._starts, region_end)
+        new_end = region_end + delta
+        if new_end >= len(new):
+            new_end = len(new.rstrip())
+
+        buffer = MappedText(new, strip_newlines=self.strip_newlines)
+        scanned = SegmentStore(buffer, self.element_sep, delims=store.delims)
+        scanned._tags = store._tags
+        if region_start < new_end:
+            _scan_segments(scanned, new, self.element_sep, term, region_start, new_end,
+                           strip_newlines=self.strip_newlines, tag_index=self._tag_index)
+
+        tags = store._tags
+        structural = any(tags[t] in ENVELOPE_TAGS for t in store._tag_ids[i:j]) or \
+            any(tags[t] in ENVELOPE_TAGS for t in scanned._tag_ids)
+
+        shift = delta.__add__
+        store._starts = store._starts[:i] + scanned._starts + array(store._starts.typecode, map(shift, store._starts[j:]))
+        store._ends = store._ends[:i] + scanned._ends + array(store._ends.typecode, map(shift, store._ends[j:]))
+        store._tag_ids = store._tag_ids[:i] + scanned._tag_ids + store._tag_ids[j:]
+        store.buffer = buffer
+        self.text = new
+        return i, j, len(scanned), structural
+
+    def _update_transactions(self, i: int, j: int, added: int, structural: bool) -> None:
+        moved = added - (j - i)
+        if not structural:
+            for txn in self.transactions:
+                first, stop = txn[0], txn[1]
+                if first >= j:
+                    txn[0], txn[1] = first + moved, stop + moved
+                elif stop < i or (stop == i and self.store.tag(stop - 1) == "SE"):
+                    continue
+                else:
+                    # Edited segments are inside this set (or appended to one left open without SE)
+                    txn[1] = stop + moved
+                    txn[3] = None
+            return
+
+        # Boundaries moved: split again, keeping results of sets the edit didn't reach
+        before = {(t[0], t[1]): t[3] for t in self.transactions if t[1] <= i}
+        after = {(t[0] + moved, t[1] + moved): t[3] for t in self.transactions if t[0] >= j}
+        transactions = []
+        for envelope, first, stop in transaction_bounds(self.store):
+            result = None
+            if stop <= i:
+                result = before.get((first, stop))
+            elif first >= j + moved:
+                result = after.get((first, stop))
+            if result is not None and result.get("envelope") != envelope:
+                result = {**result, "envelope": envelope}
+            transactions.append([first, stop, envelope, result])
+        self.transactions = transactions
+
+    # --- PARSING ---
+
+    def _assemble(self) -> dict:
+        """Same shape as parse_store(), parsing only sets without a cached result."""
+        store = self.store
+        if not len(store):
+            return {"error": "Empty or invalid EDI content", "success": False}
+        if len(self.transactions) == 1:
+            return self._assemble_single()
+        if not self.transactions:
+            return parse_segments(store)
+        for txn in self.transactions:
+            if txn[3] is None:
+                result = parse_segments(store.window(txn[0], txn[1]))
+                result["envelope"] = txn[2]
+                txn[3] = result
+        return interchange_result([t[3] for t in self.transactions], len(store))
+
+    def _assemble_single(self) -> dict:
+        # One typed set wrapped only in ISA/GS/GE/IEA parses the same on its own, so it
+        # is cached like the sets of a larger interchange (edits outside it parse nothing).
+        # The generic fallback lists every segment, so it still needs the whole store.
+        store = self.store
+        txn = self.transactions[0]
+        tags = store._tags
+        if get_parser(store[txn[0]].get(1)) is None or \
+                not all(tags[t] in OUTER_TAGS for t in store._tag_ids[:txn[0]]) or \
+                not all(tags[t] in OUTER_TAGS for t in store._tag_ids[txn[1]:]):
+            txn[3] = None
+            return parse_segments(store)
+        if txn[3] is None:
+            txn[3] = parse_segments(store.window(txn[0], txn[1]))
+            txn[3]["envelope"] = txn[2]
+        if not txn[3].get("success"):
+            return parse_segments(store)
+        result = {key: value for key, value in txn[3].items() if key != "envelope"}
+        result["segments_read"] = len(store)
+        return result
+
+    def edit(self, start: int, end: int, text: str = "") -> List[dict]:
+        """Replaces text[start:end] with `text`; returns the JSON Patch to the new result."""
+        return self.apply([{"start": start, "end": end, "text": text}])
+
+    def apply(self, edits: List[dict], version: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        Applies edits in order (each in the coordinates left by the previous one).
+        With `version`, edits that arrive ahead of an earlier version are queued
+        (returns None) instead of waiting; the call that fills the gap applies
+        them too and returns the patch covering all of them. Edits sent back to
+        back are thus applied in order without holding a thread per request.
+        An edit that can't be applied (a queued one was already acknowledged)
+        fails the session: this and every later call raise, and the client
+        has to open a new session from its text.
+        """
+        with self._lock:
+            if self.failed:
+                raise ValueError(self.failed)
+            if version is not None:
+                if version < self.version or version in self._queued:
+                    raise ValueError(f"Stale edit: session is at version {self.version}, edit expects {version}")
+                if version > self.version:
+                    if version - self.version > MAX_QUEUED_EDITS:
+                        raise ValueError(f"Session is at version {self.version}, edit expects {version}")
+                    self._queued[version] = edits
+                    return None
+
+            previous = self.result
+            self._apply_edits(edits)
+            self.version += 1
+            while self.version in self._queued:
+                self._apply_edits(self._queued.pop(self.version))
+                self.version += 1
+
+            result = self._assemble()
+            self.result = result
+            return json_diff(previous, result)
+
+    def _apply_edits(self, edits: List[dict]) -> None:
+        for change in edits:
+            start, end = int(change["start"]), int(change.get("end", change["start"]))
+            if not 0 <= start <= end <= len(self.text):
+                self._queued.clear()
+                self.failed = f"Edit {start}..{end} for version {self.version} is outside the document " \
+                              f"(length {len(self.text)}); reopen the session"
+                raise ValueError(self.failed)
+            spliced = self._splice(change.get("text", ""), start, end)
+            if spliced is not None:
+                self._update_transactions(*spliced)
+
+# --- JSON PATCH ---
+
+def _pointer(path: str, key) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[dict]:
+    """RFC 6902 operations turning `old` into `new` (identical objects are skipped without a walk)."""
+    if old is new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in old.items():
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path, key)})
+            else:
+                ops.extend(json_diff(value, new[key], _pointer(path, key)))
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        # Trim the common head and tail so an inserted line item is one "add"
+        head = 0
+        limit = min(len(old), len(new))
+        while head < limit and (old[head] is new[head] or old[head] == new[head]):
+            head += 1
+        tail = 0
+        while tail < limit - head and (old[-1 - tail] is new[-1 - tail] or old[-1 - tail] == new[-1 - tail]):
+            tail += 1
+        old_mid, new_mid = old[head:len(old) - tail], new[head:len(new) - tail]
+        ops = []
+        common = min(len(old_mid), len(new_mid))
+        for k in range(common):
+            ops.extend(json_diff(old_mid[k], new_mid[k], _pointer(path, head + k)))
+        for k in range(len(old_mid) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": _pointer(path, head + k)})
+        for k in range(common, len(new_mid)):
+            ops.append({"op": "add", "path": _pointer(path, head + k), "value": new_mid[k]})
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+def apply_diff(doc: Any, ops: List[dict]) -> Any:
+    """Applies json_diff() output (in place where possible); returns the patched document."""
+    for op in ops:
+        keys = [k.replace('~1', '/').replace('~0', '~') for k in op["path"].split('/')[1:]]
+        if not keys:
+            doc = op.get("value")
+            continue
+        parent = doc
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+        last = keys[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return doc
+
+# --- RPC ---
+
+class SessionManager:
+    """Open sessions by id for the stdio RPC servers (least recently used ones are dropped)."""
+
+    def __init__(self, max_sessions: int = 8):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, EditSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> EditSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise KeyError(f"Unknown session: {session_id}")
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def open(self, params: dict) -> dict:
+        session = EditSession(params.get("content", ""))
+        session_id = os.urandom(16).hex()
+        with self._lock:
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return {"session": session_id, "version": session.version, "result": session.result}
+
+    def edit(self, params: dict) -> dict:
+        session = self.get(params["session"])
+        ops = session.apply(params.get("edits") or [params], params.get("version"))
+        if ops is None:
+            # Ahead of the session: applied (and diffed) by the edit that fills the gap
+            return {"session": params["session"], "version": session.version, "queued": True}
+        return {"session": params["session"], "version": session.version, "diff": ops}
+
+    def close(self, params: dict) -> dict:
+        with self._lock:
+            closed = self._sessions.pop(params.get("session"), None) is not None
+        return {"closed": closed}
+
+    def methods(self) -> dict:
+        return {"session_open": self.open, "session_edit": self.edit, "session_close": self.close}
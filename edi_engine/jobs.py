@@ -0,0 +1,189 @@
+"""
+Background job queue for analyses too large to finish inside one HTTP request.
+Jobs are persisted in SQLite (so queued work survives a restart) and run on
+job threads, with a concurrency limit per subscription tier. The threads only
+wait: a handler should send CPU-bound work to a process pool (the SaaS backend
+uses AnalysisExecutor.analyze_blocking, which parses on the parse pool).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class TierNotAllowed(Exception):
+    """The subscription tier has no job slots configured (HTTP 403)."""
+
+class JobStore:
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, owner TEXT NOT NULL, tier TEXT NOT NULL, status TEXT NOT NULL, "
+                "content TEXT, result TEXT, error TEXT, "
+                "created REAL NOT NULL, started REAL, finished REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, tier, created)")
+            self._db.commit()
+
+    def create(self, owner: str, tier: str, content: str) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, owner, tier, status, content, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, owner, tier, QUEUED, content, time.time()),
+            )
+            self._db.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job status and result (the submitted content is not returned)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, owner, tier, status, result, error, created, started, finished FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "owner", "tier", "status", "result", "error", "created", "started", "finished")
+        job = dict(zip(keys, row))
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def claim(self, tier: str) -> Optional[tuple]:
+        """Marks the oldest queued job of a tier as running; returns (id, content) or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, content FROM jobs WHERE status = ? AND tier = ? ORDER BY created LIMIT 1",
+                (QUEUED, tier),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?", (RUNNING, time.time(), row[0]))
+            self._db.commit()
+        return row
+
+    def queued_tiers(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT DISTINCT tier FROM jobs WHERE status = ?", (QUEUED,))]
+
+    def finish(self, job_id: str, result: dict) -> None:
+        with self._lock:
+            # The content is no longer needed once the job has a result
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, content = NULL, finished = ? WHERE id = ?",
+                (DONE, json.dumps(result), time.time(), job_id),
+            )
+            self._db.commit()
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, content = NULL, finished = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+            self._db.commit()
+
+    def requeue_running(self) -> int:
+        """Puts jobs interrupted by a restart back in the queue."""
+        with self._lock:
+            count = self._db.execute(
+                "UPDATE jobs SET status = ?, started = NULL WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+            self._db.commit()
+        return count
+
+class JobQueue:
+    """
+    Dispatcher thread + worker pool. `tier_limits` caps how many jobs of each
+    subscription tier run at once, and the pool has exactly that many threads.
+    Tiers without a limit can't submit jobs (TierNotAllowed).
+    """
+    def __init__(self, store: JobStore, handler: Callable[[str], dict],
+                 tier_limits: Optional[Dict[str, int]] = None):
+        self.store = store
+        self.handler = handler
+        self.tier_limits = {tier: limit for tier, limit in (tier_limits or {"pro": 4}).items() if limit > 0}
+        self._running: Dict[str, int] = {}
+        self._wakeup = threading.Condition()
+        self._stopped = True
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, handler: Callable[[str], dict]) -> "JobQueue":
+        """EDI_JOBS_DB (default jobs.sqlite), EDI_JOB_LIMITS (default "pro=4", e.g. "pro=4,team=8")."""
+        limits = {}
+        for part in os.environ.get("EDI_JOB_LIMITS", "pro=4").split(","):
+            if "=" in part:
+                tier, limit = part.split("=", 1)
+                limits[tier.strip()] = int(limit)
+        return cls(JobStore(os.environ.get("EDI_JOBS_DB", "jobs.sqlite")), handler, limits)
+
+    def limit_for(self, tier: str) -> int:
+        return self.tier_limits.get(tier, 0)
+
+    def start(self) -> None:
+        if not self._stopped:
+            return
+        self.store.requeue_running()
+        # One thread per slot: every tier can always run up to its own limit
+        workers = max(1, sum(self.tier_limits.values()))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edi-job")
+        self._stopped = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="edi-job-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        """Stops dispatching; running jobs finish, queued ones wait for the next start()."""
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def submit(self, owner: str, tier: str, content: str) -> str:
+        if self.limit_for(tier) <= 0:
+            raise TierNotAllowed(f"no background jobs for the {tier!r} tier")
+        job_id = self.store.create(owner, tier, content)
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return job_id
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                for tier in self.store.queued_tiers():
+                    while self._running.get(tier, 0) < self.limit_for(tier):
+                        claimed = self.store.claim(tier)
+                        if claimed is None:
+                            break
+                        self._running[tier] = self._running.get(tier, 0) + 1
+                        self._pool.submit(self._run, tier, *claimed)
+                # Woken by submit() / job completion; the timeout is only a safety net
+                self._wakeup.wait(timeout=5)
+
+    def _run(self, tier: str, job_id: str, content: str) -> None:
+        try:
+            self.store.finish(job_id, self.handler(content))
+        except Exception as e:
+            self.store.fail(job_id, str(e))
+        finally:
+            with self._wakeup:
+                self._running[tier] -= 1
+                self._wakeup.notify_all()
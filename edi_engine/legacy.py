@@ -0,0 +1,185 @@
+"""
+LEGACY VIEW: The original `parse_edi` output shape (legacy.parse_edi, used by the
+desktop app, the CLI and the AI service), served from the core engine.
+The summary fields are computed up front; `segments` and `raw_content` are only
+built when something reads them (including json.dumps / FastAPI encoding), so
+callers that never look at them do not pay for a second copy of the document.
+Across processes (pickle) and in the result cache a view is just its summary
+plus the raw text; the segments are tokenized again on the first read.
+"""
+from typing import Optional
+
+from . import metrics
+from .core import SegmentStore, X12Tokenizer
+from .envelope import parse_store
+from .validation import new_marks, validate_store
+
+_LAZY_KEYS = ("segments", "raw_content")
+
+class LegacyView(dict):
+    """
+    dict with the legacy `data` keys:
+    file_type, transaction_set, sender, receiver, segment_count, segments, raw_content.
+    """
+    def __init__(self, store: Optional[SegmentStore], raw_content: str, summary: dict,
+                 marks: Optional[dict] = None, validation: Optional[dict] = None):
+        super().__init__(summary)
+        self.store = store  # None: tokenized from raw_content on first use
+        self.marks = marks
+        self._raw_content = raw_content
+        self._typed: Optional[dict] = None
+        self._validation = validation
+
+    def _segments(self) -> SegmentStore:
+        if self.store is None:
+            # Rebuilt view (pickle / cache): marks too, in case validation() is asked for
+            self.marks = new_marks()
+            self.store = X12Tokenizer(self._raw_content).tokenize(self.marks)
+        return self.store
+
+    @property
+    def raw_text(self) -> str:
+        """The document text (stripped), without materializing `raw_content`."""
+        return self._raw_content
+
+    def summary(self) -> dict:
+        """The up-front fields only (no segments / raw_content)."""
+        return {k: v for k, v in dict.items(self) if k not in _LAZY_KEYS}
+
+    def _materialize(self, key: str):
+        started = metrics.start()
+        if key == "segments":
+            # include both `id` (back-compat) and `tag` (used by tests/other code)
+            value = [{"id": s.tag, "tag": s.tag, "elements": s.elements[1:]} for s in self._segments()]
+        else:
+            value = self._raw_content
+        dict.__setitem__(self, key, value)
+        metrics.observe("serialize", started, dict.get(self, "transaction_set", metrics.ALL))
+        return value
+
+    def typed(self) -> dict:
+        """Typed parse (parse_850_po, parse_837_claim...) of the same segments, computed once."""
+        if self._typed is None:
+            self._typed = parse_store(self._segments())
+        return self._typed
+
+    def validation(self) -> dict:
+        """Validation report; the typed parse it rides along with is kept for typed()."""
+        if self._validation is None:
+            self._segments()
+            if self._typed is None:
+                self._typed = parse_store(self.store, validate=True)
+                self._validation = validate_store(self.store, self.marks, self._typed)
+            else:
+                self._validation = validate_store(self.store, self.marks)
+        return self._validation
+
+    # --- dict protocol with the lazy keys filled in on access ---
+
+    def __getitem__(self, key):
+        if key in _LAZY_KEYS and not dict.__contains__(self, key):
+            return self._materialize(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __contains__(self, key):
+        return key in _LAZY_KEYS or dict.__contains__(self, key)
+
+    def keys(self):
+        return [k for k in dict.keys(self) if k not in _LAZY_KEYS] + list(_LAZY_KEYS)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def copy(self):
+        return dict(self.items())
+
+    def __reduce__(self):
+        # Cross-process copies (e.g. pool results) carry the raw text once, not the
+        # segments as well; the other side tokenizes again only if it reads them
+        return (_rebuild_view, (self._raw_content, self.summary(), self._validation))
+
+def _rebuild_view(raw_content: str, summary: dict, validation: Optional[dict] = None) -> LegacyView:
+    return LegacyView(None, raw_content, summary, validation=validation)
+
+def from_summary(raw_content: str, summary: dict) -> LegacyView:
+    """A view over `raw_content` whose summary fields were stored earlier (e.g. in the result cache)."""
+    return LegacyView(None, raw_content.strip(), summary)
+
+def legacy_view(content: str, validate: bool = False) -> LegacyView:
+    tokenizer = X12Tokenizer(content)
+    marks = new_marks() if validate else None
+    store = tokenizer.tokenize(marks)
+
+    started = metrics.start()
+    transaction_set = "Unknown"
+    sender_id = "Unknown"
+    receiver_id = "Unknown"
+
+    isa_index = store.find_tag("ISA")
+    if isa_index >= 0:
+        # ISA elements 6 and 8 are Sender/Receiver
+        elements = store[isa_index].elements
+        if len(elements) > 8:
+            sender_id = elements[6]
+            receiver_id = elements[8]
+
+    st_index = store.find_tag("ST")
+    if st_index >= 0:
+        # ST element 1 is the Transaction Set Code (e.g., 850)
+        elements = store[st_index].elements
+        if len(elements) > 1:
+            transaction_set = elements[1]
+    metrics.observe("detect", started, transaction_set)
+
+    return LegacyView(store, tokenizer.raw, {
+        "file_type": "X12",
+        "transaction_set": transaction_set,
+        "sender": sender_id,
+        "receiver": receiver_id,
+        "segment_count": len(store),
+    }, marks)
+
+def parse_edi(content, validate=False):
+    """
+    A lightweight, deterministic X12 EDI Parser.
+    This converts raw EDI strings into a structured JSON format
+    that is easier for the AI to read and analyze.
+
+    `data` is a LegacyView, so `segments` / `raw_content` are only built when
+    read and `data.typed()` gives the typed parse of the same segments.
+    validate=True adds `validation` (envelope counts/control numbers, segment
+    syntax, required elements; see edi_engine.validation).
+    """
+    if not content:
+        return {"success": False, "error": "Empty content"}
+
+    try:
+        view = legacy_view(content, validate)
+        if validate:
+            return {"success": True, "data": view, "validation": view.validation()}
+        return {"success": True, "data": view}
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
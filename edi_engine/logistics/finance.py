@@ -0,0 +1,39 @@
+from ..registry import register
+from ..utils import dollars, format_date, parse_implied_cents
+
+invoice_810 = register("810", lambda: {"doc_type": "810 Invoice", "total": 0.0, "total_cents": 0, "lines": []})
+
+@invoice_810.on("BIG")
+def _810_big(seg, data, state):
+    data["invoice_date"] = format_date(seg.get(1))
+    data["invoice_number"] = seg.get(2)
+    data["po_number"] = seg.get(4)
+
+@invoice_810.on("TDS")
+def _810_tds(seg, data, state):
+    # TDS01 is N2 (implied decimal): read as whole cents, never through a float
+    data["total_cents"] = parse_implied_cents(seg.get(1)) or 0
+    data["total"] = dollars(data["total_cents"])
+
+@invoice_810.on("IT1")
+def _810_it1(seg, data, state):
+    data["lines"].append({
+        "qty": seg.get(2),
+        "price": seg.get(4),
+        "sku": seg.get(7)
+    })
+
+parse_810_invoice = invoice_810.parse
+
+ack_997 = register("997", lambda: {"doc_type": "997 Functional Ack", "status": "Unknown"})
+
+@ack_997.on("AK1")
+def _997_ak1(seg, data, state):
+    data["group"] = seg.get(1)
+
+@ack_997.on("AK5")
+def _997_ak5(seg, data, state):
+    codes = {"A": "Accepted", "R": "Rejected", "E": "Errors", "M": "Rejected, Auth Required"}
+    data["status"] = codes.get(seg.get(1), seg.get(1))
+
+parse_997_ack = ack_997.parse
@@ -0,0 +1,60 @@
+from ..registry import register
+from ..utils import format_date, format_currency
+
+po_850 = register("850", lambda: {"doc_type": "850 Purchase Order", "po_number": "Unknown", "items": []})
+
+@po_850.on("BEG")
+def _850_beg(seg, data, state):
+    data["po_number"] = seg.get(3)
+    data["date"] = format_date(seg.get(5))
+
+@po_850.on("N1")
+def _850_n1(seg, data, state):
+    if seg.get(1) == "ST":
+        data["ship_to"] = seg.get(2)
+
+# VP = Vendor Part, VN = Vendor Item, BP = Buyer Part, UP = UPC, IB = ISBN
+# (partners can override these, see dialect.py)
+SKU_QUALIFIERS = ("VP", "VN", "BP", "UP", "IB")
+
+def find_sku(seg, start: int = 6, fallback: int = 7, qualifiers=SKU_QUALIFIERS) -> str:
+    """Part number of a PO1/IT1-style line (also LIN with start=2, fallback=3)."""
+    # 1. Try to find specific qualifiers
+    # We scan elements 6 through 15 (typical range for IDs)
+    for i in range(start, len(seg.elements)):
+        val = seg.get(i)
+        if val in qualifiers:
+            # The value is immediately after the qualifier
+            return seg.get(i + 1)
+
+    # 2. Fallback: If no qualifier found, use standard position 7
+    return seg.get(fallback) or "MISSING"
+
+@po_850.on("PO1")
+def _850_po1(seg, data, state):
+    # --- SMART SKU EXTRACTION ---
+    # Standard X12 PO1 structure is variable.
+    # We look for qualifiers (VP, BP, UP, VN) to find the real Part Number.
+    
+    qty = int(seg.get(2) or 0)
+    price = format_currency(seg.get(4))
+    sku = find_sku(seg, qualifiers=state.get("sku_qualifiers", SKU_QUALIFIERS))
+
+    data["items"].append({
+        "qty": qty,
+        "price": price,
+        "sku": sku
+    })
+
+parse_850_po = po_850.parse
+
+ack_855 = register("855", lambda: {"doc_type": "855 PO Acknowledgement", "status": "Unknown"})
+
+@ack_855.on("BAK")
+def _855_bak(seg, data, state):
+    status_map = {"00": "Accepted", "AD": "Modified", "RD": "Rejected", "AC": "Changes"}
+    data["status"] = status_map.get(seg.get(1), f"Code {seg.get(1)}")
+    data["po_number"] = seg.get(3)
+    data["ack_date"] = format_date(seg.get(4))
+
+parse_855_ack = ack_855.parse
@@ -0,0 +1,86 @@
+from ..registry import register
+from ..utils import format_date
+
+asn_856 = register("856", lambda: {"doc_type": "856 ASN", "shipment_id": None, "structure": []})
+
+@asn_856.on("BSN")
+def _856_bsn(seg, data, state):
+    data["shipment_id"] = seg.get(2)
+    data["ship_date"] = format_date(seg.get(3))
+
+@asn_856.on("HL")
+def _856_hl(seg, data, state):
+    state["level"] = seg.get(3) # S, O, I
+
+@asn_856.on("LIN")
+def _856_lin(seg, data, state):
+    if state.get("level") == "I":
+        data["structure"].append({"type": "Item", "sku": seg.get(3)})
+
+@asn_856.on("SN1")
+def _856_sn1(seg, data, state):
+    if data["structure"] and state.get("level") == "I":
+        data["structure"][-1]["qty"] = seg.get(2)
+
+parse_856_asn = asn_856.parse
+
+status_214 = register("214", lambda: {"doc_type": "214 Carrier Status", "updates": []})
+
+@status_214.on("B10")
+def _214_b10(seg, data, state):
+    data["tracking_number"] = seg.get(1)
+
+@status_214.on("AT7")
+def _214_at7(seg, data, state):
+    status_map = {"AF": "Departed", "X1": "Arrived", "D1": "Delivered", "X6": "En Route"}
+    data["updates"].append({
+        "status": status_map.get(seg.get(1), seg.get(1)),
+        "date": format_date(seg.get(5)),
+        "time": seg.get(6)
+    })
+
+parse_214_status = status_214.parse
+
+# 940 Warehouse Shipping Order.
+# Commonly used to tell a 3PL or Warehouse what to ship.
+warehouse_940 = register("940", lambda: {"doc_type": "940 Warehouse Order", "depositor_order": "Unknown", "items": []})
+
+# W05 is the Header for 940s
+@warehouse_940.on("W05")
+def _940_w05(seg, data, state):
+    data["depositor_order"] = seg.get(2) # Order #
+    data["po_number"] = seg.get(3)       # PO Link
+
+@warehouse_940.on("N1")
+def _940_n1(seg, data, state):
+    if seg.get(1) == "ST":
+        data["ship_to"] = seg.get(2)
+
+# W01 is the Line Item (Similar to PO1 but for Warehouses)
+W01_QUALIFIERS = ("VN", "VP", "UP", "BP")
+
+def w01_sku(seg, qualifiers=W01_QUALIFIERS) -> str:
+    # Smart SKU extraction for W01
+    # Format: W01 * Qty * Units * UPC? * Qual * SKU
+    sku = "UNKNOWN"
+    
+    # Try to grab the item from common positions
+    # In your sample: W01*..*..*..*VN*ITEM-ABC
+    # Element 4 is Qualifier, Element 5 is Value
+    if seg.get(4) in qualifiers:
+        sku = seg.get(5)
+    # Or fallback to element 3 (often UPC) if it looks like a code
+    elif seg.get(3) and len(seg.get(3)) > 6:
+        sku = seg.get(3)
+    return sku
+
+@warehouse_940.on("W01")
+def _940_w01(seg, data, state):
+    qty = int(seg.get(1) or 0)
+    data["items"].append({
+        "qty": qty,
+        "unit": seg.get(2),
+        "sku": w01_sku(seg, state.get("sku_qualifiers", W01_QUALIFIERS))
+    })
+
+parse_940_warehouse_order = warehouse_940.parse
@@ -0,0 +1,204 @@
+"""
+METRICS: Per-stage timers and throughput counters, exported in Prometheus text format.
+
+Stages: read, tokenize, detect, parse, serialize, ai (labelled by transaction set
+where it is known). Off by default; enable with EDI_METRICS=1 or enable().
+The services serve render() on /metrics only to scrapers sending
+"Authorization: Bearer $EDI_METRICS_TOKEN" (see scrape_status()).
+While disabled every instrumentation point is one global check:
+
+    started = metrics.start()          # None when disabled
+    ...
+    metrics.observe("parse", started, "850", segments=n, nbytes=b)
+
+profile_call() runs one call under cProfile ("cpu") or tracemalloc ("memory")
+for per-request profiling; EDI_PROFILE_SAMPLE_RATE profiles a random share.
+"""
+import hmac
+import io
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STAGES = ("read", "tokenize", "detect", "parse", "serialize", "ai")
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+ALL = "all"
+
+_enabled = os.environ.get("EDI_METRICS", "") in ("1", "true", "yes")
+_lock = threading.Lock()
+# (stage, transaction_set) -> [count, seconds, bucket counts...]
+_timings: Dict[Tuple[str, str], List[float]] = {}
+# (name, transaction_set) -> total
+_counters: Dict[Tuple[str, str], float] = {}
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+def enabled() -> bool:
+    return _enabled
+
+def start() -> Optional[float]:
+    return time.perf_counter() if _enabled else None
+
+def observe(stage: str, started: Optional[float], transaction_set: str = ALL,
+            segments: int = 0, nbytes: int = 0) -> None:
+    """Records one timed stage; a no-op when `started` is None (metrics were off at start())."""
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    key = (stage, transaction_set or ALL)
+    with _lock:
+        timing = _timings.get(key)
+        if timing is None:
+            timing = _timings[key] = [0, 0.0] + [0] * len(BUCKETS)
+        timing[0] += 1
+        timing[1] += elapsed
+        for i, bound in enumerate(BUCKETS):
+            if elapsed <= bound:
+                timing[2 + i] += 1
+        if segments:
+            _count(("segments", stage, key[1]), segments)
+        if nbytes:
+            _count(("bytes", stage, key[1]), nbytes)
+
+def _count(key, value) -> None:
+    _counters[key] = _counters.get(key, 0) + value
+
+def reset() -> None:
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+# --- CROSS-PROCESS ---
+
+def drain() -> Optional[dict]:
+    """Takes (and clears) this process's numbers, e.g. in a pool worker, for merge() in the parent."""
+    if not _enabled:
+        return None
+    with _lock:
+        snapshot = {"timings": dict(_timings), "counters": dict(_counters)}
+        _timings.clear()
+        _counters.clear()
+    return snapshot
+
+def merge(snapshot: Optional[dict]) -> None:
+    if not snapshot:
+        return
+    with _lock:
+        for key, values in snapshot["timings"].items():
+            timing = _timings.setdefault(key, [0, 0.0] + [0] * len(BUCKETS))
+            for i, value in enumerate(values):
+                timing[i] += value
+        for key, value in snapshot["counters"].items():
+            _count(key, value)
+
+def call_and_drain(func: Callable, *args) -> Tuple[Any, Optional[dict]]:
+    """Pool-worker wrapper: returns (func(*args), this worker's metrics since the last drain)."""
+    return func(*args), drain()
+
+# --- EXPORT ---
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+def render() -> str:
+    """Prometheus text exposition of everything recorded so far."""
+    if not _enabled:
+        return "# EDI metrics are disabled (set EDI_METRICS=1)\n"
+    with _lock:
+        timings = {k: list(v) for k, v in _timings.items()}
+        counters = dict(_counters)
+
+    lines = ["# HELP edi_stage_seconds Time spent per pipeline stage.", "# TYPE edi_stage_seconds histogram"]
+    for (stage, tset), timing in sorted(timings.items()):
+        for i, bound in enumerate(BUCKETS):
+            lines.append(f"edi_stage_seconds_bucket{_labels(stage=stage, transaction_set=tset, le=bound)} {timing[2 + i]}")
+        lines.append(f"edi_stage_seconds_bucket{_labels(stage=stage, transaction_set=tset, le='+Inf')} {timing[0]}")
+        lines.append(f"edi_stage_seconds_sum{_labels(stage=stage, transaction_set=tset)} {timing[1]:.6f}")
+        lines.append(f"edi_stage_seconds_count{_labels(stage=stage, transaction_set=tset)} {timing[0]}")
+
+    for name, unit in (("segments", "Segments"), ("bytes", "Bytes")):
+        lines.append(f"# HELP edi_{name}_total {unit} processed per stage.")
+        lines.append(f"# TYPE edi_{name}_total counter")
+        for (kind, stage, tset), value in sorted(counters.items()):
+            if kind == name:
+                lines.append(f"edi_{name}_total{_labels(stage=stage, transaction_set=tset)} {value}")
+
+        # Average throughput over the stage's busy time (rate() over *_total gives wall-clock rates)
+        lines.append(f"# HELP edi_{name}_per_second {unit} per second of stage time.")
+        lines.append(f"# TYPE edi_{name}_per_second gauge")
+        for (kind, stage, tset), value in sorted(counters.items()):
+            seconds = timings.get((stage, tset), [0, 0.0])[1]
+            if kind == name and seconds > 0:
+                lines.append(f"edi_{name}_per_second{_labels(stage=stage, transaction_set=tset)} {value / seconds:.1f}")
+    return "\n".join(lines) + "\n"
+
+def scrape_status(authorization: Optional[str]) -> int:
+    """
+    HTTP status for a /metrics request: 404 while EDI_METRICS_TOKEN is unset (not
+    served on the public port), 401 without the matching bearer token, else 200.
+    """
+    token = os.environ.get("EDI_METRICS_TOKEN", "")
+    if not token:
+        return 404
+    if not authorization or not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return 401
+    return 200
+
+# --- PROFILING ---
+
+def profile_kind(requested: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """
+    Which profiler to run for this request, if any, and whether the report goes back
+    to the client: the requested one ("cpu" / "memory") when EDI_PROFILING=1 (returned),
+    else "cpu" for a random EDI_PROFILE_SAMPLE_RATE share of calls (only logged).
+    """
+    if requested in ("cpu", "memory") and os.environ.get("EDI_PROFILING") == "1":
+        return requested, True
+    rate = float(os.environ.get("EDI_PROFILE_SAMPLE_RATE", "0") or 0)
+    if rate and random.random() < rate:
+        return "cpu", False
+    return None, False
+
+def profile_call(kind: Optional[str], func: Callable, *args, top: int = 25) -> Tuple[Any, Optional[dict]]:
+    """Runs func(*args) under the given profiler (in the calling thread); returns (result, report)."""
+    # Profilers are imported here: pstats alone costs more startup than the whole parser
+    if kind == "cpu":
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func(*args)
+        finally:
+            profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        return result, {"kind": "cpu", "report": out.getvalue()}
+
+    if kind == "memory":
+        import tracemalloc
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        try:
+            result = func(*args)
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if not already_tracing:
+                tracemalloc.stop()
+        stats = snapshot.statistics("lineno")[:top]
+        return result, {"kind": "memory", "peak_mb": round(peak / (1 << 20), 2),
+                        "top": [str(stat) for stat in stats]}
+
+    return func(*args), None
+
+def log_profile(report: Optional[dict], label: str = "") -> None:
+    """Sampled profiles go to the log instead of the response."""
+    if report:
+        logging.info(f"EDI profile {label}: {report.get('report') or report}")
@@ -0,0 +1,107 @@
+"""
+STREAMING OUTPUT: Parse results as NDJSON records instead of one big JSON document.
+A header record, then one record per segment / line item / claim, then a trailer,
+so clients can render progressively and nothing holds the full serialized output.
+
+Typed view (iter_parse_records):
+    {"type": "header", "segments_read": N, "transaction_count": k}
+    {"type": "transaction", "index": 0, "detected_type": "850", "success": true, "envelope": {...}}
+    {"type": "item", "index": 0, "field": "items", "value": {...}}      one per list entry
+    {"type": "summary", "index": 0, "data": {...}}                      the non-list fields
+    {"type": "trailer", "success": true, "records": R}
+
+Segment view (iter_segment_records), the legacy segments list one line at a time:
+    {"type": "header", "file_type": "X12", "transaction_set": ..., "sender": ..., "receiver": ...}
+    {"type": "segment", "index": 0, "tag": "ISA", "elements": [...]}
+    {"type": "trailer", "segment_count": N}
+"""
+import json
+from typing import Iterable, Iterator
+
+from . import metrics
+from .core import SegmentStore, X12Tokenizer
+from .envelope import split_transactions
+from .registry import get_parser, parse_segments
+
+def _transaction_records(index: int, segments: SegmentStore, envelope: dict) -> Iterator[dict]:
+    st_index = segments.find_tag("ST")
+    doc_type = segments[st_index].get(1) if st_index >= 0 else "Unknown"
+
+    if get_parser(doc_type) is None:
+        # Generic view: stream the structure straight from the segments
+        yield {"type": "transaction", "index": index, "detected_type": doc_type, "success": True,
+               "envelope": envelope, "warning": "Using generic parser. Some fields may not be labeled."}
+        for seg in segments:
+            yield {"type": "item", "index": index, "field": "structure",
+                   "value": {"segment": seg.tag, "elements": seg.elements}}
+        yield {"type": "summary", "index": index,
+               "data": {"doc_type": f"{doc_type} (Generic View)",
+                        "note": "No specific parser logic defined for this type yet."}}
+        return
+
+    result = parse_segments(segments)
+    header = {"type": "transaction", "index": index, "detected_type": result.get("detected_type", doc_type),
+              "success": result["success"], "envelope": envelope}
+    if "error" in result:
+        header["error"] = result["error"]
+    yield header
+
+    summary = {}
+    for field, value in result.get("data", {}).items():
+        if isinstance(value, list):
+            for entry in value:
+                yield {"type": "item", "index": index, "field": field, "value": entry}
+        else:
+            summary[field] = value
+    yield {"type": "summary", "index": index, "data": summary}
+
+def iter_parse_records(raw_content: str) -> Iterator[dict]:
+    """Typed parse output as records, one transaction set at a time."""
+    segments = X12Tokenizer(raw_content).tokenize()
+    if not segments:
+        yield {"type": "header", "segments_read": 0, "transaction_count": 0}
+        yield {"type": "trailer", "success": False, "error": "Empty or invalid EDI content", "records": 2}
+        return
+
+    transactions = [(t.segments, t.envelope) for t in split_transactions(segments)]
+    if not transactions:
+        # No ST at all: one generic transaction over everything
+        transactions = [(segments, {})]
+    yield {"type": "header", "segments_read": len(segments), "transaction_count": len(transactions)}
+
+    records = 1
+    success = True
+    for index, (window, envelope) in enumerate(transactions):
+        for record in _transaction_records(index, window, envelope):
+            records += 1
+            if record["type"] == "transaction" and not record["success"]:
+                success = False
+            yield record
+    yield {"type": "trailer", "success": success, "records": records + 1}
+
+def iter_segment_records(raw_content: str) -> Iterator[dict]:
+    """The legacy segment list as records; segments are produced lazily from the store."""
+    segments = X12Tokenizer(raw_content).tokenize()
+    header = {"type": "header", "file_type": "X12", "transaction_set": "Unknown",
+              "sender": "Unknown", "receiver": "Unknown"}
+    isa_index = segments.find_tag("ISA")
+    if isa_index >= 0:
+        isa = segments[isa_index]
+        header["sender"] = isa.get(6, "Unknown")
+        header["receiver"] = isa.get(8, "Unknown")
+    st_index = segments.find_tag("ST")
+    if st_index >= 0:
+        header["transaction_set"] = segments[st_index].get(1, "Unknown")
+    yield header
+
+    for index, seg in enumerate(segments):
+        yield {"type": "segment", "index": index, "tag": seg.tag, "elements": seg.elements[1:]}
+    yield {"type": "trailer", "segment_count": len(segments)}
+
+def ndjson_lines(records: Iterable[dict]) -> Iterator[str]:
+    """Serializes records one line at a time (for StreamingResponse / stdout)."""
+    for record in records:
+        started = metrics.start()
+        line = json.dumps(record) + "\n"
+        metrics.observe("serialize", started, nbytes=len(line))
+        yield line
@@ -0,0 +1,243 @@
+"""
+PROMPT BUILDER: Compact, token-budgeted prompts for AI analysis.
+Instead of dumping every segment plus the raw content, the prompt carries the
+typed parse (parse_850_po, parse_837_claim, ...) with repeated line items
+sampled and aggregated. Documents that still don't fit the budget are split
+into map-reduce chunks: each part is analyzed on its own, then merged.
+"""
+import json
+import os
+from collections import Counter
+from typing import List, Optional
+
+from .core import X12Tokenizer, detect_delimiters
+from .envelope import parse_store
+from .legacy import LegacyView
+
+INSTRUCTIONS = (
+    "You are an expert Supply Chain EDI analyst. Analyze the parsed EDI JSON and provide:\n"
+    "1) Short human-readable summary\n"
+    "2) Key fields (sender, receiver, transaction set id, counts)\n"
+    "3) Any obvious data quality issues\n"
+    "Return output as HTML.\n"
+    "Long lists are sampled; each `<field>_summary` holds counts and totals over the full list.\n\nDATA:\n"
+)
+
+MAP_INSTRUCTIONS = (
+    "You are an expert Supply Chain EDI analyst. This is part {part} of {parts} of one large EDI document.\n"
+    "List the key facts and any data quality issues in this part only, as short plain-text bullets.\n"
+    "`<field>_summary` entries cover the whole document, not just this part.\n\nDATA:\n"
+)
+
+REDUCE_INSTRUCTIONS = (
+    "You are an expert Supply Chain EDI analyst. A large EDI document was analyzed in {parts} parts.\n"
+    "Merge the part analyses below into one report with:\n"
+    "1) Short human-readable summary\n"
+    "2) Key fields (sender, receiver, transaction set id, counts)\n"
+    "3) Any obvious data quality issues\n"
+    "Return output as HTML.\n\nDOCUMENT:\n{header}\n"
+)
+
+HEADER_KEYS = ("file_type", "transaction_set", "sender", "receiver", "segment_count")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+def legacy_prompt_tokens(data: dict) -> int:
+    """Estimated size of the old prompt (json.dumps(data, indent=2)) without building it."""
+    if isinstance(data, LegacyView):
+        raw = data.raw_text
+        element_sep, _ = detect_delimiters(raw)
+        # raw_content once, the element text again inside `segments`, plus JSON/indent overhead
+        chars = 2 * len(raw) + 10 * raw.count(element_sep) + 80 * data["segment_count"]
+        return (chars + 3) // 4
+    return estimate_tokens(json.dumps(data, indent=2))
+
+# --- COMPACTION ---
+
+def _sample(entries: list, limit: int) -> list:
+    """Evenly spaced sample that always keeps the first and last entry."""
+    if len(entries) <= limit:
+        return entries
+    if limit <= 1:
+        return entries[:limit]
+    step = (len(entries) - 1) / (limit - 1)
+    return [entries[round(i * step)] for i in range(limit)]
+
+def aggregate(entries: list) -> dict:
+    """Count, numeric totals and most common values over a list of dicts."""
+    totals = {}
+    values = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        for key, value in entry.items():
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                totals[key] = totals.get(key, 0) + value
+            elif isinstance(value, str):
+                values.setdefault(key, Counter())[value] += 1
+
+    summary = {"count": len(entries)}
+    if totals:
+        summary["totals"] = {k: round(v, 2) for k, v in totals.items()}
+    top = {k: c.most_common(5) for k, c in values.items() if len(c) < len(entries)}
+    if top:
+        # Only fields that actually repeat; unique IDs add nothing here
+        summary["top_values"] = top
+    return summary
+
+def compact_result(result: dict, max_items: int) -> dict:
+    """A typed parse result with every long list sampled and summarized."""
+    out = {k: v for k, v in result.items() if k != "data"}
+    if isinstance(result.get("data"), dict):
+        out["data"] = compact_data(result["data"], max_items)
+    return out
+
+def compact_data(data: dict, max_items: int) -> dict:
+    out = {}
+    for field, value in data.items():
+        if not isinstance(value, list):
+            out[field] = value
+            continue
+        if field == "transactions":
+            value = [compact_result(t, max_items) for t in value]
+        if len(value) > max_items:
+            out[f"{field}_summary"] = aggregate(value)
+            value = _sample(value, max_items)
+        out[field] = value
+    return out
+
+# --- PLANNING ---
+
+class PromptPlan:
+    """One prompt, or several map prompts plus a reduce step, with token accounting."""
+    def __init__(self, prompts: List[str], header: Optional[dict] = None, naive_tokens: Optional[int] = None):
+        self.prompts = prompts
+        self.header = header or {}
+        self.prompt_tokens = sum(estimate_tokens(p) for p in prompts)
+        self.naive_tokens = self.prompt_tokens if naive_tokens is None else naive_tokens
+
+    @property
+    def chunked(self) -> bool:
+        return len(self.prompts) > 1
+
+    def reduce_prompt(self, analyses: List[str], budget: Optional[int] = None) -> str:
+        head = REDUCE_INSTRUCTIONS.format(parts=len(analyses), header=_dumps(self.header))
+        # Keep the merge step inside the budget too: trim each part evenly
+        room = (budget or prompt_budget()) * 4 - len(head)
+        per_part = max(200, room // max(1, len(analyses)) - 20)
+        parts = [f"\nPART {i + 1}:\n{text[:per_part]}" for i, text in enumerate(analyses)]
+        prompt = head + "".join(parts)
+        self.prompt_tokens += estimate_tokens(prompt)
+        return prompt
+
+    def stats(self) -> dict:
+        """Token counts are estimates (~4 characters per token), not tokenizer counts."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "naive_tokens_estimate": self.naive_tokens,
+            "tokens_saved_estimate": max(0, self.naive_tokens - self.prompt_tokens),
+            "chunks": len(self.prompts),
+        }
+
+def prompt_budget() -> int:
+    return int(os.environ.get("EDI_PROMPT_TOKEN_BUDGET", "8000"))
+
+def _typed(data: dict) -> dict:
+    if isinstance(data, LegacyView):
+        return data.typed()
+    if data.get("raw_content"):
+        return parse_store(X12Tokenizer(data["raw_content"]).tokenize())
+    return {"success": True, "data": data}
+
+def _pack(units: list, room: int) -> List[list]:
+    """Greedy in-order packing of (field, entry, tokens) units into chunks of `room` tokens."""
+    chunks, current, used = [], [], 0
+    for unit in units:
+        if current and used + unit[2] > room:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(unit)
+        used += unit[2]
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+def _fit(field: str, entry, room: int, max_items: int) -> tuple:
+    """
+    (entry, tokens) for one unit, sampled harder (then down to its summaries,
+    then to its aggregate) until it fits `room`, so no prompt is cut mid-JSON.
+    """
+    compact = compact_result if field == "transactions" else compact_data
+    fitted = compact(entry, max_items) if field == "transactions" else entry
+    limit = max_items
+    while True:
+        tokens = estimate_tokens(_dumps(fitted)) + 1
+        if tokens <= room or not isinstance(entry, dict):
+            return fitted, tokens
+        if not limit:
+            break
+        limit //= 2
+        fitted = compact(entry, limit)
+    fitted = aggregate([entry])
+    return fitted, estimate_tokens(_dumps(fitted)) + 1
+
+def _chunk_prompts(head: dict, data: dict, budget: int, max_items: int, max_chunks: int) -> List[str]:
+    scalars = {k: v for k, v in data.items() if not isinstance(v, list)}
+    lists = {k: v for k, v in data.items() if isinstance(v, list)}
+    for field, value in lists.items():
+        scalars[f"{field}_summary"] = aggregate(value)
+
+    base_tokens = estimate_tokens(MAP_INSTRUCTIONS) + estimate_tokens(_dumps({**head, "data": scalars})) + 10
+    room = max(budget - base_tokens, budget // 4)
+
+    units = []
+    for field, value in lists.items():
+        for entry in value:
+            units.append((field, *_fit(field, entry, room, max_items)))
+
+    chunks = _pack(units, room)
+    if len(chunks) > max_chunks:
+        # More than max_chunks worth of items: sample evenly, the summaries still cover everything
+        total = sum(size for _, _, size in units)
+        keep = int(len(units) * room * max_chunks / total)
+        while len(chunks) > max_chunks and keep > 0:
+            chunks = _pack(_sample(units, keep), room)
+            keep = int(keep * 0.9)
+
+    prompts = []
+    for number, chunk in enumerate(chunks, start=1):
+        part = dict(scalars)
+        for field, entry, _ in chunk:
+            part.setdefault(field, []).append(entry)
+        prompts.append(MAP_INSTRUCTIONS.format(part=number, parts=len(chunks)) + _dumps({**head, "data": part}))
+    return prompts
+
+def plan_prompts(parsed: dict, budget: Optional[int] = None, max_items: Optional[int] = None,
+                 max_chunks: Optional[int] = None) -> PromptPlan:
+    """
+    Builds the prompt(s) for one parse_edi result.
+    Limits default to EDI_PROMPT_TOKEN_BUDGET (8000), EDI_PROMPT_MAX_ITEMS (20)
+    and EDI_PROMPT_MAX_CHUNKS (8).
+    """
+    budget = budget or prompt_budget()
+    max_items = max_items or int(os.environ.get("EDI_PROMPT_MAX_ITEMS", "20"))
+    max_chunks = max_chunks or int(os.environ.get("EDI_PROMPT_MAX_CHUNKS", "8"))
+
+    data = parsed.get("data", parsed)
+    typed = _typed(data)
+    header = {k: data[k] for k in HEADER_KEYS if k in data}
+    head = {"envelope": header, **{k: v for k, v in typed.items() if k != "data"}}
+    naive = legacy_prompt_tokens(data)
+
+    body = typed.get("data") or {}
+    prompt = INSTRUCTIONS + _dumps({**head, "data": compact_data(body, max_items)})
+    if estimate_tokens(prompt) <= budget:
+        return PromptPlan([prompt], header, naive)
+    return PromptPlan(_chunk_prompts(head, body, budget, max_items, max_chunks), header, naive)
@@ -0,0 +1,235 @@
+"""
+DISPATCH ENGINE: Declarative tag -> handler tables per transaction set.
+Transaction sets register their handlers once at import; parse_segments
+detects the type from ST and routes every segment in a single O(n) pass.
+
+Parser modules are imported on first use: get_parser("850") imports the
+built-in module listed in BUILTIN_SETS, or loads a plugin published under the
+"edi_engine.transaction_sets" entry-point group (name = ST01 code, value = the
+module that calls register()), e.g. in a plugin's pyproject.toml:
+
+    [project.entry-points."edi_engine.transaction_sets"]
+    "204" = "acme_edi.load_tender"
+"""
+import importlib
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import metrics
+from .core import EDISegment, SegmentStore
+from .dialect import get_profiles, parse_state
+
+Handler = Callable[[EDISegment, dict, dict], None]
+
+class TransactionSet:
+    """
+    Parser for one transaction set, built from per-tag handlers.
+    Handlers receive (segment, data, state): `data` is the result dict from
+    `factory()`, `state` is scratch space for cursors (current claim, HL level...)
+    and starts out holding the partner's dialect and rules (see dialect.parse_state).
+    """
+    def __init__(self, code: str, factory: Callable[[], dict]):
+        self.code = code
+        self.factory = factory
+        self.handlers: Dict[str, Handler] = {}
+
+    def on(self, *tags: str):
+        """Decorator: registers the function as the handler for the given segment tags."""
+        def decorator(func: Handler) -> Handler:
+            for tag in tags:
+                self.handlers[tag] = func
+            return func
+        return decorator
+
+    def parse(self, segments: Iterable[EDISegment]) -> dict:
+        data = self.factory()
+        dispatch(self.handlers, segments, data, parse_state(getattr(segments, "dialect", None)))
+        return data
+
+# transaction set code (ST01) -> parser
+TRANSACTION_SETS: Dict[str, TransactionSet] = {}
+
+def register(code: str, factory: Callable[[], dict]) -> TransactionSet:
+    """Creates and registers the parser for a transaction set code."""
+    transaction_set = TransactionSet(code, factory)
+    TRANSACTION_SETS[code] = transaction_set
+    return transaction_set
+
+# --- LAZY LOADING ---
+
+# Built-in transaction sets: code -> module that registers it
+BUILTIN_SETS: Dict[str, str] = {
+    "850": ".logistics.orders", "855": ".logistics.orders",
+    "214": ".logistics.shipping", "856": ".logistics.shipping", "940": ".logistics.shipping",
+    "810": ".logistics.finance", "997": ".logistics.finance",
+    "835": ".healthcare.claims", "837": ".healthcare.claims",
+    "270": ".healthcare.eligibility", "271": ".healthcare.eligibility",
+}
+ENTRY_POINT_GROUP = "edi_engine.transaction_sets"
+_plugins: Optional[dict] = None
+
+def _entry_points() -> dict:
+    """Installed plugin entry points by code, read once (importlib.metadata scans every dist)."""
+    global _plugins
+    if _plugins is None:
+        from importlib.metadata import entry_points
+        found = entry_points()
+        group = found.select(group=ENTRY_POINT_GROUP) if hasattr(found, "select") else found.get(ENTRY_POINT_GROUP, [])
+        _plugins = {ep.name: ep for ep in group}
+    return _plugins
+
+def get_parser(code: str) -> Optional[TransactionSet]:
+    """Registered parser for a code, importing its module on first use; None for unknown codes."""
+    transaction_set = TRANSACTION_SETS.get(code)
+    if transaction_set is not None or not code:
+        return transaction_set
+    module = BUILTIN_SETS.get(code)
+    if module is not None:
+        importlib.import_module(module, __package__)
+    else:
+        plugin = _entry_points().get(code)
+        if plugin is None:
+            return None
+        plugin.load()
+    return TRANSACTION_SETS.get(code)
+
+def available_sets() -> List[str]:
+    """Every code a parser exists for (registered, built-in or installed), without importing any."""
+    return sorted(set(TRANSACTION_SETS) | set(BUILTIN_SETS) | set(_entry_points()))
+
+def generic_parse(segments, doc_type):
+    """
+    Fallback parser for unsupported transaction sets.
+    Returns the raw segment structure so the user sees SOMETHING useful.
+    """
+    return {
+        "doc_type": f"{doc_type} (Generic View)",
+        "note": "No specific parser logic defined for this type yet.",
+        "structure": [
+            {"segment": s.tag, "elements": s.elements} for s in segments
+        ]
+    }
+
+def dispatch(handlers: Dict[str, Handler], segments: Iterable[EDISegment], data: dict, state: dict) -> None:
+    """
+    Routes each segment to its handler. On a SegmentStore the lookup is done
+    per tag id, so segments without a handler are never materialized.
+    """
+    if isinstance(segments, SegmentStore):
+        for handler, seg in segments.route(handlers):
+            handler(seg, data, state)
+    else:
+        for seg in segments:
+            handler = handlers.get(seg.tag)
+            if handler is not None:
+                handler(seg, data, state)
+
+def _route_store(segments: SegmentStore, result: dict, validate: bool = False) -> dict:
+    # ST lookup runs over the tag-id array, not over materialized segments
+    started = metrics.start()
+    st_index = segments.find_tag("ST")
+    if st_index < 0:
+        result["warning"] = "Using generic parser. Some fields may not be labeled."
+        return generic_parse(segments, result["detected_type"])
+
+    doc_type = result["detected_type"] = segments[st_index].get(1)
+    transaction_set = get_parser(doc_type)
+    if transaction_set is None:
+        # USE FALLBACK INSTEAD OF ERROR
+        result["warning"] = "Using generic parser. Some fields may not be labeled."
+        return generic_parse(segments, doc_type)
+    metrics.observe("detect", started, doc_type)
+
+    started = metrics.start()
+    data = transaction_set.factory()
+    if validate:
+        # Required-element checks ride along with the parse (see validation.py)
+        result["errors"] = validation.dispatch_checked(doc_type, transaction_set.handlers, segments, data,
+                                                       parse_state(segments.dialect))
+    else:
+        dispatch(transaction_set.handlers, segments, data, parse_state(segments.dialect))
+    metrics.observe("parse", started, doc_type, segments=len(segments), nbytes=segments.nbytes)
+    return data
+
+def _route_stream(segments: Iterable[EDISegment], result: dict) -> dict:
+    head: List[EDISegment] = []   # envelope segments seen before ST
+    handlers = None               # set once ST picks a typed parser
+    structure = None              # set once ST falls back to the generic view
+    data: dict = {}
+    state: dict = {}
+
+    for seg in segments:
+        result["segments_read"] += 1
+        if handlers is not None:
+            handler = handlers.get(seg.tag)
+            if handler is not None:
+                handler(seg, data, state)
+            continue
+        if structure is not None:
+            structure.append({"segment": seg.tag, "elements": seg.elements})
+            continue
+
+        head.append(seg)
+        if seg.tag != "ST":
+            continue
+
+        # Detect Type from ST Segment, then replay the envelope head
+        doc_type = result["detected_type"] = seg.get(1)
+        transaction_set = get_parser(doc_type)
+        if transaction_set is not None:
+            handlers = transaction_set.handlers
+            data = transaction_set.factory()
+            if head[0].tag == "ISA":
+                state = parse_state(get_profiles().for_isa(head[0]))
+            dispatch(handlers, head, data, state)
+        else:
+            # USE FALLBACK INSTEAD OF ERROR
+            data = generic_parse(head, doc_type)
+            structure = data["structure"]
+            result["warning"] = "Using generic parser. Some fields may not be labeled."
+        head = []
+
+    if head:
+        # No ST segment at all
+        data = generic_parse(head, result["detected_type"])
+        result["warning"] = "Using generic parser. Some fields may not be labeled."
+    return data
+
+def parse_segments(segments: Iterable[EDISegment], validate: bool = False) -> dict:
+    """
+    Detects the type from ST and routes every segment to the registered
+    handlers in one pass. Lazy iterators (e.g. X12StreamTokenizer) are
+    consumed exactly once.
+    With validate=True (SegmentStore only) the result carries "errors": the
+    required segments/elements missing from this transaction set.
+    """
+    result = {
+        "success": True,
+        "detected_type": "Unknown",
+        "segments_read": 0,
+        "data": {}
+    }
+
+    try:
+        if isinstance(segments, SegmentStore):
+            result["segments_read"] = len(segments)
+            if validate:
+                result["errors"] = []
+            data = _route_store(segments, result, validate)
+        else:
+            started = metrics.start()
+            data = _route_stream(segments, result)
+            metrics.observe("parse", started, result["detected_type"], segments=result["segments_read"])
+    except Exception as e:
+        logging.error(f"Parser Error: {e}")
+        result["success"] = False
+        result["error"] = f"Parsing failed: {str(e)}"
+        return result
+
+    if not result["segments_read"]:
+        return {"error": "Empty or invalid EDI content", "success": False}
+
+    result["data"] = data
+    return result
+
+from . import validation  # noqa: E402
@@ -0,0 +1,171 @@
+"""
+Content-addressed cache for analysis results.
+Keyed by a hash of the normalized EDI content plus model name and prompt
+version, so byte-identical resends (duplicate 850s, 997s...) skip both the
+parse and the model call. Two tiers: an in-memory LRU and an optional SQLite
+file with TTL and size-based eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .core import detect_delimiters
+
+def normalize_content(raw_content: str) -> str:
+    """Strips surrounding whitespace and line breaks that the tokenizer ignores anyway."""
+    content = raw_content.strip()
+    _, segment_term = detect_delimiters(content)
+    if segment_term in ("\n", "\r"):
+        return content.replace("\r\n", "\n")
+    return content.replace("\r", "").replace("\n", "")
+
+def cache_key(raw_content: str, model: str, prompt_version: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{prompt_version}\0".encode("utf-8"))
+    digest.update(normalize_content(raw_content).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Thread-safe two-tier cache of JSON-serializable results.
+    Values are stored as JSON text, so every hit returns a fresh copy.
+    """
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None,
+                 ttl_seconds: Optional[float] = None, max_disk_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._db.commit()
+            self._evict_disk()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            text = None
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    del self._memory[key]
+                else:
+                    text = entry[0]
+                    self._memory.move_to_end(key)
+            if text is None and self._db is not None:
+                row = self._disk_get(key)
+                if row is not None:
+                    text = row[0]
+                    self.disk_hits += 1
+                    self._remember(key, text, row[1])
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(text)
+
+    def put(self, key: str, value: dict) -> None:
+        text = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, text, len(text), now, now),
+                )
+                self._db.commit()
+                self._puts += 1
+                # Eviction scans the table, so amortize it over several writes
+                if self._puts % 100 == 0:
+                    self._evict_disk()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    # --- internals (caller holds the lock) ---
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and created < time.time() - self.ttl_seconds
+
+    def _remember(self, key: str, text: str, created: float) -> None:
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return row
+
+    def _evict_disk(self) -> None:
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,))
+        if self.max_disk_bytes is not None:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_disk_bytes:
+                # Drop least recently used rows until the table fits again
+                excess = total - self.max_disk_bytes
+                freed = 0
+                doomed = []
+                for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._db.commit()
+
+def cache_from_env() -> ResultCache:
+    """
+    EDI_CACHE_SIZE      in-memory entries (default 256)
+    EDI_CACHE_PATH      SQLite file for the persistent tier (default: memory only)
+    EDI_CACHE_TTL       seconds an entry stays valid (default 86400)
+    EDI_CACHE_MAX_MB    disk tier size cap (default 512)
+    """
+    path = os.environ.get("EDI_CACHE_PATH") or None
+    return ResultCache(
+        max_entries=int(os.environ.get("EDI_CACHE_SIZE", "256")),
+        path=path,
+        ttl_seconds=float(os.environ.get("EDI_CACHE_TTL", "86400")),
+        max_disk_bytes=int(float(os.environ.get("EDI_CACHE_MAX_MB", "512")) * 1024 * 1024),
+    )
@@ -0,0 +1,103 @@
+"""
+STDIO RPC: Newline-delimited JSON-RPC loop for a long-lived engine process.
+One request per line in, one response per line out, written as each
+request completes (not necessarily in arrival order).
+
+Request:  {"jsonrpc": "2.0", "id": 7, "method": "parse", "params": {"content": "ISA*00..."}}
+Response: {"jsonrpc": "2.0", "id": 7, "result": {...}}
+      or  {"jsonrpc": "2.0", "id": 7, "error": {"code": -32603, "message": "..."}}
+
+The one-shot payload shape ({"command": "parse", "content": "..."}) is also
+accepted per line, so callers can switch over without changing payloads.
+
+Methods that return a generator stream: each item is sent as
+{"id": 7, "stream": <item>} and a final {"id": 7, "result": {"streamed": n}} closes the call.
+"""
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import GeneratorType
+from typing import Any, Callable, Dict, Optional, TextIO
+
+from . import metrics
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+Method = Callable[[dict], Any]
+
+class RPCServer:
+    def __init__(self, methods: Dict[str, Method], stdin: Optional[TextIO] = None,
+                 stdout: Optional[TextIO] = None, max_workers: int = 4):
+        self.methods = methods
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.max_workers = max_workers
+        self._write_lock = threading.Lock()
+
+    def send(self, message: dict) -> None:
+        started = metrics.start()
+        line = json.dumps({"jsonrpc": "2.0", **message})
+        metrics.observe("serialize", started, nbytes=len(line))
+        with self._write_lock:
+            self.stdout.write(line + "\n")
+            self.stdout.flush()
+
+    def _error(self, request_id, code: int, message: str) -> None:
+        self.send({"id": request_id, "error": {"code": code, "message": message}})
+
+    def _run(self, request_id, method: Method, params: dict) -> None:
+        try:
+            result = method(params)
+            if isinstance(result, GeneratorType):
+                streamed = 0
+                for item in result:
+                    self.send({"id": request_id, "stream": item})
+                    streamed += 1
+                result = {"streamed": streamed}
+            # Inside the try: a result that can't be serialized still answers this id
+            self.send({"id": request_id, "result": result})
+        except Exception as e:
+            self._error(request_id, INTERNAL_ERROR, str(e))
+
+    def serve_forever(self) -> None:
+        """Reads requests until EOF or a `shutdown` call, then drains in-flight work."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for line in self.stdin:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    self._error(None, PARSE_ERROR, "Parse error")
+                    continue
+                if not isinstance(request, dict):
+                    self._error(None, INVALID_REQUEST, "Invalid request")
+                    continue
+
+                request_id = request.get("id")
+                name = request.get("method") or request.get("command", "parse")
+                params = request.get("params")
+                if params is None:
+                    params = {k: v for k, v in request.items() if k not in ("jsonrpc", "id", "method", "command")}
+
+                if name == "shutdown":
+                    self.send({"id": request_id, "result": "bye"})
+                    break
+                if name == "ping":
+                    self.send({"id": request_id, "result": "pong"})
+                    continue
+
+                method = self.methods.get(name)
+                if method is None:
+                    self._error(request_id, METHOD_NOT_FOUND, f"Unknown method: {name}")
+                    continue
+                pool.submit(self._run, request_id, method, params)
+
+def serve(methods: Dict[str, Method], max_workers: int = 4) -> None:
+    """Runs the stdio RPC loop on this process's stdin/stdout."""
+    RPCServer(methods, max_workers=max_workers).serve_forever()
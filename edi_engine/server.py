@@ -1,40 +1,72 @@
 import sys
 import json
-import edi_engine
+from edi_engine.incremental import SessionManager
+from edi_engine.legacy import parse_edi
+from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
+from edi_engine.rpc import serve
+from edi_engine.validation import validate_edi
 
-# Import the new AI service safely
-try:
-    from edi_engine.ai_service import analyze_edi_with_ai
-except ImportError:
-    analyze_edi_with_ai = None
+def _ai_service():
+    """The AI service (and its SDK, HTTP client, cache) is imported on the first analyze only."""
+    try:
+        from edi_engine.ai_service import analyze_edi_with_ai
+    except ImportError:
+        return None
+    return analyze_edi_with_ai
+
+def handle(command: str, content: str) -> dict:
+    if command == "analyze":
+        analyze_edi_with_ai = _ai_service()
+        if analyze_edi_with_ai:
+            # This returns { parsed: {...}, ai_analysis: "..." }
+            return analyze_edi_with_ai(content)
+        return {"error": "AI Service file not found."}
+    if command == "validate":
+        return validate_edi(content)
+    # Standard Parse (Legacy behavior)
+    return parse_edi(content)
+
+def stream_records(content: str, view: str = "typed"):
+    """NDJSON records for the parse_stream command (view: "typed" or "segments")."""
+    if view == "segments":
+        return iter_segment_records(content)
+    return iter_parse_records(content)
 
 def main():
     """
     Reads a JSON payload from Electron.
-    Payload format: { "command": "parse"|"analyze", "content": "ISA*00..." }
+    Payload format: { "command": "parse"|"analyze"|"parse_stream"|"validate", "content": "ISA*00..." }
+    parse_stream prints NDJSON (header, one line per segment/item, trailer) instead of one document.
+
+    With --serve, stays alive and answers newline-delimited JSON-RPC requests
+    (see edi_engine.rpc) so the interpreter and SDK imports are paid once.
     """
+    if "--serve" in sys.argv[1:]:
+        serve({
+            "parse": lambda params: handle("parse", params.get("content", "")),
+            "analyze": lambda params: handle("analyze", params.get("content", "")),
+            "parse_stream": lambda params: stream_records(params.get("content", ""), params.get("view", "typed")),
+            "validate": lambda params: validate_edi(params.get("content", "")),
+            # Editor sessions: session_open / session_edit (returns a JSON Patch) / session_close
+            **SessionManager().methods(),
+        })
+        return
+
     input_data = sys.stdin.read()
     if not input_data: return
 
     try:
         request = json.loads(input_data)
-        command = request.get("command", "parse") 
+        command = request.get("command", "parse")
         content = request.get("content", "")
+        if command == "parse_stream":
+            for line in ndjson_lines(stream_records(content, request.get("view", "typed"))):
+                sys.stdout.write(line)
+            return
+        print(json.dumps(handle(command, content)))
 
-        if command == "analyze":
-            if analyze_edi_with_ai:
-                # This returns { parsed: {...}, ai_analysis: "..." }
-                result = analyze_edi_with_ai(content)
-            else:
-                result = {"error": "AI Service file not found."}
-        else:
-            # Standard Parse (Legacy behavior)
-            result = edi_engine.parse_edi(content)
-        
-        print(json.dumps(result))
-        
     except Exception as e:
         print(json.dumps({"error": str(e)}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,47 @@
+from typing import Optional
+
+def format_date(edi_date: str) -> str:
+    if not edi_date or len(edi_date) != 8: return edi_date or "N/A"
+    return f"{edi_date[:4]}-{edi_date[4:6]}-{edi_date[6:]}"
+
+def format_currency(amount_str: str) -> float:
+    try: return float(amount_str)
+    except (ValueError, TypeError): return 0.0
+
+def mask_pii(value: str) -> str:
+    if not value: return "UNKNOWN"
+    if len(value) < 5: return "****"
+    return f"****{value[-4:]}"
+
+def parse_fixed(amount_str: str, places: int = 2) -> Optional[int]:
+    """
+    Exact integer value of an X12 decimal (R) in units of 10**-places, rounded
+    half away from zero: parse_fixed("12.5") == 1250. None when missing or invalid.
+    """
+    if not amount_str: return None
+    text = amount_str.strip()
+    sign = 1
+    if text and text[0] in "+-":
+        sign = -1 if text[0] == "-" else 1
+        text = text[1:]
+    whole, _, frac = text.partition(".")
+    digits = whole + frac
+    if not digits or not digits.isdigit() or not digits.isascii(): return None
+    value = int(whole or "0") * 10 ** places + int(frac[:places].ljust(places, "0") or "0")
+    if len(frac) > places and frac[places] >= "5":
+        value += 1
+    return sign * value
+
+def parse_cents(amount_str: str) -> Optional[int]:
+    """Integer cents of a monetary amount ("12.5" -> 1250), no float on the way."""
+    return parse_fixed(amount_str, 2)
+
+def dollars(cents: Optional[int]) -> float:
+    """The float dollar amount the typed results report next to their *_cents keys (0.0 when missing)."""
+    return cents / 100 if cents is not None else 0.0
+
+def parse_implied_cents(amount_str: str) -> Optional[int]:
+    """Integer cents of an N2 amount (implied two decimals, e.g. TDS01 "12345" -> 12345)."""
+    if amount_str and "." in amount_str:
+        return parse_cents(amount_str)  # sent as R anyway
+    return parse_fixed(amount_str, 0)
@@ -0,0 +1,308 @@
+"""
+VALIDATION ENGINE: Envelope integrity, segment syntax and required elements.
+
+Nothing here re-scans the document:
+- the tokenizer records where the ISA/GS/ST/SE/GE/IEA segments are while it
+  splits the buffer (`marks`), so the envelope checks read only those segments;
+- segment syntax is checked once per distinct tag in the store's tag table;
+- required elements are checked in the parser's routing loop, on the element
+  lists the handlers split anyway.
+
+    result = parse_typed(raw, validate=True)    # typed parse + result["validation"]
+    report = validate_edi(raw)                  # checks only
+
+Errors are dicts: {"code", "message", "segment" (0-based index in the interchange),
+"tag", "element" (when one element is at fault)}.
+"""
+import re
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from .core import EDISegment, SegmentStore, X12Tokenizer
+
+ENVELOPE_TAGS = ("ISA", "GS", "ST", "SE", "GE", "IEA")
+TAG_SYNTAX = re.compile(r"[A-Z][A-Z0-9]{1,2}\Z")
+ISA_ELEMENTS = 17  # tag + ISA01..ISA16
+MAX_ERRORS = 1000
+
+# transaction set -> segments that must appear at least once
+REQUIRED_SEGMENTS: Dict[str, tuple] = {
+    "850": ("BEG",),
+    "855": ("BAK",),
+    "810": ("BIG",),
+    "856": ("BSN", "HL"),
+    "940": ("W05",),
+    "214": ("B10",),
+    "997": ("AK1", "AK9"),
+    "837": ("BHT", "CLM"),
+    "835": ("BPR", "TRN"),
+    "270": ("BHT",),
+    "271": ("BHT",),
+}
+
+# transaction set -> tag -> element positions that must not be empty
+REQUIRED_ELEMENTS: Dict[str, Dict[str, tuple]] = {
+    "850": {"BEG": (1, 2, 3, 5), "PO1": (2, 3)},
+    "855": {"BAK": (1, 2, 3, 4)},
+    "810": {"BIG": (1, 2), "IT1": (2, 3, 4), "TDS": (1,)},
+    "856": {"BSN": (1, 2, 3, 4), "HL": (1, 3)},
+    "940": {"W05": (1, 2), "W01": (1, 2)},
+    "214": {"B10": (1, 2)},
+    "997": {"AK1": (1, 2), "AK9": (1, 2, 3, 4)},
+    "837": {"BHT": (1, 2), "CLM": (1, 2), "NM1": (1, 2)},
+    "835": {"BPR": (1, 2), "TRN": (1, 2), "CLP": (1, 2, 3)},
+    "270": {"BHT": (1, 2), "NM1": (1, 2)},
+    "271": {"BHT": (1, 2), "NM1": (1, 2)},
+}
+
+def new_marks() -> Dict[str, List[int]]:
+    """Empty `marks` for X12Tokenizer.tokenize(marks=...)."""
+    return {tag: [] for tag in ENVELOPE_TAGS}
+
+def _error(code: str, message: str, segment: Optional[int], tag: Optional[str], element: Optional[int] = None) -> dict:
+    error = {"code": code, "message": message, "segment": segment, "tag": tag}
+    if element is not None:
+        error["element"] = element
+    return error
+
+def tag_positions(store: SegmentStore, tag: str, limit: Optional[int] = None) -> List[int]:
+    """Indices of the segments with `tag` (the first `limit` of them)."""
+    positions: List[int] = []
+    try:
+        tag_id = store._tags.index(tag)
+        index = store._tag_ids.index
+        k = -1
+        while limit is None or len(positions) < limit:
+            k = index(tag_id, k + 1)
+            positions.append(k)
+    except ValueError:
+        pass
+    return positions
+
+# --- ENVELOPE ---
+
+def _number(seg, index: int, errors: List[dict], position: int) -> Optional[int]:
+    value = seg.get(index)
+    if value is not None and value.isdigit():
+        return int(value)
+    errors.append(_error("INVALID_NUMBER", f"{seg.tag}{index:02d} must be a number, got {value!r}",
+                         position, seg.tag, index))
+    return None
+
+def _control(seg, index: int, expected: Optional[str], opener: str, errors: List[dict], position: int) -> None:
+    value = seg.get(index)
+    if value != expected:
+        errors.append(_error("CONTROL_MISMATCH", f"{seg.tag}{index:02d} {value!r} does not match {opener} {expected!r}",
+                             position, seg.tag, index))
+
+def check_envelope(store: SegmentStore, marks: Optional[Dict[str, List[int]]] = None) -> List[dict]:
+    """
+    SE/GE/IEA counts and control numbers against their ST/GS/ISA, plus missing or
+    misplaced envelope segments. Reads only the envelope segments.
+    """
+    if marks is None:
+        marks = {tag: tag_positions(store, tag) for tag in ENVELOPE_TAGS}
+    errors: List[dict] = []
+    if not len(store):
+        return [_error("EMPTY", "No segments found", None, None)]
+    events = sorted((index, tag) for tag in ENVELOPE_TAGS for index in marks.get(tag, ()))
+    if store.tag(0) != "ISA":
+        errors.append(_error("ISA_MISSING", "Interchange does not start with ISA", 0, store.tag(0)))
+    if not marks.get("ST"):
+        errors.append(_error("ST_MISSING", "No ST transaction set found", None, None))
+
+    isa = gs = st = None          # (index, segment) of the open envelopes
+    groups = sets = 0
+
+    def close_st() -> None:
+        errors.append(_error("SE_MISSING", f"Transaction set {st[1].get(2)!r} has no SE", st[0], "ST"))
+
+    def close_gs() -> None:
+        errors.append(_error("GE_MISSING", f"Group {gs[1].get(6)!r} has no GE", gs[0], "GS"))
+
+    for index, tag in events:
+        seg = store[index]
+        if tag == "ISA":
+            if st: close_st(); st = None
+            if gs: close_gs(); gs = None
+            if isa:
+                errors.append(_error("IEA_MISSING", f"Interchange {isa[1].get(13)!r} has no IEA", isa[0], "ISA"))
+            elements = seg.elements
+            if len(elements) != ISA_ELEMENTS:
+                errors.append(_error("ISA_SYNTAX", f"ISA has {len(elements) - 1} elements, expected 16", index, tag))
+            control = seg.get(13) or ""
+            if not (len(control) == 9 and control.isdigit()):
+                errors.append(_error("ISA_SYNTAX", f"ISA13 must be 9 digits, got {control!r}", index, tag, 13))
+            isa, groups = (index, seg), 0
+        elif tag == "GS":
+            if st: close_st(); st = None
+            if gs: close_gs()
+            if not isa:
+                errors.append(_error("OUTSIDE_ENVELOPE", "GS outside an ISA interchange", index, tag))
+            gs, sets = (index, seg), 0
+            groups += 1
+        elif tag == "ST":
+            if st: close_st()
+            if not gs:
+                errors.append(_error("OUTSIDE_ENVELOPE", "ST outside a GS group", index, tag))
+            st = (index, seg)
+            sets += 1
+        elif tag == "SE":
+            if not st:
+                errors.append(_error("UNEXPECTED_TRAILER", "SE without an open ST", index, tag))
+                continue
+            count = _number(seg, 1, errors, index)
+            if count is not None and count != index - st[0] + 1:
+                errors.append(_error("SE_COUNT_MISMATCH",
+                                     f"SE01 is {count}, transaction set has {index - st[0] + 1} segments",
+                                     index, tag, 1))
+            _control(seg, 2, st[1].get(2), "ST02", errors, index)
+            st = None
+        elif tag == "GE":
+            if st: close_st(); st = None
+            if not gs:
+                errors.append(_error("UNEXPECTED_TRAILER", "GE without an open GS", index, tag))
+                continue
+            count = _number(seg, 1, errors, index)
+            if count is not None and count != sets:
+                errors.append(_error("GE_COUNT_MISMATCH", f"GE01 is {count}, group has {sets} transaction sets",
+                                     index, tag, 1))
+            _control(seg, 2, gs[1].get(6), "GS06", errors, index)
+            gs = None
+        elif tag == "IEA":
+            if st: close_st(); st = None
+            if gs: close_gs(); gs = None
+            if not isa:
+                errors.append(_error("UNEXPECTED_TRAILER", "IEA without an open ISA", index, tag))
+                continue
+            count = _number(seg, 1, errors, index)
+            if count is not None and count != groups:
+                errors.append(_error("IEA_COUNT_MISMATCH", f"IEA01 is {count}, interchange has {groups} groups",
+                                     index, tag, 1))
+            _control(seg, 2, isa[1].get(13), "ISA13", errors, index)
+            isa = None
+
+    if st: close_st()
+    if gs: close_gs()
+    if isa:
+        errors.append(_error("IEA_MISSING", f"Interchange {isa[1].get(13)!r} has no IEA", isa[0], "ISA"))
+    return errors
+
+# --- SEGMENT SYNTAX ---
+
+def check_syntax(store: SegmentStore) -> List[dict]:
+    """Segment ids must be 2-3 uppercase letters/digits starting with a letter."""
+    errors: List[dict] = []
+    for tag in store._tags:
+        if TAG_SYNTAX.match(tag):
+            continue
+        for index in tag_positions(store, tag, MAX_ERRORS):
+            errors.append(_error("SEGMENT_SYNTAX", f"Invalid segment id {tag!r}", index, tag))
+    return errors
+
+# --- REQUIRED ELEMENTS ---
+
+def dispatch_checked(doc_type: str, handlers: Dict[str, object], store: SegmentStore,
+                     data: Optional[dict], state: Optional[dict]) -> List[dict]:
+    """
+    registry.dispatch() with the required-element checks done in the same loop,
+    on the element lists the handlers split anyway; returns this set's errors.
+    Tags with rules but no handler are materialized for the check only.
+    """
+    rules = REQUIRED_ELEMENTS.get(doc_type, {})
+    tags = store._tags
+    # tag id -> (handler, getter of the required elements) or None; the getter
+    # always returns a tuple, even for one position ("" in a bare string always matches)
+    table = []
+    for tag in tags:
+        handler, required = handlers.get(tag), rules.get(tag)
+        getter = itemgetter(*required, required[0]) if required else None
+        table.append((handler, getter) if handler is not None or getter is not None else None)
+
+    flagged = []
+    buffer, sep, delims = store.buffer, store.element_sep, store.delims
+    for tag_id, start, end in zip(store._tag_ids, store._starts, store._ends):
+        entry = table[tag_id]
+        if entry is None:
+            continue
+        handler, getter = entry
+        seg = EDISegment(tags[tag_id], None, buffer[start:end], sep, delims)
+        if getter is not None:
+            try:
+                if "" in getter(seg.elements):
+                    flagged.append((start, seg))
+            except IndexError:
+                flagged.append((start, seg))
+        if handler is not None:
+            handler(seg, data, state)
+    return transaction_errors(store, doc_type, flagged)
+
+def transaction_errors(store: SegmentStore, doc_type: str, flagged: list = ()) -> List[dict]:
+    """Missing required segments, plus one error per empty required element of the `flagged` (offset, segment)s."""
+    errors: List[dict] = []
+    st_index = store.find_tag("ST")
+    for tag in REQUIRED_SEGMENTS.get(doc_type, ()):
+        if store.find_tag(tag) < 0:
+            errors.append(_error("SEGMENT_MISSING", f"{doc_type} requires a {tag} segment",
+                                 st_index if st_index >= 0 else None, tag))
+    rules = REQUIRED_ELEMENTS.get(doc_type, {})
+    for start, seg in flagged[:MAX_ERRORS]:
+        index = bisect_left(store._starts, start)
+        elements = seg.elements
+        for element in rules[seg.tag]:
+            if element >= len(elements) or not elements[element]:
+                errors.append(_error("ELEMENT_MISSING", f"{seg.tag}{element:02d} is required in {doc_type}",
+                                     index, seg.tag, element))
+    return errors
+
+def check_transactions(store: SegmentStore) -> List[dict]:
+    """Required segments/elements of every transaction set, without a typed parse."""
+    from .envelope import transaction_bounds  # envelope -> registry -> this module
+    errors: List[dict] = []
+    for _, first, stop in transaction_bounds(store):
+        window = store.window(first, stop)
+        errors.extend(_rebase(dispatch_checked(window[0].get(1), {}, window, None, None), first))
+    return errors
+
+def _rebase(errors: List[dict], first: int) -> List[dict]:
+    for error in errors:
+        if error["segment"] is not None:
+            error["segment"] += first
+    return errors
+
+# --- REPORT ---
+
+def validate_store(store: SegmentStore, marks: Optional[Dict[str, List[int]]] = None,
+                   result: Optional[dict] = None) -> dict:
+    """
+    Validation report for a tokenized interchange. With `result` (from
+    parse_store(..., validate=True)), the per-set "errors" it carries are moved
+    into the report; otherwise required elements are checked here.
+    """
+    if marks is None:
+        marks = {tag: tag_positions(store, tag) for tag in ENVELOPE_TAGS}
+    errors = check_envelope(store, marks) + check_syntax(store)
+    if result is None:
+        errors += check_transactions(store)
+    elif "transactions" in result.get("data", {}) and "transaction_count" in result:
+        # One result per set, in ST order
+        for first, txn in zip(marks["ST"], result["data"]["transactions"]):
+            errors += _rebase(txn.pop("errors", []), first)
+    else:
+        errors += result.pop("errors", [])
+    errors.sort(key=lambda e: -1 if e["segment"] is None else e["segment"])
+    return {
+        "valid": not errors,
+        "error_count": len(errors),
+        "errors": errors[:MAX_ERRORS],
+        "interchanges": len(marks["ISA"]),
+        "groups": len(marks["GS"]),
+        "transactions": len(marks["ST"]),
+    }
+
+def validate_edi(raw_content: str) -> dict:
+    """CHECK-ONLY ENTRY POINT: validation report for raw X12 text (no typed parse)."""
+    marks = new_marks()
+    store = X12Tokenizer(raw_content).tokenize(marks)
+    return validate_store(store, marks)
@@ -1,17 +1,25 @@
-from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi import FastAPI, HTTPException, Header, Depends, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import os
 import sys
+from typing import Optional
 
 # Import your engine logic
 # In the final zip, ensure 'edi_engine' folder is included
 try:
-    from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine import metrics
+    from edi_engine.async_service import AnalysisExecutor, AnalysisSaturated
+    from edi_engine.batch import BatchLimits, BatchTooLarge, iter_batch, json_batch, ndjson_batch, read_batch
+    from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
 except ImportError:
     # Fallback for when running in a standalone folder structure
     sys.path.append(os.path.dirname(__file__))
-    from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine import metrics
+    from edi_engine.async_service import AnalysisExecutor, AnalysisSaturated
+    from edi_engine.batch import BatchLimits, BatchTooLarge, iter_batch, json_batch, ndjson_batch, read_batch
+    from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
 
 app = FastAPI(title="EDI Pro Engine (Self-Hosted)")
 
@@ -19,6 +27,13 @@ app = FastAPI(title="EDI Pro Engine (Self-Hosted)")
 # The installer script will generate a .env file with these values
 SECRET_ACCESS_TOKEN = os.getenv("EDI_SERVER_TOKEN", "change_me_please")
 
+# Parse pool / AI thread pool sizes and backlog limit come from EDI_PARSE_WORKERS,
+# EDI_AI_WORKERS and EDI_MAX_PENDING (see edi_engine.async_service)
+analysis_executor = AnalysisExecutor.from_env()
+
+# /parse/batch limits and chunking: EDI_BATCH_MAX_ITEMS, EDI_BATCH_MAX_BYTES, EDI_BATCH_CHUNK_BYTES
+batch_limits = BatchLimits.from_env()
+
 class EDIRequest(BaseModel):
     edi_content: str
 
@@ -26,22 +41,86 @@ async def verify_token(x_access_token: str = Header(...)):
     if x_access_token != SECRET_ACCESS_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid Access Token")
 
+@app.on_event("shutdown")
+def shutdown_pools():
+    analysis_executor.shutdown()
+
 @app.get("/")
 def health_check():
     return {"status": "online", "version": "1.0.0 (Pro)"}
 
 @app.post("/analyze", dependencies=[Depends(verify_token)])
-async def analyze_endpoint(request: EDIRequest):
+async def analyze_endpoint(request: EDIRequest, profile: Optional[str] = None):
     """
     Unlimited AI Analysis endpoint.
+    ?profile=cpu|memory returns a cProfile / tracemalloc report (needs EDI_PROFILING=1).
     """
     try:
-        # The engine automatically picks up the GEMINI_API_KEY from os.environ
-        result = analyze_edi_with_ai(request.edi_content)
+        # The engine automatically picks up the GEMINI_API_KEY from os.environ.
+        # Parsing and the model call run off the event loop.
+        kind, return_report = metrics.profile_kind(profile)
+        if kind:
+            result, report = await analysis_executor.profile(request.edi_content, kind)
+            if return_report:
+                return {"status": "success", "data": result, "profile": report}
+            metrics.log_profile(report, "/analyze")
+        else:
+            result = await analysis_executor.analyze(request.edi_content)
         return {"status": "success", "data": result}
+    except AnalysisSaturated:
+        raise HTTPException(status_code=429, detail="Server busy, retry shortly.", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape target: stage timings and throughput (enable with EDI_METRICS=1).
+    Needs "Authorization: Bearer $EDI_METRICS_TOKEN"; not served at all without that token.
+    """
+    code = metrics.scrape_status(authorization)
+    if code == 404:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if code == 401:
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/parse/stream", dependencies=[Depends(verify_token)])
+async def parse_stream(request: EDIRequest, view: str = "typed"):
+    """
+    Streaming parse (no AI): NDJSON header, one line per line item / claim, then a trailer.
+    ?view=segments streams the raw segment list instead of the typed result.
+    """
+    if view == "segments":
+        records = iter_segment_records(request.edi_content)
+    else:
+        records = iter_parse_records(request.edi_content)
+    # Sync generator: Starlette iterates it in a worker thread, off the event loop
+    return StreamingResponse(ndjson_lines(records), media_type="application/x-ndjson")
+
+@app.post("/parse/batch", dependencies=[Depends(verify_token)])
+async def parse_batch(request: Request, stream: bool = False, validate: bool = False):
+    """
+    Bulk parse (no AI): a JSON array of EDI strings / {"name", "content"} objects,
+    multipart file uploads, or a zip / tar body (see edi_engine.batch).
+    Documents are parsed concurrently on the parse pool and returned in input order,
+    one record per document; a document that fails doesn't fail the batch.
+    ?stream=true sends NDJSON lines as documents finish, then a summary line.
+    """
+    try:
+        batch = await read_batch(request, batch_limits)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {e}")
+    if analysis_executor.pending >= analysis_executor.max_pending:
+        raise HTTPException(status_code=429, detail="Server busy, retry shortly.", headers={"Retry-After": "1"})
+
+    records = iter_batch(analysis_executor, batch, validate)
+    if stream:
+        return StreamingResponse(ndjson_batch(records), media_type="application/x-ndjson")
+    return Response(await json_batch(records), media_type="application/json")
+
 if __name__ == "__main__":
     # Standard port 8000
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from jose import JWTError, jwt
@@ -11,11 +12,23 @@ import sys
 # --- SETUP ENGINE IMPORT ---
 # We assume the 'edi_engine' folder is copied into this backend folder for deployment
 try:
-    from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine import metrics
+    from edi_engine.async_service import AnalysisExecutor, AnalysisSaturated
+    from edi_engine.batch import BatchLimits, BatchTooLarge, iter_batch, json_batch, ndjson_batch, read_batch
+    from edi_engine.auth import PasswordVerifier, TokenCache, user_store_from_env
+    from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
+    from edi_engine.jobs import JobQueue, TierNotAllowed
+    from edi_engine.validation import validate_edi
 except ImportError:
     # Safely append parent directory to path for local testing structure
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-    from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine import metrics
+    from edi_engine.async_service import AnalysisExecutor, AnalysisSaturated
+    from edi_engine.batch import BatchLimits, BatchTooLarge, iter_batch, json_batch, ndjson_batch, read_batch
+    from edi_engine.auth import PasswordVerifier, TokenCache, user_store_from_env
+    from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
+    from edi_engine.jobs import JobQueue, TierNotAllowed
+    from edi_engine.validation import validate_edi
 
 app = FastAPI(title="EDI Cloud Platform (SaaS)")
 
@@ -24,6 +37,18 @@ SECRET_KEY = "YOUR_SUPER_SECRET_KEY_HERE"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Parse pool / AI thread pool sizes and backlog limit come from EDI_PARSE_WORKERS,
+# EDI_AI_WORKERS and EDI_MAX_PENDING (see edi_engine.async_service)
+analysis_executor = AnalysisExecutor.from_env()
+
+# /parse/batch limits and chunking: EDI_BATCH_MAX_ITEMS, EDI_BATCH_MAX_BYTES, EDI_BATCH_CHUNK_BYTES
+batch_limits = BatchLimits.from_env()
+
+# Background jobs for large documents: SQLite file from EDI_JOBS_DB,
+# per-tier concurrency from EDI_JOB_LIMITS (default "pro=4"). Jobs parse on the
+# analysis executor's process pool; the job thread only waits on it and the model.
+job_queue = JobQueue.from_env(analysis_executor.analyze_blocking)
+
 # --- SECURITY TOOLS ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -53,6 +78,13 @@ users_db = {
     }
 }
 
+# Verified tokens (EDI_TOKEN_CACHE_SIZE / EDI_TOKEN_CACHE_TTL), users through a pooled
+# PostgreSQL connection when EDI_DATABASE_URL is set (users_db otherwise) with a
+# short-TTL cache (EDI_USER_CACHE_TTL), bcrypt on EDI_AUTH_WORKERS threads
+token_cache = TokenCache.from_env()
+user_store = user_store_from_env(users_db)
+password_verifier = PasswordVerifier.from_env(pwd_context.verify)
+
 # --- DATA MODELS ---
 class Token(BaseModel):
     access_token: str
@@ -66,6 +98,10 @@ class User(BaseModel):
 class EDIRequest(BaseModel):
     content: str
 
+class JobCreated(BaseModel):
+    job_id: str
+    status: str
+
 # --- AUTHENTICATION LOGIC ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -73,6 +109,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def decode_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,28 +119,44 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Signature/exp check only on the first call with a given token
+        payload = token_cache.verify(token, decode_token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = users_db.get(username)
+    user = await user_store.get_user(username)
     if user is None:
         raise credentials_exception
     return user
 
 # --- ENDPOINTS ---
 
+@app.on_event("startup")
+def start_jobs():
+    job_queue.start()
+
+@app.on_event("shutdown")
+def shutdown_pools():
+    analysis_executor.shutdown()
+    password_verifier.shutdown()
+    job_queue.stop()
+
+@app.on_event("shutdown")
+async def close_user_store():
+    await user_store.close()
+
 @app.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Login Endpoint. Exchange username/password for a JWT Token.
-    The .verify() function is safe to call at runtime.
+    bcrypt runs on the password_verifier threads, not on the event loop.
     """
-    user = users_db.get(form_data.username)
-    if not user or not pwd_context.verify(form_data.password, user['hashed_password']):
+    # Uncached read, so a changed password takes effect immediately
+    user = await user_store.get_user(form_data.username, fresh=True)
+    if not user or not await password_verifier.verify(form_data.password, user['hashed_password']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -119,9 +174,10 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
     return current_user
 
 @app.post("/analyze")
-async def analyze_edi(request: EDIRequest, current_user: dict = Depends(get_current_user)):
+async def analyze_edi(request: EDIRequest, profile: Optional[str] = None, current_user: dict = Depends(get_current_user)):
     """
     The Money Endpoint.
+    ?profile=cpu|memory returns a cProfile / tracemalloc report (needs EDI_PROFILING=1).
     """
     # 1. Check Subscription Status
     if current_user.get("subscription_tier") != "pro":
@@ -130,9 +186,100 @@ async def analyze_edi(request: EDIRequest, current_user: dict = Depends(get_curr
             detail="Upgrade to Pro to use AI Analysis."
         )
 
-    # 2. Run AI Analysis
+    # 2. Run AI Analysis (parse and model call run off the event loop)
     try:
-        result = analyze_edi_with_ai(request.content)
+        kind, return_report = metrics.profile_kind(profile)
+        if kind:
+            result, report = await analysis_executor.profile(request.content, kind)
+            if return_report:
+                return {"status": "success", "data": result, "profile": report}
+            metrics.log_profile(report, "/analyze")
+        else:
+            result = await analysis_executor.analyze(request.content)
         return {"status": "success", "data": result}
+    except AnalysisSaturated:
+        raise HTTPException(status_code=429, detail="Server busy, retry shortly.", headers={"Retry-After": "1"})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape target: stage timings and throughput (enable with EDI_METRICS=1).
+    Needs "Authorization: Bearer $EDI_METRICS_TOKEN"; not served at all without that token.
+    """
+    code = metrics.scrape_status(authorization)
+    if code == 404:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if code == 401:
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/parse/stream")
+async def parse_stream(request: EDIRequest, view: str = "typed", current_user: dict = Depends(get_current_user)):
+    """
+    Streaming parse (no AI): NDJSON header, one line per line item / claim, then a trailer.
+    ?view=segments streams the raw segment list instead of the typed result.
+    """
+    if view == "segments":
+        records = iter_segment_records(request.content)
+    else:
+        records = iter_parse_records(request.content)
+    # Sync generator: Starlette iterates it in a worker thread, off the event loop
+    return StreamingResponse(ndjson_lines(records), media_type="application/x-ndjson")
+
+@app.post("/parse/batch")
+async def parse_batch(request: Request, stream: bool = False, validate: bool = False,
+                      current_user: dict = Depends(get_current_user)):
+    """
+    Bulk parse (no AI): a JSON array of EDI strings / {"name", "content"} objects,
+    multipart file uploads, or a zip / tar body (see edi_engine.batch).
+    Documents are parsed concurrently on the parse pool and returned in input order,
+    one record per document; a document that fails doesn't fail the batch.
+    ?stream=true sends NDJSON lines as documents finish, then a summary line.
+    """
+    try:
+        batch = await read_batch(request, batch_limits)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {e}")
+    if analysis_executor.pending >= analysis_executor.max_pending:
+        raise HTTPException(status_code=429, detail="Server busy, retry shortly.", headers={"Retry-After": "1"})
+
+    records = iter_batch(analysis_executor, batch, validate)
+    if stream:
+        return StreamingResponse(ndjson_batch(records), media_type="application/x-ndjson")
+    return Response(await json_batch(records), media_type="application/json")
+
+@app.post("/validate")
+def validate(request: EDIRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Envelope and syntax check (no AI): SE/GE/IEA counts, control numbers, required elements.
+    Sync route, so FastAPI runs it in its thread pool.
+    """
+    return validate_edi(request.content)
+
+@app.post("/jobs", response_model=JobCreated, status_code=202)
+def create_job(request: EDIRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Queue an analysis and return immediately. Poll GET /jobs/{job_id} for the result.
+    AI analysis, so Pro only (same gate as /analyze). Sync route: the SQLite insert
+    runs in FastAPI's thread pool, not on the event loop.
+    """
+    tier = current_user.get("subscription_tier", "free")
+    if tier != "pro":
+        raise HTTPException(status_code=403, detail="Upgrade to Pro to use AI Analysis.")
+    try:
+        job_id = job_queue.submit(current_user["username"], tier, request.content)
+    except TierNotAllowed as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = job_queue.store.get(job_id)
+    # Other users' jobs look exactly like missing ones
+    if job is None or job["owner"] != current_user["username"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -6,6 +6,7 @@ setup(
     description="EDI Project - X12 parser and services",
     packages=find_packages(exclude=("tests", "edi-desktop-app", "venv")),
     include_package_data=True,
+    entry_points={"console_scripts": ["edi-server = edi_engine.server:main"]},
     install_requires=[
         "fastapi",
         "uvicorn[standard]",
@@ -13,5 +14,6 @@ setup(
         "passlib[bcrypt]",
         "python-multipart",
         "google-genai",
+        "mcp>=0.1.0",  # was the edi-engine distribution's dependency (edi_engine/pyproject.toml)
     ],
 )
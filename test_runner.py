@@ -2,6 +2,7 @@ import sys
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # 1. Setup Environment
 current_dir = os.getcwd()
@@ -13,6 +14,7 @@ print("--- Starting Batch AI EDI Testing ---")
 # 2. Import Engine
 try:
     from edi_engine.ai_service import analyze_edi_with_ai
+    from edi_engine.validation import validate_edi
     print("Engine loaded successfully.\n")
 except ImportError:
     print("Could not load edi_engine. Make sure you are in the root folder.")
@@ -29,7 +31,7 @@ BEG*00*SA*PO-12345**20231204~
 DTM*002*20231210~
 N1*ST*SHIP TO LOCATION*92*12345~
 PO1*1*100*EA*10.50**VP*PART123~
-SE*8*0001~
+SE*6*0001~
 GE*1*1~
 IEA*1*000000001~"""
     },
@@ -53,31 +55,40 @@ IEA*1*000000002~"""
 ]
 
 # 4. Run Batch
-results = []
-
-for case in test_cases:
-    print(f"Processing: {case['name']}...")
-    
+# Cases run concurrently; the shared AI client (edi_engine.ai_client) applies the
+# concurrency / rate limits and retries, so this scales to large case lists.
+def run_case(case):
     start_time = time.time()
     
     # Call your AI Engine
     output = analyze_edi_with_ai(case['content'])
     
     duration = round(time.time() - start_time, 2)
-    
-    # Store result
-    results.append({
-        "test_name": case['name'],
-        "duration_seconds": duration,
-        "success": output.get("parsed", {}).get("success", False),
-        "ai_summary": output.get("ai_analysis", "No Analysis"),
-        "full_output": output
-    })
-    
-    if output.get("parsed", {}).get("success", False):
-        print(f"   Success ({duration}s)")
-    else:
-        print(f"   Failed / Skipped ({duration}s)")
+    return case, output, validate_edi(case['content']), duration
+
+results = []
+
+with ThreadPoolExecutor(max_workers=int(os.environ.get("EDI_AI_CONCURRENCY", "8"))) as pool:
+    for case, output, validation, duration in pool.map(run_case, test_cases):
+        print(f"Processing: {case['name']}...")
+
+        # A case only passes if it parsed AND its envelope/required elements check out
+        success = output.get("parsed", {}).get("success", False) and validation["valid"]
+        results.append({
+            "test_name": case['name'],
+            "duration_seconds": duration,
+            "success": success,
+            "validation_errors": validation["errors"],
+            "ai_summary": output.get("ai_analysis", "No Analysis"),
+            "full_output": output
+        })
+        
+        if success:
+            print(f"   Success ({duration}s)")
+        else:
+            print(f"   Failed / Skipped ({duration}s)")
+            for error in validation["errors"][:5]:
+                print(f"      segment {error['segment']}: {error['message']}")
 
 # 5. Save Report
 output_filename = "batch_results.json"
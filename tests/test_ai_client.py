@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from edi_engine import ai_service
+from edi_engine.ai_client import AIClient, FakeBackend, TokenBucket, is_retryable
+
+
+def test_requests_run_concurrently():
+    client = AIClient(FakeBackend(latency=0.05), concurrency=20)
+    try:
+        started = time.perf_counter()
+        answers = client.generate_many([f"prompt {i}" for i in range(40)])
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+    assert len(answers) == 40
+    assert elapsed < 0.5  # 40 x 50ms one at a time would be 2s
+
+
+def test_transient_failures_are_retried_with_backoff():
+    backend = FakeBackend(latency=0, fail_first=2)
+    client = AIClient(backend, max_retries=3, base_delay=0.01)
+    try:
+        assert "Fake AI Response" in client.generate("hello")
+    finally:
+        client.close()
+    assert backend.calls == 3
+    assert client.retries == 2
+
+
+def test_gives_up_after_max_retries():
+    client = AIClient(FakeBackend(latency=0, fail_first=10), max_retries=1, base_delay=0.01)
+    try:
+        with pytest.raises(Exception) as excinfo:
+            client.generate("hello")
+    finally:
+        client.close()
+    assert is_retryable(excinfo.value)
+    assert not is_retryable(ValueError("bad prompt"))
+
+
+def test_token_bucket_limits_rate():
+    client = AIClient(FakeBackend(latency=0), concurrency=10, rate=20, burst=1)
+    try:
+        started = time.perf_counter()
+        client.generate_many(["p"] * 6)
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+    assert elapsed >= 0.2  # 5 refills at 20/s after the first token
+    assert TokenBucket(5).capacity == 5
+
+
+def test_concurrent_first_calls_share_one_client(monkeypatch):
+    monkeypatch.setenv("EDI_AI_BACKEND", "fake")
+    monkeypatch.setattr(ai_service, "_ai_client", None)
+    with ThreadPoolExecutor(8) as pool:
+        clients = list(pool.map(lambda _: ai_service.get_ai_client(), range(32)))
+    assert len({id(client) for client in clients}) == 1
+    clients[0].close()
@@ -0,0 +1,57 @@
+import asyncio
+
+from edi_engine.async_service import AnalysisExecutor, AnalysisSaturated
+
+DOC = "ISA*00~ST*850*1~BEG*00*SA*P1~SE~"
+
+
+def test_backpressure_rejects_beyond_max_pending():
+    async def run():
+        executor = AnalysisExecutor(parse_workers=1, ai_workers=2, max_pending=3)
+        try:
+            return await asyncio.gather(*[executor.analyze(DOC, use_cache=False) for _ in range(5)],
+                                        return_exceptions=True)
+        finally:
+            executor.shutdown()
+
+    results = asyncio.run(run())
+    assert [isinstance(r, AnalysisSaturated) for r in results] == [False, False, False, True, True]
+    assert results[0]["parsed"]["success"]
+    assert "ai_analysis" in results[0]
+
+
+def test_unparseable_content_skips_model_call():
+    async def run():
+        executor = AnalysisExecutor(parse_workers=1, ai_workers=1)
+        try:
+            return await executor.analyze("", use_cache=False)
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(run())["error"] == "Could not parse EDI, AI analysis skipped"
+
+
+def test_blocking_analysis_parses_on_the_process_pool():
+    executor = AnalysisExecutor(parse_workers=1, ai_workers=1, inline_parse_bytes=0)
+    try:
+        result = executor.analyze_blocking(DOC.replace("P1", "JOB-1"))  # not in the result cache yet
+        assert executor._parse_pool is not None  # parsed in a worker process, not the job thread
+        assert result["parsed"]["success"] and "ai_analysis" in result
+        assert executor.analyze_blocking("")["error"] == "Could not parse EDI, AI analysis skipped"
+    finally:
+        executor.shutdown()
+
+
+def test_profiled_analysis_parses_on_the_pool_and_counts_as_pending():
+    async def run():
+        executor = AnalysisExecutor(parse_workers=1, ai_workers=1, max_pending=1, inline_parse_bytes=0)
+        try:
+            return await asyncio.gather(executor.profile(DOC, "cpu"), executor.profile(DOC, "cpu"),
+                                        return_exceptions=True), executor._parse_pool is not None
+        finally:
+            executor.shutdown()
+
+    (first, second), used_pool = asyncio.run(run())
+    result, report = first
+    assert used_pool and result["parsed"]["success"] and "prepare_analysis" in report["report"]
+    assert isinstance(second, AnalysisSaturated)
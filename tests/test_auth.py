@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+
+from edi_engine.auth import CachedUserStore, MemoryUserStore, PasswordVerifier, TokenCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_cache_is_bounded_by_exp_and_max_ttl():
+    clock = Clock()
+    cache = TokenCache(max_entries=2, max_ttl=300, clock=clock)
+    decoded = []
+
+    def decode(token):
+        decoded.append(token)
+        if token == "bad":
+            raise ValueError("signature")
+        return {"sub": token, "exp": clock.now + 60}
+
+    assert cache.verify("a", decode)["sub"] == "a"
+    assert cache.verify("a", decode)["sub"] == "a"
+    assert decoded == ["a"]
+    assert list(cache._entries) == [TokenCache.key("a")]  # keyed by hash, not the token
+
+    clock.now += 61  # past the token's exp: decoded again (and rejected there if expired)
+    cache.verify("a", decode)
+    assert decoded == ["a", "a"]
+
+    with pytest.raises(ValueError):
+        cache.verify("bad", decode)
+    with pytest.raises(ValueError):
+        cache.verify("bad", decode)  # failures are never cached
+    assert decoded.count("bad") == 2
+
+    cache.put("long", {"sub": "long", "exp": clock.now + 10_000})
+    clock.now += 301
+    assert cache.get("long") is None
+
+    cache.verify("b", decode)
+    cache.verify("c", decode)
+    cache.verify("d", decode)
+    assert len(cache._entries) == 2 and cache.get("b") is None
+
+
+def test_user_cache_ttl_and_single_flight():
+    class CountingStore(MemoryUserStore):
+        async def get_user(self, username):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return self.users.get(username)
+
+    clock = Clock()
+    backend = CountingStore({"kyle": {"username": "kyle"}})
+    backend.calls = 0
+    store = CachedUserStore(backend, ttl=30, clock=clock)
+
+    async def run():
+        users = await asyncio.gather(*[store.get_user("kyle") for _ in range(10)])
+        assert all(u == {"username": "kyle"} for u in users)
+        assert backend.calls == 1  # ten concurrent requests, one query
+
+        await store.get_user("kyle")
+        assert backend.calls == 1
+        await store.get_user("kyle", fresh=True)
+        assert backend.calls == 2
+        clock.now += 31
+        await store.get_user("kyle")
+        assert backend.calls == 3
+
+        assert await store.get_user("nobody") is None
+        assert await store.get_user("nobody") is None
+        assert backend.calls == 5  # unknown users are not cached
+
+    asyncio.run(run())
+
+
+def test_password_verification_runs_off_the_event_loop():
+    seen = []
+
+    def verify(password, hashed):
+        seen.append(threading.current_thread().name)
+        return password == hashed
+
+    verifier = PasswordVerifier(verify, workers=2)
+
+    async def run():
+        return await asyncio.gather(verifier.verify("pw", "pw"), verifier.verify("pw", "other"))
+
+    try:
+        assert asyncio.run(run()) == [True, False]
+    finally:
+        verifier.shutdown()
+    assert all(name.startswith("edi-auth") for name in seen)
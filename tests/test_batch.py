@@ -0,0 +1,133 @@
+import asyncio
+import io
+import json
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from edi_engine.async_service import AnalysisExecutor
+from edi_engine.batch import (Batch, BatchLimits, BatchTooLarge, iter_batch, json_batch, ndjson_batch,
+                              parse_document, read_batch)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from generators import make_interchange  # noqa: E402
+
+DOCS = [make_interchange(code, lines=3) for code in ("850", "810", "856")]
+
+
+def _zip(files):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return out.getvalue()
+
+
+def _tar(files):
+    out = io.BytesIO()
+    with tarfile.open(fileobj=out, mode="w:gz") as archive:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return out.getvalue()
+
+
+def _run(batch, executor=None, validate=False):
+    async def run():
+        pool = executor or AnalysisExecutor(parse_workers=1)
+        try:
+            return json.loads(await json_batch(iter_batch(pool, batch, validate)))
+        finally:
+            pool.shutdown()
+    return asyncio.run(run())
+
+
+def test_json_zip_and_tar_inputs():
+    batch = Batch()
+    batch.add_json([DOCS[0], {"name": "inv.edi", "content": DOCS[1]}, {"name": "bad", "content": 7}])
+    batch.add_file("po.zip", _zip({"a/850.edi": DOCS[0], "a/.DS_Store": "x", "__MACOSX/a/._850.edi": "x"}))
+    batch.add_file("asn.tgz", _tar({"856.edi": DOCS[2]}))
+    batch.add_file("plain.edi", DOCS[1].encode("utf-8-sig"))
+    assert [item["name"] for item in batch.items] == ["0", "inv.edi", "bad", "a/850.edi", "856.edi", "plain.edi"]
+    assert batch.items[2] == {"name": "bad", "error": "content must be a string"}
+    assert batch.items[5]["content"] == DOCS[1]
+
+    with pytest.raises(BatchTooLarge):
+        Batch(BatchLimits(max_items=2)).add_json(DOCS)
+    with pytest.raises(BatchTooLarge):  # refused from the declared size, before inflating
+        Batch(BatchLimits(max_bytes=1000)).add_file("big.zip", _zip({"big.edi": "~" * 5000}))
+    with pytest.raises(ValueError):
+        Batch().add_json({"content": DOCS[0]})
+
+
+def test_results_keep_order_and_fail_per_document():
+    batch = Batch(BatchLimits(chunk_bytes=1))  # one document per chunk
+    batch.add_json([DOCS[0], "NOT EDI", {"content": None}, DOCS[2]])
+    report = _run(batch)
+    assert (report["count"], report["failed"]) == (4, 2)
+    assert [r["index"] for r in report["results"]] == [0, 1, 2, 3]
+    assert [r["success"] for r in report["results"]] == [True, False, False, True]
+    assert report["results"][0]["data"] == json.loads(json.dumps(parse_document(DOCS[0])))
+    assert report["results"][1]["error"] == "Empty or invalid EDI content"
+
+    validated = _run(batch, validate=True)
+    assert validated["results"][3]["data"]["validation"]["valid"]
+
+
+def test_pool_results_match_inline_results():
+    batch = Batch(BatchLimits(chunk_bytes=len(DOCS[0]) * 2))
+    batch.add_json(DOCS * 3)
+    inline = _run(batch)
+    pooled = _run(batch, AnalysisExecutor(parse_workers=1, inline_parse_bytes=0))
+    assert pooled == inline and inline["failed"] == 0
+
+
+def test_read_batch_from_requests_and_stream():
+    class Upload:
+        def __init__(self, filename, data):
+            self.filename, self.data = filename, data
+
+        async def read(self):
+            return self.data
+
+    class Form:
+        def multi_items(self):
+            return [("note", DOCS[0]), ("files", Upload("edi.zip", _zip({"1.edi": DOCS[1], "2.edi": DOCS[2]})))]
+
+    class Request:
+        def __init__(self, content_type, body=b"", form=None):
+            self.headers = {"content-type": content_type, "content-length": str(len(body))}
+            self._body, self._form = body, form
+
+        async def body(self):
+            return self._body
+
+        async def form(self):
+            return self._form
+
+    async def run():
+        multipart = await read_batch(Request("multipart/form-data; boundary=x", form=Form()))
+        archive = await read_batch(Request("application/zip", _tar({"x.edi": DOCS[0]})))
+        with pytest.raises(ValueError):
+            await read_batch(Request("application/json", b"{not json"))
+        with pytest.raises(BatchTooLarge):
+            await read_batch(Request("application/json", b"[]" * 10), BatchLimits(max_bytes=5))
+
+        executor = AnalysisExecutor(parse_workers=1)
+        try:
+            lines = [line async for line in ndjson_batch(iter_batch(executor, multipart))]
+        finally:
+            executor.shutdown()
+        return multipart, archive, lines
+
+    multipart, archive, lines = asyncio.run(run())
+    assert [item["name"] for item in multipart.items] == ["note", "1.edi", "2.edi"]
+    assert [item["name"] for item in archive.items] == ["x.edi"]
+    records = [json.loads(line) for line in lines]
+    assert [r.get("name") for r in records] == ["note", "1.edi", "2.edi", None]
+    assert records[-1] == {"type": "summary", "count": 3, "failed": 0}
@@ -0,0 +1,125 @@
+import csv
+import math
+import sys
+from pathlib import Path
+
+from edi_engine.batch import parse_document
+from edi_engine.columnar import LineItemColumns, collect_line_items
+from edi_engine.utils import parse_cents, parse_implied_cents
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from generators import make_interchange, write_interchange  # noqa: E402
+
+ISA = "ISA*00*          *00*          *ZZ*PAYER          *ZZ*CLINIC         *210101*1253*U*00401*000000001*0*T*:~"
+
+
+def wrap(code, *body):
+    segments = [f"ST*{code}*0001", *body, f"SE*{len(body) + 2}*0001"]
+    return ISA + "GS*HP*PAYER*CLINIC*20210101*1253*1*X*005010~" + "~".join(segments) + "~GE*1*1~IEA*1*000000001~"
+
+
+def test_line_items_are_typed_columns_with_document_keys():
+    items = LineItemColumns()
+    assert items.add_document(make_interchange("850", lines=3), source="po.edi") == 3
+    assert items.add_document(make_interchange("856", lines=2)) == 2
+    assert items.add_document(make_interchange("835", lines=2)) == 2
+    assert len(items) == 7
+
+    columns = items.columns
+    assert columns["segment"] == ["PO1"] * 3 + ["LIN"] * 2 + ["CLP"] * 2
+    assert columns["item_id"][:5] == ["B0", "B1", "B2", "SKU-0", "SKU-1"]
+    assert columns["document_id"][0] == "PO-1" and columns["document_date"][0] == "2021-01-01"
+    assert columns["sender"][0] == "SENDER" and columns["source"][0] == "po.edi"
+    assert columns["qty"].typecode == "d" and columns["amount"].typecode == "q"
+    assert list(columns["qty"][:5]) == [1.0, 2.0, 3.0, 1.0, 2.0]  # SN1 quantities land on their LIN rows
+    assert list(columns["amount"][:3]) == [25, 250, 675]  # cents
+    assert math.isnan(columns["unit_price"][3])
+
+
+def test_totals_and_csv_export(tmp_path):
+    items = LineItemColumns()
+    items.add_document(make_interchange("810", lines=4))
+    items.add_document(make_interchange("837", lines=2))
+
+    assert items.totals("transaction_set") == {"810": 50 + 300 + 750 + 1400, "837": 50 + 150}
+    assert items.totals(("sender", "transaction_set"), "qty") == {("SENDER", "810"): 10.0, ("SENDER", "837"): 0.0}
+
+    path = items.write(str(tmp_path / "lines.csv"))
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    assert rows[0]["item_id"] == "SKU-0" and rows[-1]["qty"] == ""
+
+
+def test_collect_line_items_over_files(tmp_path):
+    paths = []
+    for i, doc_type in enumerate(("850", "810")):
+        path = tmp_path / f"{i}.edi"
+        write_interchange(str(path), doc_type, lines=5, newline=True)
+        paths.append(str(path))
+    warehouse = tmp_path / "940.edi"
+    warehouse.write_text(
+        "ISA*00*          *00*          *ZZ*DEPOSITOR      *ZZ*3PL            *210101*1253*U*00401*000000001*0*P*:~\n"
+        "GS*OW*DEPOSITOR*3PL*20210101*1253*1*X*004010~ST*940*0001~W05*N*ORD-1*PO-9~"
+        "W01*12*CA**VN*ITEM-ABC~W01*3*EA*012345678905~SE*5*0001~GE*1*1~IEA*1*000000001~\n"
+    )
+    paths.append(str(warehouse))
+
+    serial = collect_line_items(paths)
+    pooled = collect_line_items(paths, workers=2)
+    assert len(serial) == 12
+    assert serial.columns["item_id"] == pooled.columns["item_id"]
+    assert serial.columns["qty"] == pooled.columns["qty"]
+    assert serial.columns["item_id"][-2:] == ["ITEM-ABC", "012345678905"]
+    assert serial.totals("sender", "qty")["DEPOSITOR"] == 15.0
+
+
+def test_cents_are_exact():
+    assert [parse_cents(text) for text in ("12.5", "-1.235", "0.1", "007", "1e5", "", "1.2.3")] == \
+        [1250, -124, 10, 700, None, None, None]
+    assert parse_implied_cents("12345") == 12345 and parse_implied_cents("123.45") == 12345
+
+    # Typed parsers: *_cents alongside the dollar amounts, running totals summed in cents
+    claims = parse_document(wrap("837", *[f"CLM*C{i}*0.10***11:B:1" for i in range(30)]))["data"]
+    assert claims["total_charge_cents"] == 300 and claims["total_charge"] == 3.0
+    assert claims["claims"][0]["amount_cents"] == 10 and claims["claims"][0]["amount"] == 0.1
+    invoice = parse_document(make_interchange("810", lines=3))["data"]
+    assert invoice["total_cents"] == 1100 and invoice["total"] == 11.0
+    remit = parse_document(wrap("835", "BPR*I*130.19*C*ACH", "CLP*C1*1*100.10*100.10**MC*1"))["data"]
+    assert remit["total_paid"] == 130.19 and remit["total_paid_cents"] == 13019
+    assert remit["payments"][0]["paid"] == 100.1 and remit["payments"][0]["paid_cents"] == 10010
+
+
+def test_money_rollups_and_remittance_matching(tmp_path):
+    claims = wrap("837", "BHT*0019*00*1*20210101", "NM1*PR*2*ACME HEALTH*****PI*1",
+                  "CLM*C1*100.10***11:B:1", "CLM*C2*50***11:B:1", "CLM*C3*20.05***11:B:1", "CLM*C4*9.99***11:B:1")
+    remit = wrap("835", "BPR*I*130.19*C*ACH", "TRN*1*CHK-7*1", "N1*PR*ACME HEALTH",
+                 "CLP*C1*1*100.10*100.10**MC*1", "CLP*C2*4*50*0**MC*2", "CLP*C3*2*20.05*30.1**MC*3",
+                 "CLP*C9*1*5*5**MC*4", "PLB*1*20211231*WO:1*5.01")
+    items = LineItemColumns()
+    assert items.add_document(claims) == 4 and items.add_document(remit) == 4
+    assert items.add_document(make_interchange("810", lines=3), source="inv.edi") == 3
+
+    assert items.grand_totals() == {"amount": 18014 + 1100, "billed": 17515, "paid": 13520,
+                                    "claims": 4, "remits": 4, "denied": 1, "rows": 11}
+    assert items.rollup("payer")["ACME HEALTH"] == {"amount": 18014, "billed": 17515, "paid": 13520}
+    assert items.rollup(("transaction_set", "item_id"), ("paid",))[("835", "C3")] == {"paid": 3010}
+
+    report = items.match_remittances()
+    assert {claim_id: claim["status"] for claim_id, claim in report["claims"].items()} == \
+        {"C1": "paid", "C2": "denied", "C3": "overpaid", "C4": "unpaid", "C9": "unmatched"}
+    assert report["claims"]["C4"]["balance"] == 999 and report["claims"]["C9"]["balance"] == 0
+    assert report["summary"]["claims"] == 5 and report["summary"]["balance"] == 5000 - 1005 + 999
+
+    # BPR02 = CLP04s - PLB adjustments; the generated 810 TDS matches its IT1 lines
+    assert items.unbalanced() == []
+    items.add_document(wrap("835", "BPR*I*1*C*ACH", "CLP*C1*1*1*2**MC*1"))
+    assert [doc["computed"] for doc in items.unbalanced()] == [200]
+
+    paths = []
+    for index, code in enumerate(("837", "835") * 2):
+        paths.append(str(tmp_path / f"{index}.edi"))
+        write_interchange(paths[-1], code, lines=5)
+    pooled, inline = collect_line_items(paths, workers=2), collect_line_items(paths)
+    assert pooled.columns["paid"] == inline.columns["paid"] and pooled.grand_totals()["paid"] == 2 * (25 + 125 + 225 + 325 + 425)
+    assert set(inline.match_remittances()["summary"]) >= {"claims", "partial"}
@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+
+from edi_engine.columnar import LineItemColumns
+from edi_engine.core import X12StreamTokenizer, X12Tokenizer
+from edi_engine import dialect
+from edi_engine.dialect import DialectCache, get_profiles, set_profiles
+from edi_engine.envelope import parse_store
+from edi_engine.registry import parse_segments
+
+
+def interchange(sender="ACME", element="*", term="~", component=":", repetition="U", version="00401"):
+    isa = element.join(["ISA", "00", " " * 10, "00", " " * 10, "ZZ", sender.ljust(15), "ZZ", "RETAILER".ljust(15),
+                        "210101", "1253", repetition, version, "000000001", "0", "T", component])
+    body = ["GS*PO*{0}*RETAILER*20210101*1253*1*X*004010".format(sender), "ST*850*0001",
+            "BEG*00*SA*PO-1**20210101", "PO1*1*3*EA*1.50**IN*BOOK-9*VP*V-1", "SE*4*0001", "GE*1*1",
+            "IEA*1*000000001"]
+    return isa + term + term.join(seg.replace("*", element) for seg in body) + term
+
+
+@pytest.fixture
+def profiles():
+    cache = DialectCache(max_entries=2)
+    set_profiles(cache)
+    yield cache
+    set_profiles(None)
+
+
+def test_profiles_are_cached_per_partner(profiles):
+    first = X12Tokenizer(interchange()).tokenize().dialect
+    assert X12Tokenizer(interchange()).tokenize().dialect is first
+    assert (profiles.hits, profiles.misses) == (1, 1)
+    assert (first.element_sep, first.segment_term, first.delims) == ("*", "~", (":", None))
+    assert (first.version, first.gs_version) == ("00401", "004010")
+
+    # Same partner, new separators: a fresh profile replaces the cached one
+    changed = X12Tokenizer(interchange(element="|", component=">", repetition="^", version="00501")).tokenize()
+    assert changed.dialect is not first and changed.dialect.delims == (">", "^")
+    assert changed[4].components(6) == ["IN"] and get_profiles() is profiles
+
+    X12Tokenizer(interchange(sender="OTHER")).tokenize()
+    X12Tokenizer(interchange(sender="THIRD")).tokenize()
+    assert len(profiles._entries) == 2  # LRU bound
+
+    # A new ISA12 is a new profile too, so GS08 is read again
+    newer = X12Tokenizer(interchange(sender="THIRD", version="00501")).tokenize().dialect
+    assert newer.version == "00501" and newer.gs_version == "004010"
+
+    # Content without an ISA header keeps the '*'/'~' defaults and is not cached
+    assert X12Tokenizer("ST*850*1~BEG*00~SE*2*1~").tokenize().dialect.delims == (":", None)
+    assert len(profiles._entries) == 2
+
+
+def test_known_partners_skip_delimiter_detection(profiles, monkeypatch):
+    raw = interchange(element="|", term="\n", component=">", repetition="^", version="00501")
+    first = X12Tokenizer(raw).tokenize()
+    assert (first.dialect.segment_term, first.dialect.strip_newlines) == ("\n", False)
+
+    def fail(header):
+        raise AssertionError("detect_delimiters ran on a cached partner")
+
+    monkeypatch.setattr(dialect, "detect_delimiters", fail)
+    again = X12Tokenizer(raw).tokenize()
+    assert again.dialect is first.dialect and len(again) == len(first)
+    # The streaming route matches the tokenized ISA segment against the same entry
+    assert profiles.for_isa(again[0]) is first.dialect
+    assert profiles.hits == 2 and list(profiles._entries) == [raw[32:69]]
+
+
+def test_partner_sku_qualifiers(profiles, tmp_path):
+    raw = interchange()
+    sku = lambda result: result["data"]["items"][0]["sku"]
+    assert sku(parse_store(X12Tokenizer(raw).tokenize())) == "V-1"
+
+    profiles.set_rules("ACME", sku_qualifiers=["IN"])
+    store = X12Tokenizer(raw).tokenize()
+    assert sku(parse_store(store)) == "BOOK-9"
+    assert sku(parse_segments(iter(X12StreamTokenizer(io.StringIO(raw), chunk_size=16)))) == "BOOK-9"
+    columns = LineItemColumns()
+    columns.add_store(store)
+    assert columns.columns["item_id"] == ["BOOK-9"]
+    # Only this partner
+    assert sku(parse_store(X12Tokenizer(interchange(sender="OTHER")).tokenize())) == "V-1"
+
+    rules = tmp_path / "partners.json"
+    rules.write_text(json.dumps({"OTHER/RETAILER": {"sku_qualifiers": ["IN"]}}))
+    with pytest.MonkeyPatch.context() as env:
+        env.setenv("EDI_PARTNER_RULES", str(rules))
+        set_profiles(None)
+        assert sku(parse_store(X12Tokenizer(interchange(sender="OTHER")).tokenize())) == "BOOK-9"
+        assert sku(parse_store(X12Tokenizer(raw).tokenize())) == "V-1"
@@ -0,0 +1,51 @@
+import pickle
+
+from edi_engine.core import X12Tokenizer
+from edi_engine.envelope import parse_interchange, split_transactions
+
+ISA = ("ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+       "*210101*1253*U*00401*000000001*0*T*:~")
+
+
+def _po(number, control):
+    return (f"ST*850*{control}~BEG*00*SA*{number}**20210101~"
+            f"PO1*1*2*EA*1.00**VP*SKU-{number}~SE*4*{control}~")
+
+
+MULTI = (ISA + "GS*PO*SENDER*RECEIVER*20210101*1253*1*X*004010~"
+         + _po("PO-1", "0001") + _po("PO-2", "0002") + "GE*2*1~"
+         + "GS*IN*SENDER*RECEIVER*20210101*1253*2*X*004010~"
+         + "ST*810*0003~BIG*20210101*INV-1**PO-1~TDS*250~SE*4*0003~GE*1*2~"
+         + "IEA*2*000000001~")
+
+
+def test_one_result_per_transaction_set():
+    results = parse_interchange(MULTI)
+    assert [r["detected_type"] for r in results] == ["850", "850", "810"]
+    assert [r["data"].get("po_number") for r in results] == ["PO-1", "PO-2", "PO-1"]
+    assert len(results[0]["data"]["items"]) == 1
+    assert results[1]["envelope"] == {
+        "sender": "SENDER", "receiver": "RECEIVER", "interchange_control": "000000001",
+        "functional_id": "PO", "group_control": "1", "version": "004010",
+        "control_number": "0002",
+    }
+    assert results[2]["envelope"]["functional_id"] == "IN"
+
+
+def test_store_and_stream_split_agree():
+    store = X12Tokenizer(MULTI).tokenize()
+    from_store = [(t.envelope, [s.raw for s in t.segments]) for t in split_transactions(store)]
+    from_stream = [(t.envelope, [s.raw for s in t.segments]) for t in split_transactions(iter(store))]
+    assert from_store == from_stream
+
+
+def test_window_pickles_only_its_span():
+    store = X12Tokenizer(MULTI).tokenize()
+    window = next(split_transactions(store)).segments
+    clone = pickle.loads(pickle.dumps(window))
+    assert len(clone.buffer) < len(store.buffer)
+    assert [s.raw for s in clone] == [s.raw for s in window]
+
+
+def test_parallel_matches_serial():
+    assert parse_interchange(MULTI, parallel=True, max_workers=2) == parse_interchange(MULTI)
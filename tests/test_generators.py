@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from edi_engine.columnar import LineItemColumns
+from edi_engine.core import X12Tokenizer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from generators import DOC_TYPES, isa_header, make_interchange, write_interchange  # noqa: E402
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_generated_interchanges_have_consistent_envelopes(doc_type):
+    raw = make_interchange(doc_type, lines=7, transactions=2, element_sep="|", segment_term="'",
+                           component_sep=">", newline=True)
+    segments = X12Tokenizer(raw).tokenize()
+    assert segments.element_sep == "|"
+    assert segments.count_tag("ST") == 2
+
+    start = 0
+    for _ in range(2):
+        st = segments.find_tag("ST", start)
+        se = segments.find_tag("SE", st)
+        assert segments[st].get(1) == doc_type
+        assert int(segments[se].get(1)) == se - st + 1  # SE01 counts ST..SE inclusive
+        start = se
+    assert segments[segments.find_tag("GE")].get(1) == "2"
+
+
+def test_target_size_and_streamed_write(tmp_path):
+    assert len(isa_header("^", "!", ":")) == 106
+    raw = make_interchange("837", target_bytes=50_000)
+    assert 40_000 < len(raw) < 60_000
+
+    path = tmp_path / "big.edi"
+    written = write_interchange(str(path), "837", target_bytes=50_000)
+    assert path.read_text() == raw and written == len(raw)
+
+
+def test_declared_totals_match_the_generated_lines():
+    items = LineItemColumns()
+    for doc_type in ("810", "835"):
+        items.add_document(make_interchange(doc_type, lines=25, transactions=3))
+    assert len(items.documents) == 6 and items.unbalanced() == []
@@ -0,0 +1,126 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+from edi_engine.core import X12Tokenizer
+from edi_engine.envelope import parse_store
+from edi_engine.incremental import EditSession, SessionManager, apply_diff, json_diff
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from generators import make_interchange  # noqa: E402
+
+
+def _full(text):
+    return parse_store(X12Tokenizer(text).tokenize())
+
+
+def test_edit_reparses_only_the_touched_transaction_set():
+    text = make_interchange("850", lines=6, transactions=3, newline=True)
+    session = EditSession(text)
+    assert session.result == _full(text)
+    before = list(session.result["data"]["transactions"])
+
+    pos = text.index("PO1*3*") + len("PO1*3*")  # qty of the second line item in the second set
+    ops = session.edit(pos, pos + 1, "9")
+    assert ops == [{"op": "replace", "path": "/data/transactions/1/data/items/1/qty", "value": 9}]
+
+    after = session.result["data"]["transactions"]
+    assert after[0] is before[0] and after[2] is before[2]
+    assert session.result == _full(session.text)
+
+
+def test_single_set_edits_outside_the_set_parse_nothing():
+    text = make_interchange("850", lines=3)
+    session = EditSession(text)
+    data = session.result["data"]
+    pos = session.text.index("GE*") + len("GE*")
+    assert session.edit(pos, pos + 1, "1") == []
+    assert session.result["data"] is data and session.result == _full(session.text)
+
+
+def test_structural_edits_and_patches_track_a_full_parse():
+    text = make_interchange("810", lines=4, transactions=2)
+    session = EditSession(text)
+    shown = copy.deepcopy(session.result)
+
+    edits = [
+        ("IT1*1*", 0, "IT1*9*1*EA*1.00**VP*NEW~"),                  # new line item
+        ("SE*", 0, "TDS*100~"),                                    # header field of the first set
+        ("GE*", 0, "ST*810*0003~BIG*20210109*INV-3~SE*3*0003~"),   # a third set
+        ("ISA", 3, "ISA"),                                         # header edit: full re-tokenize
+    ]
+    for marker, length, insert in edits:
+        start = session.text.index(marker)
+        ops = session.edit(start, start + length, insert)
+        shown = apply_diff(shown, copy.deepcopy(ops))
+        assert session.result == _full(session.text)
+        assert shown == session.result
+    assert session.result["transaction_count"] == 3
+
+
+def test_line_breaks_in_the_isa_header_read_like_a_full_parse():
+    text = make_interchange("850", lines=2)
+    for broken in (text[:3] + "\n" + text[3:], text[:40] + "\r\n" + text[40:]):
+        session = EditSession(broken)
+        assert session.result["success"] and session.result == _full(broken)
+    session = EditSession(text)
+    session.edit(3, 3, "\n")
+    assert session.result == _full(session.text) == _full(text)
+
+
+def test_json_diff_trims_common_list_head_and_tail():
+    old = {"items": [1, 2, 3, 4], "total": 10}
+    new = {"items": [1, 2, 9, 3, 4], "currency": "USD"}
+    ops = json_diff(old, new)
+    assert ops == [
+        {"op": "add", "path": "/items/2", "value": 9},
+        {"op": "remove", "path": "/total"},
+        {"op": "add", "path": "/currency", "value": "USD"},
+    ]
+    assert apply_diff(copy.deepcopy(old), ops) == new
+
+
+def test_session_rpc_methods_apply_edits_in_version_order():
+    manager = SessionManager()
+    text = make_interchange("837", lines=2)
+    opened = manager.open({"content": text})
+    session_id = opened["session"]
+    assert opened["version"] == 0 and opened["result"] == _full(text)
+
+    pos = text.index("CLM*C1*") + len("CLM*C")
+    first = {"session": session_id, "version": 0, "edits": [{"start": pos, "end": pos + 1, "text": "7"}]}
+    second = {"session": session_id, "version": 1, "edits": [{"start": pos, "end": pos, "text": "X"}]}
+
+    # The later edit arrives first: it is queued without waiting, and the edit
+    # that fills the gap applies both and returns one patch for them
+    assert manager.edit(second) == {"session": session_id, "version": 0, "queued": True}
+    response = manager.edit(first)
+    assert response["version"] == 2
+    assert len(response["diff"]) == 1 and response["diff"][0]["value"] == "CX7"
+    assert manager.edit({**second, "version": 2})["diff"][0]["value"] == "CXX7"
+
+    with pytest.raises(ValueError):
+        manager.edit({**first, "version": 1000})  # too far ahead to queue
+
+    with pytest.raises(ValueError):
+        manager.edit({**first, "version": 0})  # stale
+    assert manager.close({"session": session_id}) == {"closed": True}
+    with pytest.raises(KeyError):
+        manager.edit(first)
+
+
+def test_a_bad_queued_edit_fails_the_session():
+    manager = SessionManager()
+    session_id = manager.open({"content": make_interchange("837", lines=2)})["session"]
+    bad = {"session": session_id, "version": 1, "edits": [{"start": 10 ** 6, "text": "X"}]}
+    assert manager.edit(bad)["queued"]  # acknowledged before it can be checked
+
+    # The edit that fills the gap applies, then the queued one can't: the session
+    # no longer matches the editor, so it fails instead of moving on without it
+    with pytest.raises(ValueError, match="version 1"):
+        manager.edit({"session": session_id, "version": 0, "edits": [{"start": 0, "end": 0, "text": ""}]})
+    with pytest.raises(ValueError, match="reopen"):
+        manager.edit({"session": session_id, "version": 2, "edits": []})
+    assert manager.close({"session": session_id}) == {"closed": True}
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from edi_engine.jobs import DONE, FAILED, QUEUED, JobQueue, JobStore, TierNotAllowed
+
+
+def _wait_for(store, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {store.get(job_id)['status']}")
+
+
+def test_jobs_run_and_report_results(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    queue = JobQueue(store, lambda content: {"length": len(content)} if content else 1 / 0)
+    queue.start()
+    try:
+        ok = queue.submit("kyle@example.com", "pro", "ISA*00~")
+        bad = queue.submit("kyle@example.com", "pro", "")
+        assert _wait_for(store, ok, DONE)["result"] == {"length": 7}
+        assert "division by zero" in _wait_for(store, bad, FAILED)["error"]
+    finally:
+        queue.stop()
+
+
+def test_tier_concurrency_limit(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    release = threading.Event()
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def handler(content):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        release.wait(5)
+        with lock:
+            active["now"] -= 1
+        return {}
+
+    queue = JobQueue(store, handler, tier_limits={"free": 1, "pro": 3})
+    queue.start()
+    try:
+        jobs = [queue.submit("free@example.com", "free", "x") for _ in range(3)]
+        time.sleep(0.2)
+        assert [store.get(j)["status"] for j in jobs].count(QUEUED) == 2
+        release.set()
+        for job_id in jobs:
+            _wait_for(store, job_id, DONE)
+        assert active["peak"] == 1
+        # No shared slot for unconfigured tiers
+        with pytest.raises(TierNotAllowed):
+            queue.submit("someone@example.com", "trial", "x")
+        assert queue._pool._max_workers == 4
+    finally:
+        release.set()
+        queue.stop()
+
+
+def test_interrupted_jobs_are_requeued(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    job_id = store.create("kyle@example.com", "pro", "x")
+    store.claim("pro")
+
+    queue = JobQueue(JobStore(path), lambda content: {"ok": True})
+    queue.start()
+    try:
+        assert _wait_for(queue.store, job_id, DONE)["result"] == {"ok": True}
+    finally:
+        queue.stop()
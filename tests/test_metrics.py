@@ -0,0 +1,70 @@
+import json
+
+from edi_engine import metrics
+from edi_engine.core import X12Tokenizer
+from edi_engine.envelope import parse_store
+from edi_engine.legacy import parse_edi
+
+DOC = ("ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+       "*210101*1253*U*00401*000000001*0*T*:~GS*PO*S*R*20210101*1253*1*X*004010~"
+       "ST*850*0001~BEG*00*SA*PO1**20210101~PO1*1*10*EA*2.50**VP*SKU1~SE*4*0001~GE*1*1~IEA*1*000000001~")
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.enable(False)
+    metrics.reset()
+    parse_store(X12Tokenizer(DOC).tokenize())
+    assert metrics.start() is None
+    assert metrics.drain() is None
+    assert "disabled" in metrics.render()
+
+
+def test_stages_and_throughput_by_transaction_set():
+    metrics.enable()
+    metrics.reset()
+    try:
+        parse_store(X12Tokenizer(DOC).tokenize())
+        json.dumps(parse_edi(DOC))
+        text = metrics.render()
+    finally:
+        metrics.enable(False)
+    assert 'edi_stage_seconds_count{stage="tokenize",transaction_set="all"} 2' in text
+    assert 'edi_stage_seconds_count{stage="parse",transaction_set="850"} 1' in text
+    assert 'edi_stage_seconds_count{stage="detect",transaction_set="850"} 2' in text
+    assert 'edi_stage_seconds_count{stage="serialize",transaction_set="850"} 2' in text
+    assert 'edi_segments_total{stage="parse",transaction_set="850"} 8' in text
+    assert 'edi_bytes_per_second{stage="tokenize",transaction_set="all"}' in text
+
+
+def test_drain_and_merge_move_worker_numbers():
+    metrics.enable()
+    metrics.reset()
+    try:
+        result, snapshot = metrics.call_and_drain(lambda raw: X12Tokenizer(raw).tokenize(), DOC)
+        assert len(result) == 8 and "edi_stage_seconds_count" not in metrics.render()
+        metrics.merge(snapshot)
+        assert 'stage="tokenize"' in metrics.render()
+    finally:
+        metrics.enable(False)
+
+
+def test_profile_call_reports(monkeypatch):
+    result, report = metrics.profile_call("cpu", parse_edi, DOC)
+    assert result["success"] and "cumulative" in report["report"]
+    _, report = metrics.profile_call("memory", parse_edi, DOC)
+    assert report["kind"] == "memory" and report["peak_mb"] >= 0
+    assert metrics.profile_call(None, len, "abc") == (3, None)
+
+    assert metrics.profile_kind("cpu") == (None, False)
+    # A sampled run is never returned to the client, even when it asked for that kind
+    monkeypatch.setenv("EDI_PROFILE_SAMPLE_RATE", "1")
+    assert metrics.profile_kind("cpu") == ("cpu", False)
+    monkeypatch.setenv("EDI_PROFILING", "1")
+    assert metrics.profile_kind("memory") == ("memory", True)
+
+
+def test_scrape_needs_the_metrics_token(monkeypatch):
+    monkeypatch.delenv("EDI_METRICS_TOKEN", raising=False)
+    assert metrics.scrape_status("Bearer anything") == 404  # not served without a token
+    monkeypatch.setenv("EDI_METRICS_TOKEN", "s3cret")
+    assert [metrics.scrape_status(h) for h in (None, "Bearer wrong", "s3cret", "Bearer s3cret")] == [401, 401, 401, 200]
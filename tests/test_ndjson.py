@@ -0,0 +1,32 @@
+import json
+
+from edi_engine.ndjson import iter_parse_records, iter_segment_records, ndjson_lines
+
+from test_envelope import MULTI
+
+
+def test_typed_records_frame_each_transaction():
+    records = [json.loads(line) for line in ndjson_lines(iter_parse_records(MULTI))]
+    assert records[0] == {"type": "header", "segments_read": 18, "transaction_count": 3}
+    assert records[-1] == {"type": "trailer", "success": True, "records": len(records)}
+    assert [r["detected_type"] for r in records if r["type"] == "transaction"] == ["850", "850", "810"]
+    items = [r for r in records if r["type"] == "item"]
+    assert [(r["index"], r["field"], r["value"]["sku"]) for r in items] == [
+        (0, "items", "SKU-PO-1"), (1, "items", "SKU-PO-2")]
+    summaries = [r["data"] for r in records if r["type"] == "summary"]
+    assert summaries[2]["invoice_number"] == "INV-1"
+
+
+def test_segment_records_match_legacy_header():
+    records = list(iter_segment_records(MULTI))
+    assert records[0]["sender"] == "SENDER"
+    assert records[0]["transaction_set"] == "850"
+    assert records[1] == {"type": "segment", "index": 0, "tag": "ISA",
+                          "elements": ["00", "", "00", "", "ZZ", "SENDER", "ZZ", "RECEIVER",
+                                       "210101", "1253", "U", "00401", "000000001", "0", "T", ":"]}
+    assert records[-1] == {"type": "trailer", "segment_count": 18}
+
+
+def test_empty_content():
+    records = list(iter_parse_records(""))
+    assert records[-1]["success"] is False
@@ -20,3 +20,37 @@ def test_parse_basic_x12():
 def test_parse_empty():
     res = parse_edi("")
     assert res.get("success") is False
+
+
+def test_parse_legacy_view_is_lazy_and_serializable():
+    import json
+    import pickle
+    sample = (
+        "ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+        "*210101*1253*U*00401*000000001*0*T*:~GS*PO*SENDER*RECEIVER*20210101*1253*1*X*004010~"
+        "ST*850*0001~BEG*00*SA*12345**20210101~PO1*1*10*EA*2.50**VP*SKU1~SE*4*0001~GE*1*1~IEA*1*000000001~"
+    )
+    data = parse_edi(sample)["data"]
+    assert data["sender"] == "SENDER" and data["receiver"] == "RECEIVER"
+    assert data["transaction_set"] == "850" and data["segment_count"] == 8
+    assert not dict.__contains__(data, "segments")
+
+    dumped = json.loads(json.dumps({"data": data}))
+    assert dumped["data"]["segments"][3] == {"id": "BEG", "tag": "BEG", "elements": ["00", "SA", "12345", "", "20210101"]}
+    assert dumped["data"]["raw_content"] == sample.strip()
+    assert pickle.loads(pickle.dumps(data)) == dumped["data"]
+    # Pickles carry the raw text once, never the materialized segments
+    assert pickle.dumps(data).count(b"12345") == 1 and b"segments" not in pickle.dumps(data)
+    assert data.typed()["data"]["items"][0]["sku"] == "SKU1"
+
+
+def test_package_exports_the_core_engine():
+    import edi_engine
+    sample = (
+        "ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+        "*210101*1253*U*00401*000000001*0*T*:~GS*PO*SENDER*RECEIVER*20210101*1253*1*X*004010~"
+        "ST*850*0001~BEG*00*SA*12345**20210101~SE*3*0001~GE*1*1~IEA*1*000000001~"
+    )
+    assert edi_engine.parse_typed(sample)["data"]["po_number"] == "12345"
+    assert edi_engine.parse_interchange(sample)[0]["success"]
+    assert edi_engine.parse_edi is edi_engine.legacy.parse_edi
@@ -0,0 +1,52 @@
+import json
+import sys
+from pathlib import Path
+
+from edi_engine.ai_service import run_analysis
+from edi_engine.legacy import parse_edi
+from edi_engine.prompting import estimate_tokens, plan_prompts
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from bench_dispatch import make_837, make_850  # noqa: E402
+from generators import make_interchange  # noqa: E402
+
+
+def test_small_document_is_one_compact_prompt():
+    plan = plan_prompts(parse_edi(make_850(3)))
+    assert not plan.chunked
+    assert '"po_number"' in plan.prompts[0]
+    assert '"segments"' not in plan.prompts[0]
+    assert plan.stats()["tokens_saved_estimate"] > 0
+
+
+def test_repeated_line_items_are_sampled_and_totalled():
+    plan = plan_prompts(parse_edi(make_850(2000)), budget=8000, max_items=10)
+    assert len(plan.prompts) == 1
+    assert estimate_tokens(plan.prompts[0]) <= 8000
+    assert '"items_summary":{"count":2000' in plan.prompts[0]
+    assert plan.stats()["naive_tokens_estimate"] > 50 * plan.stats()["prompt_tokens"]
+
+
+def test_oversized_document_is_chunked_and_merged():
+    plan = plan_prompts(parse_edi(make_837(300)), budget=1500, max_items=200, max_chunks=4)
+    assert 1 < len(plan.prompts) <= 4
+    assert all(estimate_tokens(p) <= 1500 for p in plan.prompts)
+    merged = plan.reduce_prompt(["part one facts", "part two facts"], budget=1500)
+    assert "PART 2:\npart two facts" in merged
+
+    result, cacheable = run_analysis({"success": True}, plan)
+    assert not cacheable  # no model configured here
+    assert result["prompt_stats"]["chunks"] == len(plan.prompts)
+
+
+def test_units_larger_than_a_chunk_are_sampled_not_cut():
+    # Each transaction set alone is far over the budget: it is sampled down, and
+    # every part is still whole JSON
+    plan = plan_prompts(parse_edi(make_interchange("850", lines=600, transactions=3)),
+                        budget=1500, max_items=200, max_chunks=4)
+    assert plan.chunked
+    for prompt in plan.prompts:
+        assert estimate_tokens(prompt) <= 1500
+        part = json.loads(prompt.split("DATA:\n", 1)[1])
+        for txn in part["data"]["transactions"]:
+            assert txn["data"]["items_summary"]["count"] == 200
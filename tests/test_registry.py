@@ -0,0 +1,82 @@
+import io
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+from edi_engine import registry
+from edi_engine.core import X12Tokenizer, X12StreamTokenizer
+from edi_engine.registry import TRANSACTION_SETS, get_parser, parse_segments, register
+
+ISA = ("ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+       "*210101*1253*U*00401*000000001*0*T*:~")
+PO = ISA + ("GS*PO*SENDER*RECEIVER*20210101*1253*1*X*004010~ST*850*0001~"
+            "BEG*00*SA*PO-9**20210101~N1*ST*DC 4~PO1*1*3*EA*1.50**BP*X1*VP*SKU-1~"
+            "PO1*2*1*EA*9**UP*0001~SE*6*0001~GE*1*1~IEA*1*000000001~")
+
+
+def test_store_and_stream_routes_agree():
+    from_store = parse_segments(X12Tokenizer(PO).tokenize())
+    from_stream = parse_segments(iter(X12StreamTokenizer(io.StringIO(PO), chunk_size=16)))
+    assert from_store == from_stream
+    assert from_store["detected_type"] == "850"
+    assert from_store["segments_read"] == 10
+    assert from_store["data"]["ship_to"] == "DC 4"
+    assert [i["sku"] for i in from_store["data"]["items"]] == ["X1", "0001"]
+
+
+def test_unknown_set_uses_generic_view():
+    result = parse_segments(X12Tokenizer(PO.replace("ST*850", "ST*999")).tokenize())
+    assert result["detected_type"] == "999"
+    assert "warning" in result
+    assert result["data"]["structure"][0]["segment"] == "ISA"
+
+
+def test_register_new_transaction_set():
+    notes = register("999", lambda: {"doc_type": "999 Test", "lines": 0})
+
+    @notes.on("PO1")
+    def _count(seg, data, state):
+        data["lines"] += 1
+
+    try:
+        result = parse_segments(X12Tokenizer(PO.replace("ST*850", "ST*999")).tokenize())
+        assert result["data"] == {"doc_type": "999 Test", "lines": 2}
+        assert "warning" not in result
+    finally:
+        del TRANSACTION_SETS["999"]
+
+
+def test_parser_modules_load_on_first_use():
+    # Fresh interpreter: this process has already imported every parser
+    script = (
+        "import sys, edi_engine.server as server\n"
+        "loaded = lambda: sorted(m for m in sys.modules if m.startswith(('edi_engine.logistics', 'edi_engine.healthcare',"
+        " 'edi_engine.ai_', 'asyncio', 'sqlite3', 'multiprocessing')))\n"
+        "print(loaded())\n"
+        "list(server.stream_records(sys.argv[1]))\n"
+        "print(loaded())\n"
+    )
+    root = Path(__file__).resolve().parents[1]
+    out = subprocess.run([sys.executable, "-c", script, PO], capture_output=True, text=True, check=True,
+                         cwd=root, env={**os.environ, "PYTHONPATH": str(root)}).stdout.splitlines()
+    assert out == ["[]", "['edi_engine.logistics', 'edi_engine.logistics.orders']"]
+
+
+def test_entry_point_plugins_register_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "edi_plugin_998.py").write_text(
+        "from edi_engine.registry import register\n"
+        "tender = register('998', lambda: {'doc_type': '998 Plugin'})\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    plugin = EntryPoint(name="998", value="edi_plugin_998", group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, "_plugins", {"998": plugin})
+    try:
+        assert "998" in registry.available_sets() and "998" not in TRANSACTION_SETS
+        result = parse_segments(X12Tokenizer(PO.replace("ST*850", "ST*998")).tokenize())
+        assert result["data"] == {"doc_type": "998 Plugin"}
+        assert get_parser("997") is not None and get_parser("12345") is None
+    finally:
+        TRANSACTION_SETS.pop("998", None)
+        sys.modules.pop("edi_plugin_998", None)
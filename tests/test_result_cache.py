@@ -0,0 +1,63 @@
+from edi_engine.result_cache import ResultCache, cache_key
+
+DOC = "ISA*00*X~ST*997*1~AK1*PO*1~AK5*A~SE*3*1~"
+
+
+def test_key_ignores_line_breaks_but_not_model_or_prompt():
+    key = cache_key(DOC, "gemini-2.5-flash", "1")
+    assert cache_key("\r\n" + DOC.replace("~", "~\r\n"), "gemini-2.5-flash", "1") == key
+    assert cache_key(DOC, "other-model", "1") != key
+    assert cache_key(DOC, "gemini-2.5-flash", "2") != key
+
+
+def test_memory_lru_evicts_oldest_and_counts():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["memory_entries"]) == (2, 1, 2)
+
+
+def test_hits_are_copies():
+    cache = ResultCache()
+    cache.put("k", {"items": [1]})
+    cache.get("k")["items"].append(2)
+    assert cache.get("k") == {"items": [1]}
+
+
+def test_disk_tier_survives_restart_and_expires(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(path=path).put("k", {"v": 1})
+    reopened = ResultCache(path=path)
+    assert reopened.get("k") == {"v": 1}
+    assert reopened.stats()["disk_hits"] == 1
+
+    expired = ResultCache(path=path, ttl_seconds=-1)
+    assert expired.get("k") is None
+
+
+def test_disk_tier_size_eviction(tmp_path):
+    cache = ResultCache(max_entries=1, path=str(tmp_path / "cache.sqlite"), max_disk_bytes=50)
+    for i in range(100):
+        cache.put(f"k{i}", {"payload": "x" * 20})
+    assert cache.get("k0") is None
+    assert cache.get("k99") is not None
+
+
+def test_analyses_are_cached_without_the_document(monkeypatch):
+    from edi_engine import ai_service
+    from edi_engine.legacy import parse_edi
+
+    monkeypatch.setattr(ai_service, "_result_cache", ResultCache())
+    parsed = parse_edi(DOC)
+    ai_service.cache_analysis("k", {"parsed": parsed, "ai_analysis": "ok"})
+    stored = ai_service.get_result_cache()._memory["k"][0]
+    assert "segments" not in stored and "AK1" not in stored
+
+    hit = ai_service.cached_analysis("k", DOC)
+    assert hit["ai_analysis"] == "ok" and hit["parsed"]["data"]["transaction_set"] == "997"
+    assert hit["parsed"]["data"]["segments"] == parsed["data"]["segments"]  # tokenized again on read
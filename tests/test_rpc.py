@@ -0,0 +1,42 @@
+import io
+import json
+
+from edi_engine.rpc import RPCServer
+
+
+def _run(lines, methods):
+    stdout = io.StringIO()
+    RPCServer(methods, stdin=io.StringIO("\n".join(lines) + "\n"), stdout=stdout).serve_forever()
+    return {m["id"]: m for m in map(json.loads, stdout.getvalue().splitlines())}
+
+
+def test_many_requests_per_process():
+    methods = {"echo": lambda params: params["content"], "fail": lambda params: 1 / 0,
+               "unserializable": lambda params: {"value": object()}}
+    responses = _run([
+        '{"jsonrpc": "2.0", "id": 1, "method": "echo", "params": {"content": "a"}}',
+        '{"id": 2, "command": "echo", "content": "b"}',
+        '{"id": 3, "method": "fail"}',
+        '{"id": 4, "method": "missing"}',
+        '{"id": 6, "method": "unserializable"}',
+        'not json',
+    ], methods)
+    assert responses[1]["result"] == "a"
+    assert responses[2]["result"] == "b"
+    assert "division by zero" in responses[3]["error"]["message"]
+    assert responses[4]["error"]["code"] == -32601
+    assert "not JSON serializable" in responses[6]["error"]["message"]
+    assert responses[None]["error"]["code"] == -32700
+
+
+def test_generator_methods_stream_records():
+    def count(params):
+        for i in range(params["n"]):
+            yield {"i": i}
+
+    stdout = io.StringIO()
+    RPCServer({"count": count}, stdin=io.StringIO('{"id": 5, "method": "count", "params": {"n": 3}}\n'),
+              stdout=stdout).serve_forever()
+    lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [m.get("stream") for m in lines[:3]] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert lines[3] == {"jsonrpc": "2.0", "id": 5, "result": {"streamed": 3}}
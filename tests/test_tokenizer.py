@@ -0,0 +1,116 @@
+import io
+import pickle
+
+from edi_engine.core import MappedText, X12MappedTokenizer, X12Tokenizer, X12StreamTokenizer
+
+
+SAMPLE = (
+    "ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+    "*210101*1253*U*00401*000000001*0*T*:~\n"
+    "GS*PO*SENDER*RECEIVER*20210101*1253*1*X*004010~\n"
+    "ST*850*0001~BEG*00*SA*12345**20210101~\n"
+    "PO1*1*10*EA*2.50**VP*PART-1~SE*4*0001~GE*1*1~IEA*1*000000001~\n"
+)
+
+
+def _tags_and_elements(segments):
+    return [(s.tag, list(s.elements)) for s in segments]
+
+
+def test_stream_matches_in_memory_tokenizer():
+    expected = _tags_and_elements(X12Tokenizer(SAMPLE).tokenize())
+    for chunk_size in (1, 7, 64, 4096):
+        stream = X12StreamTokenizer(io.StringIO(SAMPLE), chunk_size=chunk_size)
+        assert _tags_and_elements(stream) == expected
+        assert (stream.element_sep, stream.segment_term) == ("*", "~")
+
+
+def test_stream_strips_unterminated_tail():
+    head = SAMPLE.split("ST*850")[0] + "ST*850*0001~PO1"
+    for tail in ("~BEG ", "~X ", "~BEG*00 \n", "~ "):
+        expected = _tags_and_elements(X12Tokenizer(head + tail).tokenize())
+        for chunk_size in (1, 5, 4096):
+            assert _tags_and_elements(X12StreamTokenizer(io.StringIO(head + tail), chunk_size=chunk_size)) == expected
+
+
+def test_stream_accepts_byte_chunks_with_split_multibyte_chars():
+    content = SAMPLE.replace("PART-1", "PART-é")
+    data = content.encode("utf-8")
+    chunks = [data[i:i + 5] for i in range(0, len(data), 5)]
+    segments = list(X12StreamTokenizer(iter(chunks)))
+    po1 = [s for s in segments if s.tag == "PO1"][0]
+    assert po1.get(7) == "PART-é"
+
+
+def test_stream_empty_source():
+    assert list(X12StreamTokenizer(io.BytesIO(b"   \n"))) == []
+
+
+def test_segment_store_is_compact_and_lazy():
+    segments = X12Tokenizer(SAMPLE).tokenize()
+    assert len(segments) == 8
+    assert [segments.tag(i) for i in range(3)] == ["ISA", "GS", "ST"]
+
+    po1 = segments[4]
+    assert not hasattr(po1, "__dict__")
+    assert po1._elements is None
+    assert po1.get(0) == "PO1"
+    assert po1.get(2) == "10"
+    assert po1.get(5) is None
+    assert po1.get(5, "N/A") == "N/A"
+    assert po1.get(99) is None
+    assert po1.raw == "PO1*1*10*EA*2.50**VP*PART-1"
+
+
+def test_mapped_tokenizer_matches_in_memory_tokenizer(tmp_path):
+    content = "\n  " + SAMPLE.replace("PART-1", "PART-é") + "\r\n"
+    path = tmp_path / "sample.edi"
+    path.write_bytes(content.encode("utf-8"))
+
+    segments = X12MappedTokenizer(str(path)).tokenize()
+    assert isinstance(segments.buffer, MappedText)
+    assert _tags_and_elements(segments) == _tags_and_elements(X12Tokenizer(content).tokenize())
+
+    # A pickled window carries its bytes along and keeps byte offsets valid
+    window = pickle.loads(pickle.dumps(segments.window(3, 6)))
+    assert [s.tag for s in window] == ["BEG", "PO1", "SE"]
+    assert window[1].get(7) == "PART-é"
+
+
+def test_mapped_tokenizer_empty_file(tmp_path):
+    path = tmp_path / "empty.edi"
+    path.write_bytes(b"")
+    assert len(X12MappedTokenizer(str(path)).tokenize()) == 0
+
+
+def test_isa_component_and_repetition_separators(tmp_path):
+    content = (
+        "ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       "
+        "*210101*1253*^*00501*000000001*0*T*>~"
+        "GS*HC*SENDER*RECEIVER*20210101*1253*1*X*005010X222A1~ST*837*0001~"
+        "CLM*C1*100.50***11>B>1*Y~HI*ABK>J449*ABF>E119~PER*IC*JANE*TE*5551234^5559876~SE*5*0001~"
+    )
+    path = tmp_path / "sample.edi"
+    path.write_bytes(content.encode())
+    for segments in (X12Tokenizer(content).tokenize(), X12MappedTokenizer(str(path)).tokenize(),
+                     list(X12StreamTokenizer(io.StringIO(content), chunk_size=16))):
+        hi, per = segments[4], segments[5]
+        assert hi.components(1) == ["ABK", "J449"]
+        assert per.repeats(4) == ["5551234", "5559876"]
+        assert per.components(99) == []
+
+    # Before 00402 ISA11 is the 'U' standards id, not a separator
+    po1 = X12Tokenizer(SAMPLE).tokenize()[4]
+    assert po1.repeats(7) == ["PART-1"]
+    assert po1.components(7) == ["PART-1"]
+
+
+def test_block_scanner_matches_across_block_boundaries(monkeypatch):
+    from edi_engine import core
+
+    content = SAMPLE.replace("BEG", "\n  ~  *X~BEG") + "~~ZZZZ*1~  ~"
+    expected = _tags_and_elements(X12Tokenizer(content).tokenize())
+    assert [tag for tag, _ in expected][:5] == ["ISA", "GS", "ST", "", "BEG"]
+    for block in (1, 3, 16):
+        monkeypatch.setattr(core, "SCAN_BLOCK", block)
+        assert _tags_and_elements(X12Tokenizer(content).tokenize()) == expected
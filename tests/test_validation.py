@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+from edi_engine.core import X12MappedTokenizer, X12Tokenizer
+from edi_engine.envelope import parse_store
+from edi_engine.legacy import parse_edi
+from edi_engine.validation import new_marks, tag_positions, validate_edi, validate_store
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from generators import DOC_TYPES, make_interchange  # noqa: E402
+
+
+def _codes(report):
+    return [(e["code"], e["segment"], e["tag"], e.get("element")) for e in report["errors"]]
+
+
+def test_generated_interchanges_are_valid():
+    for doc_type in DOC_TYPES:
+        for transactions in (1, 3):
+            raw = make_interchange(doc_type, lines=5, transactions=transactions, newline=transactions > 1)
+            report = validate_edi(raw)
+            assert report["valid"], (doc_type, report["errors"])
+            assert report["transactions"] == transactions
+
+
+def test_tokenizer_marks_envelope_segments(tmp_path):
+    raw = make_interchange("856", lines=3, transactions=2, newline=True)
+    marks = new_marks()
+    store = X12Tokenizer(raw).tokenize(marks)
+    for tag, positions in marks.items():
+        assert positions == tag_positions(store, tag)
+    assert marks["ST"] == [2, 15]
+
+    path = tmp_path / "856.edi"
+    path.write_text(raw)
+    mapped = new_marks()
+    X12MappedTokenizer(str(path)).tokenize(mapped)
+    assert mapped == marks
+
+
+def test_envelope_counts_and_control_numbers():
+    raw = make_interchange("850", lines=2, transactions=2)
+    raw = raw.replace("~SE*6*0001", "~SE*5*0009").replace("~GE*2*1", "~GE*3*1").replace("~IEA*1*000000001", "~IEA*1*000000002")
+    assert _codes(validate_edi(raw)) == [
+        ("SE_COUNT_MISMATCH", 7, "SE", 1),
+        ("CONTROL_MISMATCH", 7, "SE", 2),
+        ("GE_COUNT_MISMATCH", 14, "GE", 1),
+        ("CONTROL_MISMATCH", 15, "IEA", 2),
+    ]
+
+
+def test_missing_trailers_and_required_elements():
+    raw = make_interchange("810", lines=2, transactions=2)
+    raw = raw.replace("~SE*7*0001~", "~").replace("IT1*1*2*EA", "IT1*1**").replace("~N1*RE", "~n1*RE", 1)
+    assert _codes(validate_edi(raw)) == [
+        ("SE_MISSING", 2, "ST", None),
+        ("SEGMENT_SYNTAX", 4, "n1", None),
+        ("ELEMENT_MISSING", 11, "IT1", 2),
+        ("ELEMENT_MISSING", 11, "IT1", 3),
+    ]
+
+
+def test_parse_edi_reports_the_same_errors_as_validate_edi():
+    raw = make_interchange("837", lines=3, transactions=3).replace("CLM*C1*1.50", "CLM*C1*")
+    expected = validate_edi(raw)
+    assert _codes(expected) == [("ELEMENT_MISSING", 13, "CLM", 2)]
+    marks = new_marks()
+    store = X12Tokenizer(raw).tokenize(marks)
+    typed = parse_store(store, validate=True)
+    assert validate_store(store, marks, typed) == expected
+    assert all("errors" not in txn for txn in typed["data"]["transactions"])
+
+    legacy = parse_edi(raw, validate=True)
+    assert legacy["validation"] == expected
+    assert legacy["data"].typed()["transaction_count"] == 3
+    assert "validation" not in parse_edi(raw)
+
+
+def test_malformed_content_is_invalid():
+    report = validate_edi("ISA*00* ... THIS IS NOT VALID EDI ...")
+    assert not report["valid"]
+    assert {"ST_MISSING", "ISA_SYNTAX", "IEA_MISSING"} <= {e["code"] for e in report["errors"]}